@@ -25,7 +25,7 @@ celery_app.conf.update(
     enable_utc=True,
     task_track_started=True,
     task_time_limit=30 * 60,
-    task_soft_time_limit=60,
+    task_soft_time_limit=settings.celery_task_soft_time_limit,
 )
 
 
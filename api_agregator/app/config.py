@@ -2,6 +2,7 @@
 
 from functools import lru_cache
 
+from pydantic import model_validator
 from pydantic_settings import BaseSettings
 
 
@@ -18,9 +19,76 @@ class Settings(BaseSettings):
 
     celery_broker_url: str = "redis://localhost:6379/1"
     celery_result_backend: str = "redis://localhost:6379/2"
+    # Мягкое ограничение времени выполнения периодических задач Celery (секунды)
+    celery_task_soft_time_limit: int = 60
+
+    # Сжатие полного docker inspect контейнеров в Redis (zlib+base64)
+    containers_info_compression: bool = True
+
+    # HTTP клиент APIGateway: пул соединений на сервис, повторы идемпотентных
+    # запросов и circuit breaker
+    http_pool_maxsize: int = 32
+    http_retries: int = 2
+    http_retry_backoff: float = 0.2
+    http_circuit_failure_threshold: int = 5
+    http_circuit_reset_timeout: float = 30.0
+
+    # Сохранение обнаруженных контейнеров в PostgreSQL (пакетный upsert по хосту)
+    containers_db_sync_enabled: bool = True
+
+    # Параллельный опрос docker_api на хостах: таймаут запроса к хосту, общий дедлайн
+    # опроса всех хостов и максимальное время сохранения результатов сверх дедлайна (секунды).
+    # Дедлайн вместе с временем сохранения должен быть меньше celery_task_soft_time_limit
+    discovery_max_workers: int = 16
+    discovery_host_timeout: float = 5.0
+    discovery_deadline: float = 30.0
+    discovery_save_budget: float = 15.0
+    # Профиль полей docker inspect, запрашиваемый у docker_api: summary или full
+    discovery_profile: str = "summary"
+
+    # Проверка доступности хостов: параллельность, таймаут и экспоненциальная
+    # задержка повторной проверки недоступных хостов (секунды)
+    hosts_probe_max_workers: int = 32
+    hosts_probe_timeout: float = 3.0
+    hosts_probe_backoff_base: float = 15.0
+    hosts_probe_backoff_max: float = 300.0
+
+    # Классификация контейнеров: размер пачки для HTTP режима и путь к
+    # docker_classification/app/services/docker_clasification.py для режима библиотеки
+    classification_batch_size: int = 100
+    classification_library_path: str | None = None
+
+    # Кеш результатов классификации в Redis (TTL в секундах, максимум записей)
+    classification_cache_enabled: bool = True
+    classification_cache_ttl: int = 86400
+    classification_cache_max_size: int = 50000
+
+    # Массовое подключение контейнеров к мониторингу: одновременно обрабатываемые
+    # контейнеры, время хранения состояния задачи в Redis и ограничение времени
+    # выполнения задачи Celery (секунды)
+    onboarding_max_concurrency: int = 8
+    onboarding_job_ttl: int = 86400
+    onboarding_task_time_limit: int = 1800
 
     debug: bool = False
 
+    @model_validator(mode="after")
+    def check_discovery_deadline(self) -> "Settings":
+        """
+        Проверяет, что опрос хостов укладывается в ограничение времени задачи Celery.
+
+        Returns:
+            Settings: Настройки
+
+        Raises:
+            ValueError: Если дедлайн опроса и время сохранения не меньше celery_task_soft_time_limit
+        """
+        if self.discovery_deadline + self.discovery_save_budget >= self.celery_task_soft_time_limit:
+            raise ValueError(
+                "discovery_deadline + discovery_save_budget must be less than celery_task_soft_time_limit"
+            )
+        return self
+
     class Config:
         """Конфигурация Pydantic."""
         env_file = ".env"
@@ -3,6 +3,7 @@
 import logging
 import sys
 
+from sqlalchemy import text
 from sqlalchemy.exc import SQLAlchemyError
 
 from app.db.postgres.database import Base, engine
@@ -17,6 +18,25 @@ logging.basicConfig(
 logger = logging.getLogger(__name__)
 
 
+# Колонки, добавленные в модели после создания таблиц: create_all не изменяет существующие таблицы
+ADDED_COLUMNS = [
+    ("containers", "digest", "VARCHAR(64)"),
+]
+
+
+def add_missing_columns() -> None:
+    """
+    Добавляет в существующие таблицы колонки из ADDED_COLUMNS.
+
+    Метод идемпотентен - уже существующие колонки не изменяются.
+    """
+    if engine.dialect.name != "postgresql":
+        return
+    with engine.begin() as connection:
+        for table, column, column_type in ADDED_COLUMNS:
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} {column_type}"))
+
+
 def init_db() -> None:
     """
     Создание всех таблиц в базе данных.
@@ -27,6 +47,7 @@ def init_db() -> None:
     try:
         logger.info("Starting database initialization...")
         Base.metadata.create_all(bind=engine)
+        add_missing_columns()
         logger.info("Database tables created successfully!")
     except SQLAlchemyError as e:
         logger.error(f"Error initializing database: {e}")
@@ -0,0 +1,261 @@
+"""Classification results Redis cache module."""
+
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Dict, List
+
+from redis.exceptions import WatchError
+
+from app.config import settings
+from app.db.redis.redis_connection import RedisConnection, decode_value
+
+logger = logging.getLogger(__name__)
+
+
+class ClassificationCache(RedisConnection):
+    """
+    Кеш результатов классификации контейнеров в Redis.
+
+    Результат хранится по ключу classification:{version}:{fingerprint} с TTL, где version -
+    версия набора правил docker_classification. TTL отсчитывается от последнего обращения
+    к записи. Размер кеша ограничен: время последнего обращения к записям хранится в sorted set,
+    при переполнении удаляются самые старые (LRU). Записи, истекшие по TTL, удаляются из sorted
+    set перед подсчетом размера. При смене версии правил все записи удаляются.
+    """
+
+    KEY_PREFIX = "classification"
+    LRU_KEY = "classification_cache:lru"
+    VERSION_KEY = "classification_cache:version"
+    STATS_KEY = "classification_cache:stats"
+
+    def __init__(self) -> None:
+        """
+        Инициализация класса ClassificationCache.
+
+        Создает подключение к Redis.
+        """
+        super().__init__()
+        self.client = self.connect()
+        self.ttl = settings.classification_cache_ttl
+        self.max_size = settings.classification_cache_max_size
+
+    @staticmethod
+    def fingerprint(container_params: Dict[str, Any]) -> str:
+        """
+        Стабильный хеш параметров контейнера, влияющих на классификацию.
+
+        Учитываются образ, множество имен переменных окружения, открытые порты и метки.
+        Значения переменных окружения не учитываются: правила сопоставляются с именами.
+
+        Args:
+            container_params: Параметры контейнера (labels, envs, image, ports)
+
+        Returns:
+            str: SHA-256 хеш в hex
+        """
+        env_keys = sorted({env.split("=", 1)[0] for env in container_params.get("envs") or []})
+        payload = {
+            "image": container_params.get("image") or "",
+            "env_keys": env_keys,
+            "ports": sorted(set(container_params.get("ports") or [])),
+            "labels": container_params.get("labels") or {},
+        }
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode("utf-8")).hexdigest()
+
+    def _key(self, version: str, fingerprint: str) -> str:
+        """
+        Формирует ключ записи кеша.
+
+        Args:
+            version: Версия набора правил
+            fingerprint: Хеш параметров контейнера
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"{self.KEY_PREFIX}:{version}:{fingerprint}"
+
+    def ensure_version(self, version: str) -> None:
+        """
+        Сбрасывает кеш, если версия набора правил изменилась.
+
+        Очистка и запись новой версии выполняются одной транзакцией под WATCH ключа версии:
+        если версию одновременно сменил другой воркер, проверка повторяется.
+
+        Args:
+            version: Текущая версия набора правил
+        """
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(self.VERSION_KEY)
+                    current_version = decode_value(pipe.get(self.VERSION_KEY))
+                    if current_version == version:
+                        return
+                    cached_keys = pipe.zrange(self.LRU_KEY, 0, -1)
+                    pipe.multi()
+                    self._delete_entries(pipe, cached_keys)
+                    pipe.set(self.VERSION_KEY, version)
+                    pipe.execute()
+                    break
+                except WatchError:
+                    continue
+        logger.info(
+            "Classification rules version changed %s -> %s, invalidated %s cached results",
+            current_version, version, len(cached_keys)
+        )
+
+    def get_many(self, version: str, fingerprints: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Получает закешированные результаты и обновляет время обращения к ним и их TTL.
+
+        Args:
+            version: Версия набора правил
+            fingerprints: Хеши параметров контейнеров
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Найденные результаты (fingerprint -> classification)
+        """
+        unique_fingerprints = list(dict.fromkeys(fingerprints))
+        if not unique_fingerprints:
+            return {}
+
+        keys = [self._key(version, fingerprint) for fingerprint in unique_fingerprints]
+        values = self.client.mget(keys)
+
+        result = {}
+        now = time.time()
+        touched = {}
+        for fingerprint, key, value in zip(unique_fingerprints, keys, values):
+            if value:
+                result[fingerprint] = json.loads(value)
+                touched[key] = now
+        if touched:
+            pipe = self.client.pipeline()
+            for key in touched:
+                pipe.expire(key, self.ttl)
+            pipe.zadd(self.LRU_KEY, touched)
+            pipe.execute()
+        return result
+
+    def _prune_expired(self, pipe, now: float) -> None:
+        """
+        Добавляет в pipeline удаление из sorted set записей, истекших по TTL.
+
+        Args:
+            pipe: Pipeline Redis
+            now: Текущее время
+        """
+        pipe.zremrangebyscore(self.LRU_KEY, "-inf", now - self.ttl)
+
+    def set_many(self, version: str, results: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Сохраняет результаты классификации и вытесняет самые старые записи при переполнении.
+
+        Args:
+            version: Версия набора правил
+            results: Результаты (fingerprint -> classification)
+        """
+        if not results:
+            return
+
+        now = time.time()
+        pipe = self.client.pipeline()
+        touched = {}
+        for fingerprint, classification in results.items():
+            key = self._key(version, fingerprint)
+            pipe.set(key, json.dumps(classification), ex=self.ttl)
+            touched[key] = now
+        pipe.zadd(self.LRU_KEY, touched)
+        self._prune_expired(pipe, now)
+        pipe.zcard(self.LRU_KEY)
+        size = pipe.execute()[-1]
+
+        if size > self.max_size:
+            self._evict(size - self.max_size)
+
+    def _evict(self, count: int) -> None:
+        """
+        Удаляет count записей, к которым дольше всего не обращались.
+
+        Args:
+            count: Количество удаляемых записей
+        """
+        oldest_keys = self.client.zrange(self.LRU_KEY, 0, count - 1)
+        if not oldest_keys:
+            return
+        pipe = self.client.pipeline()
+        pipe.delete(*oldest_keys)
+        pipe.zrem(self.LRU_KEY, *oldest_keys)
+        pipe.execute()
+
+    def clear(self) -> int:
+        """
+        Удаляет все записи кеша.
+
+        Returns:
+            int: Количество удаленных записей
+        """
+        cached_keys = self.client.zrange(self.LRU_KEY, 0, -1)
+        pipe = self.client.pipeline()
+        self._delete_entries(pipe, cached_keys)
+        pipe.execute()
+        return len(cached_keys)
+
+    def _delete_entries(self, pipe, cached_keys: List) -> None:
+        """
+        Добавляет в pipeline удаление записей кеша и sorted set времени обращения.
+
+        Args:
+            pipe: Pipeline Redis
+            cached_keys: Ключи записей кеша
+        """
+        for start in range(0, len(cached_keys), 1000):
+            pipe.delete(*cached_keys[start:start + 1000])
+        pipe.delete(self.LRU_KEY)
+
+    def record(self, hits: int, misses: int) -> None:
+        """
+        Увеличивает счетчики попаданий и промахов.
+
+        Args:
+            hits: Количество попаданий
+            misses: Количество промахов
+        """
+        pipe = self.client.pipeline()
+        if hits:
+            pipe.hincrby(self.STATS_KEY, "hits", hits)
+        if misses:
+            pipe.hincrby(self.STATS_KEY, "misses", misses)
+        pipe.execute()
+
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Статистика использования кеша.
+
+        Returns:
+            Dict[str, Any]: Попадания, промахи, доля попаданий, размер и версия правил
+        """
+        pipe = self.client.pipeline()
+        pipe.hgetall(self.STATS_KEY)
+        self._prune_expired(pipe, time.time())
+        pipe.zcard(self.LRU_KEY)
+        pipe.get(self.VERSION_KEY)
+        stats, _, size, version = pipe.execute()
+        stats = {decode_value(key): int(value) for key, value in stats.items()}
+        version = decode_value(version)
+
+        hits = stats.get("hits", 0)
+        misses = stats.get("misses", 0)
+        total = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_ratio": round(hits / total, 4) if total else None,
+            "size": size,
+            "max_size": self.max_size,
+            "ttl": self.ttl,
+            "rules_version": version,
+        }
@@ -0,0 +1,101 @@
+"""Materialized container Prometheus configs Redis module."""
+
+import json
+import logging
+
+from app.db.redis.redis_connection import RedisConnection, decode_value
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerConfigs(RedisConnection):
+    """
+    Материализованное представление выбранных конфигураций Prometheus контейнеров в Redis.
+
+    Хранение:
+    - containers:configs - hash container_id -> JSON выбранной конфигурации (config_id, status,
+      stack, exporter_image, exporter_port, job_name, created_at, container_name, host_name);
+    - containers:configs:ready - признак того, что представление построено полностью.
+
+    Представление обновляется точечно при изменении конфигураций и синхронизации контейнеров,
+    поэтому чтение списков не обращается к БД. Если точечное обновление не удалось,
+    признак готовности снимается и представление перестраивается при следующем обращении.
+    """
+
+    CONFIGS_KEY = "containers:configs"
+    READY_KEY = "containers:configs:ready"
+
+    def __init__(self) -> None:
+        """
+        Инициализация класса ContainerConfigs.
+
+        Создает подключение к Redis.
+        """
+        super().__init__()
+        self.client = self.connect()
+
+    def is_ready(self) -> bool:
+        """
+        Построено ли представление полностью.
+
+        Returns:
+            bool: True, если представление можно читать без перестроения
+        """
+        return bool(self.client.exists(self.READY_KEY))
+
+    def invalidate(self) -> None:
+        """
+        Снимает признак готовности: представление будет перестроено при следующем обращении.
+        """
+        self.client.delete(self.READY_KEY)
+
+    def get_configs(self, container_ids: list[str]) -> list[dict | None]:
+        """
+        Возвращает выбранные конфигурации контейнеров за одно обращение к Redis.
+
+        Args:
+            container_ids: Идентификаторы контейнеров
+
+        Returns:
+            list[dict | None]: Конфигурации в порядке container_ids; None, если конфигурации нет
+        """
+        if not container_ids:
+            return []
+        values = self.client.hmget(self.CONFIGS_KEY, container_ids)
+        return [json.loads(decode_value(value)) if value is not None else None for value in values]
+
+    def update_configs(self, configs: dict[str, dict], removed_ids: list[str]) -> None:
+        """
+        Записывает и удаляет конфигурации контейнеров в одной транзакции.
+
+        Args:
+            configs: Конфигурации для записи (container_id -> config)
+            removed_ids: Идентификаторы контейнеров, у которых больше нет конфигурации
+        """
+        if not configs and not removed_ids:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        if removed_ids:
+            pipe.hdel(self.CONFIGS_KEY, *removed_ids)
+        if configs:
+            pipe.hset(self.CONFIGS_KEY, mapping={
+                container_id: json.dumps(config) for container_id, config in configs.items()
+            })
+        pipe.execute()
+
+    def replace_configs(self, configs: dict[str, dict]) -> None:
+        """
+        Заменяет представление целиком и отмечает его готовым.
+
+        Args:
+            configs: Конфигурации всех контейнеров (container_id -> config)
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self.CONFIGS_KEY)
+        if configs:
+            pipe.hset(self.CONFIGS_KEY, mapping={
+                container_id: json.dumps(config) for container_id, config in configs.items()
+            })
+        pipe.set(self.READY_KEY, 1)
+        pipe.execute()
+        logger.info("Rebuilt container configs view: %s containers", len(configs))
@@ -1,9 +1,17 @@
 """Docker containers Redis storage module."""
 
+import base64
+import hashlib
 import json
 import logging
+import time
+import zlib
+from collections import defaultdict
 
-from app.db.redis.redis_connection import RedisConnection
+from redis.exceptions import WatchError
+
+from app.config import settings
+from app.db.redis.redis_connection import RedisConnection, decode_value
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +21,427 @@ class DockerContainers(RedisConnection):
     Класс для управления информацией о Docker контейнерах в Redis.
 
     Предоставляет методы для загрузки, получения и удаления данных о контейнерах.
+
+    Хранение:
+    - container:{host}:{container_id} - hash с краткими полями (имя, статус, образ, метки,
+      опубликованные порты, классификация), которых достаточно для списков;
+    - container_info:{host}:{container_id} - полный docker inspect (JSON, опционально zlib+base64);
+    - containers:by_host:{host} - множество идентификаторов контейнеров хоста;
+    - containers:hosts - множество хостов, у которых есть контейнеры;
+    - exporters:{host}:{name} - hash экспортера (container_id, name, status, image, created,
+      host_name), name - имя контейнера экспортера в нижнем регистре;
+    - exporters:by_name:{name} - множество хостов, на которых есть экспортер с таким именем.
+    Индексы обновляются в одной транзакции с данными, поэтому чтение и удаление не требуют KEYS,
+    а экспортер находится по имени за O(1).
+
+    В hash хранится digest содержимого контейнера: при синхронизации перезаписываются
+    только изменившиеся контейнеры, а изменения публикуются в канал containers:changes.
     """
 
+    HOSTS_INDEX_KEY = "containers:hosts"
+    CHANGES_CHANNEL = "containers:changes"
+    LAYOUT_VERSION_KEY = "containers:layout_version"
+    LAYOUT_VERSION = "4"
+    SUMMARY_FIELDS = (
+        "id", "name", "status", "image", "created", "labels", "ports", "classification", "host_id", "host_name"
+    )
+    DIGEST_FIELD = "digest"
+    COMPRESSED_PREFIX = "zlib:"
+    EXPORTER_SUFFIX = "-exporter"
+    EXPORTER_FIELDS = ("container_id", "name", "status", "image", "created", "host_name")
+
     def __init__(self) -> None:
         """
         Инициализация класса DockerContainers.
 
-        Создает подключение к Redis.
+        Создает подключение к Redis и при первом запуске переводит существующие
+        данные на текущую схему хранения.
         """
         super().__init__()
         self.client = self.connect()
+        self.compress_info = settings.containers_info_compression
+        if decode_value(self.client.get(self.LAYOUT_VERSION_KEY)) != self.LAYOUT_VERSION:
+            self.rebuild_index()
+
+    @staticmethod
+    def _container_key(host_name: str, container_id: str) -> str:
+        """
+        Ключ кратких данных контейнера.
+
+        Args:
+            host_name: Имя хоста
+            container_id: Идентификатор контейнера
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"container:{host_name}:{container_id}"
+
+    @staticmethod
+    def _info_key(host_name: str, container_id: str) -> str:
+        """
+        Ключ полного docker inspect контейнера.
+
+        Args:
+            host_name: Имя хоста
+            container_id: Идентификатор контейнера
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"container_info:{host_name}:{container_id}"
+
+    @staticmethod
+    def _host_index_key(host_name: str) -> str:
+        """
+        Ключ множества идентификаторов контейнеров хоста.
+
+        Args:
+            host_name: Имя хоста
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"containers:by_host:{host_name}"
+
+    @staticmethod
+    def _exporter_key(host_name: str, exporter_name: str) -> str:
+        """
+        Ключ hash экспортера.
+
+        Args:
+            host_name: Имя хоста
+            exporter_name: Имя контейнера экспортера в нижнем регистре
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"exporters:{host_name}:{exporter_name}"
+
+    @staticmethod
+    def _exporter_hosts_key(exporter_name: str) -> str:
+        """
+        Ключ множества хостов, на которых есть экспортер с заданным именем.
+
+        Args:
+            exporter_name: Имя контейнера экспортера в нижнем регистре
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"exporters:by_name:{exporter_name}"
+
+    @classmethod
+    def exporter_index_name(cls, container_name: str | None) -> str | None:
+        """
+        Имя, под которым контейнер хранится в индексе экспортеров.
+
+        Args:
+            container_name: Имя контейнера (docker inspect Name)
+
+        Returns:
+            str | None: Имя без ведущего "/" в нижнем регистре или None, если контейнер не экспортер
+        """
+        name = (container_name or "").lstrip("/").lower()
+        return name if cls.EXPORTER_SUFFIX in name else None
+
+    @staticmethod
+    def digest(data: dict) -> str:
+        """
+        Вычисляет digest содержимого контейнера (docker inspect, классификация, хост).
+
+        Args:
+            data: Данные о контейнере
+
+        Returns:
+            str: SHA-256 в hex
+        """
+        return hashlib.sha256(json.dumps(data, sort_keys=True, default=str).encode("utf-8")).hexdigest()
+
+    def _encode_info(self, info: dict) -> str:
+        """
+        Сериализует docker inspect, при включенном сжатии - zlib+base64.
+
+        Args:
+            info: Данные docker inspect
+
+        Returns:
+            str: Строка для записи в Redis
+        """
+        raw = json.dumps(info)
+        if not self.compress_info:
+            return raw
+        return self.COMPRESSED_PREFIX + base64.b64encode(zlib.compress(raw.encode("utf-8"))).decode("ascii")
+
+    def _decode_info(self, value) -> dict:
+        """
+        Десериализует docker inspect, записанный со сжатием или без.
+
+        Args:
+            value: Значение из Redis
+
+        Returns:
+            dict: Данные docker inspect
+        """
+        value = decode_value(value)
+        if not value:
+            return {}
+        if value.startswith(self.COMPRESSED_PREFIX):
+            value = zlib.decompress(base64.b64decode(value[len(self.COMPRESSED_PREFIX):])).decode("utf-8")
+        return json.loads(value)
+
+    @staticmethod
+    def _summary_fields(container_id: str, data: dict, host_name: str) -> dict:
+        """
+        Формирует поля hash с краткими данными контейнера.
+
+        Args:
+            container_id: Идентификатор контейнера
+            data: Данные о контейнере (info, classification, host_id, host_name)
+            host_name: Имя хоста, к которому относится контейнер
+
+        Returns:
+            dict: Поля hash
+        """
+        info = data.get("info") or {}
+        config = info.get("Config") or {}
+        state = info.get("State") or {}
+        return {
+            "id": info.get("Id") or container_id,
+            "name": info.get("Name") or "",
+            "status": state.get("Status") or "",
+            "image": config.get("Image") or "",
+            "created": info.get("Created") or "",
+            "labels": json.dumps(config.get("Labels") or {}),
+            "ports": json.dumps((info.get("NetworkSettings") or {}).get("Ports") or {}),
+            "classification": json.dumps(data.get("classification", {})),
+            "host_id": data.get("host_id") or host_name,
+            "host_name": data.get("host_name") or host_name,
+        }
+
+    @staticmethod
+    def _from_summary_fields(values: list) -> dict:
+        """
+        Собирает данные контейнера из полей hash.
+
+        Поле info содержит только краткий набор полей docker inspect
+        (Id, Name, Created, State.Status, Config.Image, Config.Labels, NetworkSettings.Ports).
+
+        Args:
+            values: Значения полей SUMMARY_FIELDS в порядке их перечисления
+
+        Returns:
+            dict: Данные о контейнере или пустой словарь, если контейнер не найден
+        """
+        fields = dict(zip(DockerContainers.SUMMARY_FIELDS, (decode_value(value) for value in values)))
+        if fields["id"] is None:
+            return {}
+        return {
+            "info": {
+                "Id": fields["id"],
+                "Name": fields["name"] or "",
+                "Created": fields["created"] or "",
+                "State": {"Status": fields["status"] or ""},
+                "Config": {
+                    "Image": fields["image"] or "",
+                    "Labels": json.loads(fields["labels"] or "{}"),
+                },
+                "NetworkSettings": {"Ports": json.loads(fields["ports"] or "{}")},
+            },
+            "classification": json.loads(fields["classification"] or "{}"),
+            "host_id": fields["host_id"],
+            "host_name": fields["host_name"],
+        }
+
+    def _write_container(self, pipe, host_name: str, container_id: str, data: dict, digest: str = None) -> None:
+        """
+        Добавляет в pipeline запись контейнера (краткие поля и полный docker inspect).
+
+        Args:
+            pipe: Pipeline Redis
+            host_name: Имя хоста
+            container_id: Идентификатор контейнера
+            data: Данные о контейнере
+            digest: Digest содержимого. Если не передан, вычисляется по data
+        """
+        key = self._container_key(host_name, container_id)
+        fields = self._summary_fields(container_id, data, host_name)
+        fields[self.DIGEST_FIELD] = digest or self.digest(data)
+        pipe.delete(key)
+        pipe.hset(key, mapping=fields)
+        pipe.set(self._info_key(host_name, container_id), self._encode_info(data.get("info") or {}))
+        self._write_exporter(pipe, host_name, fields)
+
+    def _write_exporter(self, pipe, host_name: str, fields: dict) -> None:
+        """
+        Добавляет в pipeline запись индекса экспортеров, если контейнер является экспортером.
+
+        Args:
+            pipe: Pipeline Redis
+            host_name: Имя хоста
+            fields: Краткие поля контейнера (см. _summary_fields)
+        """
+        exporter_name = self.exporter_index_name(fields["name"])
+        if not exporter_name:
+            return
+        pipe.hset(self._exporter_key(host_name, exporter_name), mapping={
+            "container_id": fields["id"],
+            "name": fields["name"].lstrip("/"),
+            "status": fields["status"],
+            "image": fields["image"],
+            "created": fields["created"],
+            "host_name": host_name,
+        })
+        pipe.sadd(self._exporter_hosts_key(exporter_name), host_name)
+
+    def _delete_exporters(self, pipe, host_name: str, container_names: list) -> None:
+        """
+        Добавляет в pipeline удаление записей индекса экспортеров по именам контейнеров.
+
+        Args:
+            pipe: Pipeline Redis
+            host_name: Имя хоста
+            container_names: Имена контейнеров; имена, не являющиеся экспортерами, пропускаются
+        """
+        for container_name in container_names:
+            exporter_name = self.exporter_index_name(container_name)
+            if exporter_name:
+                pipe.delete(self._exporter_key(host_name, exporter_name))
+                pipe.srem(self._exporter_hosts_key(exporter_name), host_name)
+
+    def _get_names(self, host_name: str, container_ids: list[str]) -> dict[str, str | None]:
+        """
+        Возвращает сохраненные имена контейнеров хоста.
+
+        Args:
+            host_name: Имя хоста
+            container_ids: Идентификаторы контейнеров
+
+        Returns:
+            dict[str, str | None]: Идентификатор контейнера -> имя
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for container_id in container_ids:
+            pipe.hget(self._container_key(host_name, container_id), "name")
+        return {
+            container_id: decode_value(name)
+            for container_id, name in zip(container_ids, pipe.execute())
+        }
+
+    def _rebuild_exporters_index(self, ids_by_host: dict[str, set[str]]) -> int:
+        """
+        Перестраивает индекс экспортеров по сохраненным контейнерам.
+
+        Args:
+            ids_by_host: Имя хоста -> идентификаторы контейнеров
+
+        Returns:
+            int: Количество экспортеров в индексе
+        """
+        stale_keys = list(self.client.scan_iter(match="exporters:*", count=1000))
+        pipe = self.client.pipeline(transaction=True)
+        for start in range(0, len(stale_keys), 1000):
+            pipe.delete(*stale_keys[start:start + 1000])
+
+        exporters_count = 0
+        for host_name, container_ids in ids_by_host.items():
+            container_ids = sorted(container_ids)
+            read_pipe = self.client.pipeline(transaction=False)
+            for container_id in container_ids:
+                read_pipe.hmget(self._container_key(host_name, container_id), self.SUMMARY_FIELDS)
+            for values in read_pipe.execute():
+                fields = dict(zip(self.SUMMARY_FIELDS, (decode_value(value) for value in values)))
+                if fields["id"] is not None and self.exporter_index_name(fields["name"]):
+                    self._write_exporter(pipe, host_name, fields)
+                    exporters_count += 1
+        pipe.execute()
+        return exporters_count
+
+    def rebuild_index(self) -> None:
+        """
+        Перестраивает индексы контейнеров по ключам container:* и переводит
+        контейнеры, сохраненные одним JSON, в схему hash + container_info. В hash,
+        записанных до появления поля ports, оно заполняется из сохраненного docker inspect.
+
+        Ключи перебираются неблокирующим SCAN. Выполняется один раз при смене схемы хранения.
+        """
+        ids_by_host = defaultdict(set)
+        for key in self.client.scan_iter(match="container:*", count=1000):
+            _, host_name, container_id = decode_value(key).split(":", 2)
+            ids_by_host[host_name].add(container_id)
+
+        refs = [(host_name, container_id) for host_name, ids in ids_by_host.items() for container_id in ids]
+        pipe = self.client.pipeline(transaction=False)
+        for host_name, container_id in refs:
+            pipe.type(self._container_key(host_name, container_id))
+        key_types = pipe.execute()
+        legacy_refs = [ref for ref, key_type in zip(refs, key_types) if decode_value(key_type) == "string"]
+
+        for start in range(0, len(legacy_refs), 1000):
+            chunk = legacy_refs[start:start + 1000]
+            values = self.client.mget([self._container_key(*ref) for ref in chunk])
+            pipe = self.client.pipeline(transaction=True)
+            for (host_name, container_id), value in zip(chunk, values):
+                if value:
+                    self._write_container(pipe, host_name, container_id, json.loads(value))
+            pipe.execute()
+
+        hash_refs = [ref for ref, key_type in zip(refs, key_types) if decode_value(key_type) == "hash"]
+        for start in range(0, len(hash_refs), 1000):
+            chunk = hash_refs[start:start + 1000]
+            values = self.client.mget([self._info_key(*ref) for ref in chunk])
+            pipe = self.client.pipeline(transaction=False)
+            for ref, value in zip(chunk, values):
+                if value:
+                    ports = (self._decode_info(value).get("NetworkSettings") or {}).get("Ports") or {}
+                    pipe.hset(self._container_key(*ref), "ports", json.dumps(ports))
+            pipe.execute()
+
+        old_hosts = self._get_host_names()
+
+        pipe = self.client.pipeline(transaction=True)
+        for host_name in old_hosts - set(ids_by_host):
+            pipe.delete(self._host_index_key(host_name))
+        pipe.delete(self.HOSTS_INDEX_KEY)
+        for host_name, container_ids in ids_by_host.items():
+            pipe.delete(self._host_index_key(host_name))
+            pipe.sadd(self._host_index_key(host_name), *container_ids)
+            pipe.sadd(self.HOSTS_INDEX_KEY, host_name)
+        pipe.execute()
+
+        exporters_count = self._rebuild_exporters_index(ids_by_host)
+        self.client.set(self.LAYOUT_VERSION_KEY, self.LAYOUT_VERSION)
+        logger.info(
+            f"Rebuilt containers index for {len(ids_by_host)} hosts ({exporters_count} exporters), "
+            f"migrated {len(legacy_refs)} containers to hash layout"
+        )
+
+    def _get_host_names(self) -> set[str]:
+        """
+        Возвращает имена хостов, для которых в Redis есть контейнеры.
+
+        Returns:
+            set[str]: Имена хостов
+        """
+        return {decode_value(host_name) for host_name in self.client.smembers(self.HOSTS_INDEX_KEY)}
+
+    def _get_container_ids(self, host_names: list[str]) -> dict[str, set[str]]:
+        """
+        Возвращает идентификаторы контейнеров для каждого хоста.
+
+        Args:
+            host_names: Имена хостов
+
+        Returns:
+            dict[str, set[str]]: Имя хоста -> идентификаторы контейнеров
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for host_name in host_names:
+            pipe.smembers(self._host_index_key(host_name))
+        return {
+            host_name: {decode_value(container_id) for container_id in container_ids}
+            for host_name, container_ids in zip(host_names, pipe.execute())
+        }
 
     def upload_containers(self, containers: dict, host_name: str) -> None:
         """
@@ -32,11 +451,15 @@ class DockerContainers(RedisConnection):
             containers: Словарь с данными о контейнерах (id -> data)
             host_name: Имя хоста, к которому относятся контейнеры
         """
-        pipe = self.client.pipeline()
+        if not containers:
+            return
+        old_names = self._get_names(host_name, list(containers))
+        pipe = self.client.pipeline(transaction=True)
+        self._delete_exporters(pipe, host_name, old_names.values())
         for container_id, data in containers.items():
-            if isinstance(data, dict):
-                data.setdefault("host_name", host_name)
-            pipe.set(f"container:{host_name}:{container_id}", json.dumps(data))
+            self._write_container(pipe, host_name, container_id, data)
+        pipe.sadd(self._host_index_key(host_name), *containers.keys())
+        pipe.sadd(self.HOSTS_INDEX_KEY, host_name)
         pipe.execute()
 
     def upload_container(self, container_id: str, container_data: dict, host_name: str) -> None:
@@ -48,81 +471,389 @@ class DockerContainers(RedisConnection):
             container_data: Данные о контейнере
             host_name: Имя хоста, к которому относится контейнер
         """
-        if isinstance(container_data, dict):
-            container_data.setdefault("host_name", host_name)
-        self.client.set(f"container:{host_name}:{container_id}", json.dumps(container_data))
+        self.upload_containers({container_id: container_data}, host_name)
 
-    def get_containers(self, host_name: str | None = None) -> dict:
+    def get_container_refs(self, host_name: str | None = None) -> list[tuple[str, str]]:
         """
-        Получает все контейнеры из Redis.
+        Возвращает ссылки на контейнеры, отсортированные по хосту и идентификатору.
+
+        Порядок стабилен между запросами, поэтому используется для постраничной выдачи.
 
         Args:
-            host_name: Имя хоста для фильтрации. Если None, возвращает все контейнеры.
+            host_name: Имя хоста для фильтрации. Если None, возвращает контейнеры всех хостов.
 
         Returns:
-            dict: Словарь с данными о контейнерах (container_id -> data)
+            list[tuple[str, str]]: Пары (имя хоста, идентификатор контейнера)
         """
-        pattern = f"container:{host_name}:*" if host_name else "container:*"
-        container_keys = self.client.keys(pattern)
-        if not container_keys:
-            return {}
+        host_names = [host_name] if host_name else sorted(self._get_host_names())
+        ids_by_host = self._get_container_ids(host_names)
+        return sorted(
+            (key_host_name, container_id)
+            for key_host_name, container_ids in ids_by_host.items()
+            for container_id in container_ids
+        )
+
+    def get_containers_by_refs(self, refs: list[tuple[str, str]], summary: bool = False) -> list[dict]:
+        """
+        Получает контейнеры по ссылкам одним pipeline.
 
-        containers: dict = {}
-        pipe = self.client.pipeline()
+        Args:
+            refs: Пары (имя хоста, идентификатор контейнера)
+            summary: Если True, info содержит только краткие поля и полный docker inspect не читается.
 
-        for key in container_keys:
-            pipe.get(key)
+        Returns:
+            list[dict]: Данные о контейнерах в порядке refs; пустой словарь, если контейнер не найден
+        """
+        if not refs:
+            return []
 
+        pipe = self.client.pipeline(transaction=False)
+        for host_name, container_id in refs:
+            pipe.hmget(self._container_key(host_name, container_id), self.SUMMARY_FIELDS)
+            if not summary:
+                pipe.get(self._info_key(host_name, container_id))
         values = pipe.execute()
+        step = 1 if summary else 2
 
-        for key, value in zip(container_keys, values):
-            if not value:
-                continue
-
-            key_str = key.decode("utf-8") if isinstance(key, bytes) else key
-            _, key_host_name, container_id = key_str.split(":", 2)
+        containers = []
+        for index in range(len(refs)):
+            data = self._from_summary_fields(values[index * step])
+            if data and not summary:
+                data["info"] = self._decode_info(values[index * step + 1]) or data["info"]
+            containers.append(data)
+        return containers
 
-            data = json.loads(value)
+    def get_containers(self, host_name: str | None = None, summary: bool = False) -> dict:
+        """
+        Получает все контейнеры из Redis.
 
-            if isinstance(data, dict):
-                data.setdefault("host_name", key_host_name)
+        Args:
+            host_name: Имя хоста для фильтрации. Если None, возвращает все контейнеры.
+            summary: Если True, info содержит только краткие поля и полный docker inspect не читается.
 
-            containers[container_id] = data
-        return containers
+        Returns:
+            dict: Словарь с данными о контейнерах (container_id -> data)
+        """
+        refs = self.get_container_refs(host_name)
+        return {
+            container_id: data
+            for (_, container_id), data in zip(refs, self.get_containers_by_refs(refs, summary))
+            if data
+        }
 
-    def get_container(self, container_id: str, host_id: str) -> dict:
+    def get_container(self, container_id: str, host_id: str, summary: bool = False) -> dict:
         """
         Возвращает один контейнер по id и имени хоста.
 
         Args:
             container_id: Идентификатор контейнера
             host_id: Идентификатор хоста
+            summary: Если True, info содержит только краткие поля
 
         Returns:
             dict: Данные о контейнере или пустой словарь, если не найден
         """
-        key = f"container:{host_id}:{container_id}"
-        value = self.client.get(key)
-        if not value:
-            return {}
-        data = json.loads(value)
-        if isinstance(data, dict):
-            data.setdefault("host_name", host_id)
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hmget(self._container_key(host_id, container_id), self.SUMMARY_FIELDS)
+        if not summary:
+            pipe.get(self._info_key(host_id, container_id))
+        values = pipe.execute()
+
+        data = self._from_summary_fields(values[0])
+        if data and not summary:
+            data["info"] = self._decode_info(values[1]) or data["info"]
         return data
 
+    def get_published_ports(self, host_name: str) -> set[int]:
+        """
+        Возвращает порты хоста, опубликованные его контейнерами.
+
+        Учитываются привязки портов запущенных контейнеров (NetworkSettings.Ports) и,
+        если docker inspect сохранен полностью, привязки из HostConfig.PortBindings.
+
+        Args:
+            host_name: Имя хоста
+
+        Returns:
+            set[int]: Занятые порты хоста
+        """
+        ports = set()
+        for data in self.get_containers(host_name).values():
+            info = data.get("info") or {}
+            for bindings_map in (
+                (info.get("NetworkSettings") or {}).get("Ports"),
+                (info.get("HostConfig") or {}).get("PortBindings"),
+            ):
+                for bindings in (bindings_map or {}).values():
+                    for binding in bindings or []:
+                        host_port = (binding or {}).get("HostPort")
+                        if host_port and str(host_port).isdigit():
+                            ports.add(int(host_port))
+        return ports
+
+    def find_container_host(self, container_id: str) -> str | None:
+        """
+        Ищет хост, на котором находится контейнер.
+
+        Args:
+            container_id: Идентификатор контейнера
+
+        Returns:
+            str | None: Имя хоста или None, если контейнер не найден
+        """
+        host_names = sorted(self._get_host_names())
+        pipe = self.client.pipeline(transaction=False)
+        for host_name in host_names:
+            pipe.sismember(self._host_index_key(host_name), container_id)
+        for host_name, is_member in zip(host_names, pipe.execute()):
+            if is_member:
+                return host_name
+        return None
+
+    def find_exporters(self, lookups: list[tuple[str | None, str]]) -> list[dict | None]:
+        """
+        Находит экспортеры по индексу за два обращения к Redis независимо от числа контейнеров.
+
+        Для каждой пары (хост, имя) сначала ищется экспортер на указанном хосте,
+        затем - экспортер с тем же именем на любом хосте.
+
+        Args:
+            lookups: Пары (имя хоста или None, имя контейнера экспортера)
+
+        Returns:
+            list[dict | None]: Записи экспортеров (container_id, name, status, image, created,
+                host_name) в порядке lookups; None, если экспортер не найден
+        """
+        names = [self.exporter_index_name(exporter_name) for _, exporter_name in lookups]
+
+        pipe = self.client.pipeline(transaction=False)
+        for (host_name, _), exporter_name in zip(lookups, names):
+            pipe.hmget(self._exporter_key(host_name or "", exporter_name or ""), self.EXPORTER_FIELDS)
+            pipe.smembers(self._exporter_hosts_key(exporter_name or ""))
+        values = pipe.execute()
+
+        result: list[dict | None] = []
+        fallback = []
+        for index, exporter_name in enumerate(names):
+            exporter = self._from_exporter_fields(values[index * 2]) if exporter_name else None
+            result.append(exporter)
+            if exporter is None and exporter_name:
+                hosts = sorted(decode_value(host) for host in values[index * 2 + 1])
+                if hosts:
+                    fallback.append((index, hosts[0], exporter_name))
+
+        if fallback:
+            pipe = self.client.pipeline(transaction=False)
+            for _, host_name, exporter_name in fallback:
+                pipe.hmget(self._exporter_key(host_name, exporter_name), self.EXPORTER_FIELDS)
+            for (index, _, _), fields in zip(fallback, pipe.execute()):
+                result[index] = self._from_exporter_fields(fields)
+        return result
+
+    def find_exporter(self, exporter_name: str, host_name: str | None = None) -> dict | None:
+        """
+        Находит экспортер по имени: сначала на указанном хосте, затем на любом.
+
+        Args:
+            exporter_name: Имя контейнера экспортера
+            host_name: Имя хоста, на котором ожидается экспортер
+
+        Returns:
+            dict | None: Запись экспортера или None, если экспортер не найден
+        """
+        return self.find_exporters([(host_name, exporter_name)])[0]
+
+    def _from_exporter_fields(self, values: list) -> dict | None:
+        """
+        Собирает запись экспортера из полей hash.
+
+        Args:
+            values: Значения полей EXPORTER_FIELDS в порядке их перечисления
+
+        Returns:
+            dict | None: Запись экспортера или None, если запись не найдена
+        """
+        fields = dict(zip(self.EXPORTER_FIELDS, (decode_value(value) for value in values)))
+        if fields["container_id"] is None:
+            return None
+        return fields
+
+    def _get_digests(self, host_name: str, container_ids: list[str]) -> dict[str, str | None]:
+        """
+        Возвращает сохраненные digest контейнеров хоста.
+
+        Args:
+            host_name: Имя хоста
+            container_ids: Идентификаторы контейнеров
+
+        Returns:
+            dict[str, str | None]: Идентификатор контейнера -> digest
+        """
+        pipe = self.client.pipeline(transaction=False)
+        for container_id in container_ids:
+            pipe.hget(self._container_key(host_name, container_id), self.DIGEST_FIELD)
+        return {
+            container_id: decode_value(digest)
+            for container_id, digest in zip(container_ids, pipe.execute())
+        }
+
+    def sync_host_containers(self, containers: dict, host_name: str) -> dict[str, list[str]]:
+        """
+        Синхронизирует набор контейнеров хоста в Redis.
+
+        Записываются только новые контейнеры и контейнеры с изменившимся digest,
+        удаляются только исчезнувшие. Контейнеры других хостов не затрагиваются.
+        Непустой набор изменений публикуется в канал containers:changes.
+        Изменения вычисляются и записываются под WATCH индекса хоста: если индекс
+        одновременно изменил другой воркер, синхронизация повторяется по новым данным.
+
+        Args:
+            containers: Словарь с данными о контейнерах (id -> data)
+            host_name: Имя хоста, к которому относятся контейнеры
+
+        Returns:
+            dict[str, list[str]]: Идентификаторы добавленных (added), измененных (changed)
+                и удаленных (removed) контейнеров
+        """
+        index_key = self._host_index_key(host_name)
+        digests = {container_id: self.digest(data) for container_id, data in containers.items()}
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(index_key)
+                    changes, old_names = self._diff_host_containers(host_name, digests)
+                    pipe.multi()
+                    self._queue_host_sync(pipe, host_name, containers, digests, changes, old_names)
+                    pipe.execute()
+                    return changes
+                except WatchError:
+                    continue
+
+    def _diff_host_containers(
+        self, host_name: str, digests: dict[str, str]
+    ) -> tuple[dict[str, list[str]], dict[str, str | None]]:
+        """
+        Сравнивает новый набор контейнеров хоста с сохраненным.
+
+        Args:
+            host_name: Имя хоста
+            digests: Идентификатор контейнера -> digest нового содержимого
+
+        Returns:
+            tuple[dict[str, list[str]], dict[str, str | None]]: Изменения (added, changed, removed)
+                и сохраненные имена измененных и удаленных контейнеров
+        """
+        old_ids = self._get_container_ids([host_name])[host_name]
+        old_digests = self._get_digests(host_name, sorted(old_ids & set(digests)))
+
+        changes = {"added": [], "changed": [], "removed": sorted(old_ids - set(digests))}
+        for container_id, digest in digests.items():
+            if container_id not in old_ids:
+                changes["added"].append(container_id)
+            elif old_digests.get(container_id) != digest:
+                changes["changed"].append(container_id)
+
+        old_names = self._get_names(host_name, changes["changed"] + changes["removed"])
+        return changes, old_names
+
+    def _queue_host_sync(
+        self,
+        pipe,
+        host_name: str,
+        containers: dict,
+        digests: dict[str, str],
+        changes: dict[str, list[str]],
+        old_names: dict[str, str | None],
+    ) -> None:
+        """
+        Добавляет в транзакцию запись изменений контейнеров хоста и их публикацию.
+
+        Args:
+            pipe: Pipeline Redis в режиме транзакции
+            host_name: Имя хоста
+            containers: Словарь с данными о контейнерах (id -> data)
+            digests: Идентификатор контейнера -> digest содержимого
+            changes: Изменения (см. _diff_host_containers)
+            old_names: Сохраненные имена измененных и удаленных контейнеров
+        """
+        index_key = self._host_index_key(host_name)
+        removed_ids = changes["removed"]
+        # Записи экспортеров удаляются до записи контейнеров: переименованный
+        # или пересозданный экспортер получит новую запись ниже
+        self._delete_exporters(pipe, host_name, old_names.values())
+        for container_id in changes["added"] + changes["changed"]:
+            self._write_container(pipe, host_name, container_id, containers[container_id], digests[container_id])
+
+        if removed_ids:
+            pipe.delete(*[self._container_key(host_name, container_id) for container_id in removed_ids])
+            pipe.delete(*[self._info_key(host_name, container_id) for container_id in removed_ids])
+            pipe.srem(index_key, *removed_ids)
+        if changes["added"]:
+            pipe.sadd(index_key, *changes["added"])
+        if containers:
+            pipe.sadd(self.HOSTS_INDEX_KEY, host_name)
+        else:
+            pipe.delete(index_key)
+            pipe.srem(self.HOSTS_INDEX_KEY, host_name)
+        if any(changes.values()):
+            pipe.publish(self.CHANGES_CHANNEL, json.dumps({
+                "host_id": host_name,
+                "timestamp": time.time(),
+                **changes,
+            }))
+
+    def delete_containers_except_hosts(self, host_names: set[str]) -> dict[str, list[str]]:
+        """
+        Удаляет контейнеры хостов, которых нет в переданном множестве.
+
+        Удаление публикуется в канал containers:changes так же, как при синхронизации хоста.
+
+        Args:
+            host_names: Имена хостов, контейнеры которых нужно сохранить
+
+        Returns:
+            dict[str, list[str]]: Имя хоста -> идентификаторы удаленных контейнеров
+        """
+        removed = {}
+        for host_name in self._get_host_names() - set(host_names):
+            removed[host_name] = self.sync_host_containers({}, host_name)["removed"]
+        return removed
+
     def delete_all_containers_by_host(self, host_name: str = None) -> int:
         """
-        Удаляет все ключи с префиксом 'container:' из Redis.
+        Удаляет контейнеры хоста или все контейнеры из Redis.
 
         Args:
             host_name: Имя хоста для фильтрации. Если None, удаляет все контейнеры.
 
         Returns:
-            int: Количество удаленных ключей
+            int: Количество удаленных контейнеров
         """
-        pattern = f"container:{host_name}:*" if host_name else "container:*"
-        container_keys = self.client.keys(pattern)
-        if not container_keys:
-            return 0
-        deleted_count = self.client.delete(*container_keys)
-        return deleted_count
+        host_names = [host_name] if host_name else sorted(self._get_host_names())
+        ids_by_host = self._get_container_ids(host_names)
+
+        refs = [
+            (key_host_name, container_id)
+            for key_host_name, container_ids in ids_by_host.items()
+            for container_id in container_ids
+        ]
+        chunks = [refs[start:start + 500] for start in range(0, len(refs), 500)]
+        old_names = {
+            key_host_name: self._get_names(key_host_name, sorted(container_ids)).values()
+            for key_host_name, container_ids in ids_by_host.items()
+        }
+
+        pipe = self.client.pipeline(transaction=True)
+        for chunk in chunks:
+            pipe.delete(*[self._container_key(*ref) for ref in chunk])
+        for chunk in chunks:
+            pipe.delete(*[self._info_key(*ref) for ref in chunk])
+        for key_host_name in host_names:
+            pipe.delete(self._host_index_key(key_host_name))
+            self._delete_exporters(pipe, key_host_name, old_names.get(key_host_name, []))
+        if host_name:
+            pipe.srem(self.HOSTS_INDEX_KEY, host_name)
+        else:
+            pipe.delete(self.HOSTS_INDEX_KEY)
+        results = pipe.execute()
+        return sum(results[:len(chunks)])
@@ -3,7 +3,7 @@
 import json
 import logging
 
-from app.db.redis.redis_connection import RedisConnection
+from app.db.redis.redis_connection import RedisConnection, decode_value
 
 logger = logging.getLogger(__name__)
 
@@ -13,16 +13,37 @@ class Hosts(RedisConnection):
     Класс для управления информацией о хостах в Redis.
 
     Предоставляет методы для загрузки, получения и удаления данных о хостах.
+    Хост хранится по ключу host:{host_id}, идентификаторы хостов - в множестве hosts:index.
     """
 
+    INDEX_KEY = "hosts:index"
+    INDEX_READY_KEY = "hosts:index_ready"
+
     def __init__(self) -> None:
         """
         Инициализация класса Hosts.
 
-        Создает подключение к Redis.
+        Создает подключение к Redis и при первом запуске строит индекс по существующим ключам.
         """
         super().__init__()
         self.client = self.connect()
+        if not self.client.exists(self.INDEX_READY_KEY):
+            self.rebuild_index()
+
+    def rebuild_index(self) -> None:
+        """
+        Перестраивает индекс хостов по ключам host:* неблокирующим SCAN.
+        """
+        host_ids = [
+            decode_value(key).split(":", 1)[1]
+            for key in self.client.scan_iter(match="host:*", count=1000)
+        ]
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(self.INDEX_KEY)
+        if host_ids:
+            pipe.sadd(self.INDEX_KEY, *host_ids)
+        pipe.set(self.INDEX_READY_KEY, 1)
+        pipe.execute()
 
     def upload_hosts(self, hosts: dict) -> None:
         """
@@ -31,9 +52,34 @@ class Hosts(RedisConnection):
         Args:
             hosts: Словарь с данными о хостах (host_id -> data)
         """
-        pipe = self.client.pipeline()
+        if not hosts:
+            return
+        pipe = self.client.pipeline(transaction=True)
+        for host_id, data in hosts.items():
+            pipe.set(f"host:{host_id}", json.dumps(data))
+        pipe.sadd(self.INDEX_KEY, *hosts.keys())
+        pipe.execute()
+
+    def replace_hosts(self, hosts: dict) -> None:
+        """
+        Заменяет набор хостов в Redis одной транзакцией.
+
+        Записи хостов обновляются на месте, хосты, которых нет в hosts, удаляются,
+        поэтому читатели не видят пустого списка во время обновления.
+
+        Args:
+            hosts: Словарь с данными о хостах (host_id -> data)
+        """
+        stale_ids = {decode_value(host_id) for host_id in self.client.smembers(self.INDEX_KEY)} - set(hosts)
+
+        pipe = self.client.pipeline(transaction=True)
         for host_id, data in hosts.items():
             pipe.set(f"host:{host_id}", json.dumps(data))
+        if hosts:
+            pipe.sadd(self.INDEX_KEY, *hosts.keys())
+        if stale_ids:
+            pipe.delete(*[f"host:{host_id}" for host_id in stale_ids])
+            pipe.srem(self.INDEX_KEY, *stale_ids)
         pipe.execute()
 
     def get_hosts(self) -> dict[str, dict]:
@@ -43,25 +89,16 @@ class Hosts(RedisConnection):
         Returns:
             dict[str, dict]: Словарь с данными о хостах (host_id -> data)
         """
-        keys = self.client.keys("host:*")
+        host_ids = [decode_value(host_id) for host_id in self.client.smembers(self.INDEX_KEY)]
 
-        if not keys:
+        if not host_ids:
             return {}
 
-        pipe = self.client.pipeline()
-        for key in keys:
-            pipe.get(key)
-
-        values = pipe.execute()
+        values = self.client.mget([f"host:{host_id}" for host_id in host_ids])
 
         hosts = {}
-        for key, value in zip(keys, values):
+        for host_id, value in zip(host_ids, values):
             if value:
-                host_id = (
-                    key.decode('utf-8').split(':')[1]
-                    if isinstance(key, bytes)
-                    else key.split(':')[1]
-                )
                 hosts[host_id] = json.loads(value)
         return hosts
 
@@ -78,17 +115,21 @@ class Hosts(RedisConnection):
         if host_id:
             # Удаляем конкретный хост по точному ключу
             key = f"host:{host_id}"
-            deleted_count = self.client.delete(key)
+            pipe = self.client.pipeline(transaction=True)
+            pipe.delete(key)
+            pipe.srem(self.INDEX_KEY, host_id)
+            deleted_count = pipe.execute()[0]
             logger.debug(f"Deleted host key: {key}, count: {deleted_count}")
             return deleted_count
-        else:
-            # Удаляем все хосты
-            pattern = "host:*"
-            container_keys = self.client.keys(pattern)
-            if not container_keys:
-                logger.debug("Хосты не найдены")
-                return 0
-            deleted_count = self.client.delete(*container_keys)
-            logger.debug(f"Deleted all hosts, count: {deleted_count}")
-            return deleted_count
 
+        # Удаляем все хосты
+        host_ids = [decode_value(index_host_id) for index_host_id in self.client.smembers(self.INDEX_KEY)]
+        if not host_ids:
+            logger.debug("Хосты не найдены")
+            return 0
+        pipe = self.client.pipeline(transaction=True)
+        pipe.delete(*[f"host:{index_host_id}" for index_host_id in host_ids])
+        pipe.delete(self.INDEX_KEY)
+        deleted_count = pipe.execute()[0]
+        logger.debug(f"Deleted all hosts, count: {deleted_count}")
+        return deleted_count
@@ -0,0 +1,186 @@
+"""Bulk onboarding jobs Redis storage module."""
+
+import json
+import logging
+import time
+
+from app.config import settings
+from app.db.redis.redis_connection import RedisConnection, decode_value
+
+logger = logging.getLogger(__name__)
+
+
+class OnboardingJobs(RedisConnection):
+    """
+    Состояние задач массового подключения контейнеров к мониторингу в Redis.
+
+    Хранение:
+    - onboarding:{job_id} - hash задачи (status, selector, total, created_at, finished_at,
+      main_config, error);
+    - onboarding:{job_id}:items - hash container_id -> JSON состояния элемента (host_id, name,
+      status, error, config_id, port, job_name). Статусы элемента: pending, generating,
+      starting_exporter, exporter_started, exporter_started_unregistered (экспортер запущен,
+      но не зарегистрирован в основном конфиге), registered, failed;
+    - onboarding:{job_id}:lock - блокировка выполнения задачи одним воркером.
+    Ключи живут settings.onboarding_job_ttl секунд.
+    """
+
+    KEY_PREFIX = "onboarding"
+
+    def __init__(self) -> None:
+        """
+        Инициализация класса OnboardingJobs.
+
+        Создает подключение к Redis.
+        """
+        super().__init__()
+        self.client = self.connect()
+        self.ttl = settings.onboarding_job_ttl
+
+    def _job_key(self, job_id: str) -> str:
+        """
+        Формирует ключ задачи.
+
+        Args:
+            job_id: Идентификатор задачи
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"{self.KEY_PREFIX}:{job_id}"
+
+    def _items_key(self, job_id: str) -> str:
+        """
+        Формирует ключ элементов задачи.
+
+        Args:
+            job_id: Идентификатор задачи
+
+        Returns:
+            str: Ключ Redis
+        """
+        return f"{self.KEY_PREFIX}:{job_id}:items"
+
+    def create_job(self, job_id: str, selector: dict, items: dict[str, dict]) -> None:
+        """
+        Создает задачу со всеми элементами в статусе pending.
+
+        Args:
+            job_id: Идентификатор задачи
+            selector: Селектор, по которому выбраны контейнеры
+            items: Элементы задачи (container_id -> состояние)
+        """
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(self._job_key(job_id), mapping={
+            "status": "pending",
+            "selector": json.dumps(selector),
+            "total": len(items),
+            "created_at": time.time(),
+        })
+        if items:
+            pipe.hset(self._items_key(job_id), mapping={
+                container_id: json.dumps(item) for container_id, item in items.items()
+            })
+        pipe.expire(self._job_key(job_id), self.ttl)
+        pipe.expire(self._items_key(job_id), self.ttl)
+        pipe.execute()
+
+    def set_status(self, job_id: str, status: str, **fields) -> None:
+        """
+        Обновляет статус задачи.
+
+        Args:
+            job_id: Идентификатор задачи
+            status: Статус (pending, running, completed, partial, failed)
+            **fields: Дополнительные поля задачи, значения сериализуются в JSON
+        """
+        mapping = {"status": status, **{key: json.dumps(value) for key, value in fields.items()}}
+        if status in ("completed", "partial", "failed"):
+            mapping["finished_at"] = time.time()
+        self.client.hset(self._job_key(job_id), mapping=mapping)
+
+    def acquire_lock(self, job_id: str, ttl: int) -> bool:
+        """
+        Захватывает блокировку выполнения задачи.
+
+        Блокировка не дает двум воркерам выполнять одну задачу одновременно (например,
+        при повторной доставке сообщения Celery) и снимается по TTL, если воркер остановлен.
+
+        Args:
+            job_id: Идентификатор задачи
+            ttl: Время жизни блокировки в секундах
+
+        Returns:
+            bool: True, если блокировка захвачена
+        """
+        return bool(self.client.set(f"{self._job_key(job_id)}:lock", 1, nx=True, ex=ttl))
+
+    def release_lock(self, job_id: str) -> None:
+        """
+        Снимает блокировку выполнения задачи.
+
+        Args:
+            job_id: Идентификатор задачи
+        """
+        self.client.delete(f"{self._job_key(job_id)}:lock")
+
+    def is_locked(self, job_id: str) -> bool:
+        """
+        Проверяет, выполняется ли задача.
+
+        Args:
+            job_id: Идентификатор задачи
+
+        Returns:
+            bool: True, если блокировка выполнения задачи захвачена
+        """
+        return bool(self.client.exists(f"{self._job_key(job_id)}:lock"))
+
+    def update_items(self, job_id: str, items: dict[str, dict]) -> None:
+        """
+        Записывает состояние элементов задачи.
+
+        Args:
+            job_id: Идентификатор задачи
+            items: Состояния элементов (container_id -> состояние)
+        """
+        if items:
+            self.client.hset(self._items_key(job_id), mapping={
+                container_id: json.dumps(item) for container_id, item in items.items()
+            })
+
+    def get_job(self, job_id: str) -> dict | None:
+        """
+        Возвращает задачу с элементами и количеством элементов по статусам.
+
+        Args:
+            job_id: Идентификатор задачи
+
+        Returns:
+            dict | None: Задача или None, если задача не найдена или истекла
+        """
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._job_key(job_id))
+        pipe.hgetall(self._items_key(job_id))
+        job, items = pipe.execute()
+        if not job:
+            return None
+
+        job = {decode_value(key): decode_value(value) for key, value in job.items()}
+        items = {decode_value(key): json.loads(decode_value(value)) for key, value in items.items()}
+        counts: dict[str, int] = {}
+        for item in items.values():
+            counts[item["status"]] = counts.get(item["status"], 0) + 1
+
+        return {
+            "job_id": job_id,
+            "status": job["status"],
+            "selector": json.loads(job.get("selector") or "{}"),
+            "total": int(job.get("total") or 0),
+            "created_at": float(job["created_at"]) if job.get("created_at") else None,
+            "finished_at": float(job["finished_at"]) if job.get("finished_at") else None,
+            "main_config": json.loads(job["main_config"]) if job.get("main_config") else None,
+            "error": json.loads(job["error"]) if job.get("error") else None,
+            "counts": counts,
+            "items": items,
+        }
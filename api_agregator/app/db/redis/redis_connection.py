@@ -10,6 +10,19 @@ from dotenv import load_dotenv
 logger = logging.getLogger(__name__)
 
 
+def decode_value(value):
+    """
+    Приводит ответ Redis к строке, если клиент создан без decode_responses.
+
+    Args:
+        value: Значение из Redis
+
+    Returns:
+        Строка или исходное значение
+    """
+    return value.decode("utf-8") if isinstance(value, bytes) else value
+
+
 class RedisConnection:
     """
     Класс для подключения к Redis.
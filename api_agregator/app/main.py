@@ -8,6 +8,8 @@ from fastapi.responses import JSONResponse
 from sqlalchemy.exc import OperationalError, SQLAlchemyError
 
 from app.routers import containers, hosts, prometheus
+from app.services.api_getaway import close_async_clients, get_upstreams_stats
+from app.services.minio_service import ensure_bucket
 
 logger = logging.getLogger(__name__)
 
@@ -117,3 +119,36 @@ async def health_check():
         dict: Статус здоровья
     """
     return {"status": "healthy"}
+
+
+@app.get("/metrics/upstreams")
+async def upstreams_metrics():
+    """
+    Метрики HTTP запросов к внешним сервисам.
+
+    Returns:
+        dict: Базовый URL сервиса -> количество запросов, ошибок и повторов, задержки,
+            состояние circuit breaker и переиспользование соединений
+    """
+    return get_upstreams_stats()
+
+
+@app.on_event("startup")
+def init_minio():
+    """
+    Создает общий клиент MinIO и проверяет наличие бакета при старте приложения.
+
+    Недоступность MinIO не мешает запуску: операции с конфигурациями вернут ошибку позже.
+    """
+    try:
+        ensure_bucket()
+    except Exception as e:
+        logger.error("Failed to initialize MinIO bucket: %s", e)
+
+
+@app.on_event("shutdown")
+async def close_http_clients():
+    """
+    Закрывает соединения асинхронных HTTP клиентов при остановке приложения.
+    """
+    await close_async_clients()
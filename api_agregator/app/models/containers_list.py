@@ -0,0 +1,24 @@
+"""Container listing models module."""
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+
+class ContainerListFilters(BaseModel):
+    """
+    Фильтры постраничного списка контейнеров.
+
+    Attributes:
+        host_id: Идентификатор хоста
+        stack: Технологический стек (результат классификации или стек конфигурации)
+        state: Статус контейнера (State.Status), например running или exited
+        has_prometheus_config: Есть ли у контейнера конфигурация Prometheus
+        exporter_running: Запущен ли экспортер контейнера
+    """
+
+    host_id: Optional[str] = None
+    stack: Optional[str] = None
+    state: Optional[str] = None
+    has_prometheus_config: Optional[bool] = None
+    exporter_running: Optional[bool] = None
@@ -1,6 +1,6 @@
 """Main Prometheus configuration models module."""
 
-from typing import Dict, Any
+from typing import Dict, Any, Optional
 
 from pydantic import BaseModel
 
@@ -13,11 +13,19 @@ class AddServiceRequest(BaseModel):
         scrape_config: Конфигурация scrape для Prometheus
         target: Целевой адрес или список адресов
         target_name: Имя целевого файла
+        exporter_name: Имя контейнера экспортера. Если не задано, определяется по job_name
+        stack: Стек сервиса. Если не задан, определяется по job_name
+        host: Хост сервиса. Если не задан, определяется по job_name
+        container_name: Имя контейнера сервиса. Если не задано, определяется по job_name
     """
 
     scrape_config: Dict[str, Any]
     target: list | dict
     target_name: str
+    exporter_name: Optional[str] = None
+    stack: Optional[str] = None
+    host: Optional[str] = None
+    container_name: Optional[str] = None
 
 
 class RemoveServiceRequest(BaseModel):
@@ -0,0 +1,34 @@
+"""Bulk onboarding models module."""
+
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class OnboardingRequest(BaseModel):
+    """
+    Модель запроса массового подключения контейнеров к мониторингу.
+
+    Контейнеры выбираются по всем заданным условиям одновременно; нужно задать хотя бы одно.
+
+    Attributes:
+        host_id: Идентификатор хоста
+        stack: Технологический стек (результат классификации)
+        labels: Метки контейнера: значение None - метка должна присутствовать, иначе - совпадать
+        container_ids: Идентификаторы контейнеров
+        port_start: Желаемый внешний порт экспортеров. Если не задан, используется порт
+            из конфигурации экспортера. На каждом хосте экспортерам выдаются свободные порты,
+            начиная с желаемого: занятые контейнерами хоста и выданные в задаче пропускаются
+        concurrency: Количество одновременно обрабатываемых контейнеров
+        regenerate: Генерировать конфигурацию заново, даже если она уже есть
+        add_to_main_config: Зарегистрировать jobs в основном конфиге Prometheus
+    """
+
+    host_id: Optional[str] = None
+    stack: Optional[str] = None
+    labels: Dict[str, Optional[str]] = Field(default_factory=dict)
+    container_ids: List[str] = Field(default_factory=list)
+    port_start: Optional[int] = Field(default=None, ge=1, le=65535)
+    concurrency: Optional[int] = Field(default=None, ge=1, le=64)
+    regenerate: bool = False
+    add_to_main_config: bool = True
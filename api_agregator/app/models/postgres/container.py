@@ -27,6 +27,8 @@ class Container(Base):
     classification_score = Column(JSON)
 
     docker_info = Column(JSON, nullable=False)
+    # digest данных контейнера из синхронизации: строка перезаписывается только при его изменении
+    digest = Column(String(64))
 
     created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
@@ -1,15 +1,22 @@
 """Containers API router module."""
 
+import json
 import logging
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 
-from app.db.postgres.database import get_db
+from app.db.postgres.database import SessionLocal, get_db
 from app.db.redis.docker_containers import DockerContainers
+from app.models.containers_list import ContainerListFilters
 from app.models.postgres.container import Container
 from app.models.postgres.prometheus_config import PrometheusConfig
-from app.services.api_getaway import APIGateway
+from app.services.api_getaway import AsyncAPIGateway
+from app.services.classification_service import ClassificationService
+from app.services.container_configs_service import ContainerConfigsService
+from app.services.containers_listing import ContainersListing
 from app.services.hosts_service import HostsService
 from app.services.minio_service import MinioService
 from app.services.update_containers import UpdateContainers
@@ -18,94 +25,116 @@ router = APIRouter()
 logger = logging.getLogger(__name__)
 
 
+def _get_docker_api_url(db: Session, host_id: str) -> str | None:
+    """
+    Возвращает URL docker_api на хосте. Вызывается в пуле потоков.
+
+    Args:
+        db: Сессия базы данных
+        host_id: Идентификатор хоста
+
+    Returns:
+        str | None: URL docker_api или None, если хост не найден
+    """
+    return HostsService(db).get_docker_api_url(host_id)
+
+
+def _refresh_containers(db: Session, host_id: str) -> None:
+    """
+    Обновляет информацию о контейнерах хоста после операции с ними. Вызывается в пуле потоков.
+
+    Args:
+        db: Сессия базы данных
+        host_id: Идентификатор хоста, на котором выполнялась операция
+    """
+    UpdateContainers(db=db).upload_host_containers(host_id)
+
+
 @router.patch("/update_containers", status_code=status.HTTP_200_OK)
-async def update_containers(db: Session = Depends(get_db)):
+def update_containers(db: Session = Depends(get_db)):
     """
     Обновление информации о контейнерах по всем хостам.
 
+    Обработчик синхронный: FastAPI выполняет его в пуле потоков, поэтому опрос хостов
+    не блокирует цикл событий.
+
     Args:
         db: Сессия базы данных
 
     Returns:
-        dict: Сообщение об успешном обновлении
+        dict: Сообщение об успешном обновлении и количество добавленных,
+            измененных и удаленных контейнеров
     """
     update_containers_service = UpdateContainers(db=db)
-    update_containers_service.upload_containers()
-    return {"message": "Containers updated successfully"}
+    changes = update_containers_service.upload_containers()
+    return {"message": "Containers updated successfully", "changes": changes}
+
+
+@router.get("/classification/cache", status_code=status.HTTP_200_OK)
+def get_classification_cache_stats() -> dict:
+    """
+    Статистика кеша результатов классификации.
+
+    Returns:
+        dict: Попадания, промахи, доля попаданий, размер кеша и версия правил
+    """
+    return ClassificationService().get_cache_stats()
 
 
 @router.get("/containers", status_code=status.HTTP_200_OK)
-async def get_containers(
+def get_containers(
     host_id: str | None = Query(default=None, description="Идентификатор целевого хоста"),
+    summary: bool = Query(
+        default=False,
+        description="Вернуть в info только Id, Name, Created, State.Status, Config.Image и Config.Labels"
+    ),
     db: Session = Depends(get_db),
 ) -> dict:
     """
     Получение списка контейнеров с информацией о конфигурации Prometheus.
 
+    Конфигурации читаются из представления containers:configs, статус экспортеров - из индекса
+    экспортеров, поэтому обработчик не обращается к БД.
+
     Args:
         host_id: Идентификатор хоста для фильтрации. Если None, возвращает все контейнеры.
+        summary: Если True, полный docker inspect не читается из Redis
         db: Сессия базы данных
 
     Returns:
         dict: Словарь с данными о контейнерах (container_id -> data)
     """
     docker_containers = DockerContainers()
-    data = docker_containers.get_containers(host_name=host_id)
+    data = docker_containers.get_containers(host_name=host_id, summary=summary)
 
     if not data:
         return data
 
-    container_ids = list(data.keys())
+    config_map = ContainerConfigsService(db).get_configs(list(data.keys()))
 
-    containers_in_db = db.query(Container).filter(
-        Container.id.in_(container_ids)
-    ).all()
-    containers_set = {c.id: c for c in containers_in_db}
+    exporter_lookups = {}
+    for container_id, container_data in data.items():
+        config = config_map.get(container_id)
+        if not config or not isinstance(container_data, dict):
+            continue
+        config_host_name = (
+            config['host_name'] or
+            host_id or
+            container_data.get('host_name') or
+            container_data.get('host_id')
+        )
 
-    all_configs = db.query(PrometheusConfig).filter(
-        PrometheusConfig.container_id.in_(container_ids)
-    ).all()
+        container_name = (
+            container_data.get("info", {}).get("Name", "").lstrip("/") or
+            config['container_name']
+        )
+        if container_name:
+            exporter_lookups[container_id] = (config_host_name, f"{container_name}-exporter")
 
-    config_map = {}
-    for config in all_configs:
-        if config.container_id not in config_map:
-            config_map[config.container_id] = config
-        else:
-            existing = config_map[config.container_id]
-            if config.status == "active" and existing.status != "active":
-                config_map[config.container_id] = config
-            elif config.status == existing.status:
-                if config.created_at and existing.created_at:
-                    if config.created_at > existing.created_at:
-                        config_map[config.container_id] = config
-
-    all_containers_data = docker_containers.get_containers()
-
-    exporter_index_by_host = {}
-    exporter_index_by_name = {}
-
-    for exp_id, exp_data in all_containers_data.items():
-        if isinstance(exp_data, dict):
-            exp_name = exp_data.get("info", {}).get("Name", "").lstrip("/")
-            exp_host = exp_data.get("host_name") or exp_data.get("host_id")
-
-            if exp_name and "-exporter" in exp_name.lower():
-                exp_name_lower = exp_name.lower()
-
-                if exp_host:
-                    key = (exp_host, exp_name_lower)
-                    exporter_index_by_host[key] = {
-                        "container_id": exp_id,
-                        "data": exp_data
-                    }
-
-                if exp_name_lower not in exporter_index_by_name:
-                    exporter_index_by_name[exp_name_lower] = []
-                exporter_index_by_name[exp_name_lower].append({
-                    "container_id": exp_id,
-                    "data": exp_data,
-                    "host": exp_host
-                })
+    exporters = dict(zip(
+        exporter_lookups,
+        docker_containers.find_exporters(list(exporter_lookups.values()))
+    ))
 
     for container_id, container_data in data.items():
         if not isinstance(container_data, dict):
@@ -115,134 +144,205 @@ async def get_containers(
         container_data['has_prometheus_config'] = has_config
 
         if has_config:
-            try:
-                config = config_map[container_id]
-                config_metadata = config.config_metadata or {}
-
-                config_host_name = (
-                    config_metadata.get('host_name') or
-                    host_id or
-                    container_data.get('host_name') or
-                    container_data.get('host_id')
-                )
-
-                container_name = container_data.get("info", {}).get("Name", "").lstrip("/")
-                if not container_name and container_id in containers_set:
-                    container_name = containers_set[container_id].name.lstrip("/")
-                if not container_name:
-                    container_name = (
-                        config.container_name.lstrip("/")
-                        if config.container_name else ""
+            exporter = exporters.get(container_id)
+            if exporter:
+                config_host_name, exporter_name = exporter_lookups[container_id]
+                if exporter["host_name"] != config_host_name:
+                    logger.info(
+                        "Found exporter %s using fallback search. "
+                        "Expected host: %s, found host: %s, status=%s",
+                        exporter_name, config_host_name,
+                        exporter["host_name"], exporter["status"]
                     )
 
-                exporter_info = None
-                exporter_running = False
-                exporter_container_id = None
-
-                if container_name:
-                    exporter_name = f"{container_name}-exporter"
-                    exporter_name_lower = exporter_name.lower()
-
-                    if config_host_name:
-                        exporter_key = (config_host_name, exporter_name_lower)
-                        if exporter_key in exporter_index_by_host:
-                            exporter_entry = exporter_index_by_host[exporter_key]
-                            exp_data = exporter_entry["data"]
-                            exp_status = exp_data.get("info", {}).get("State", {}).get("Status", "")
-                            exporter_running = exp_status.lower() in ("running", "up")
-                            exporter_container_id = exporter_entry["container_id"]
-
-                            exporter_info = {
-                                "container_id": exporter_container_id,
-                                "name": (
-                                    exp_data.get("info", {})
-                                    .get("Name", "")
-                                    .lstrip("/")
-                                ),
-                                "status": exp_status,
-                                "image": (
-                                    exp_data.get("info", {})
-                                    .get("Config", {})
-                                    .get("Image", "")
-                                ),
-                            }
-
-                            logger.debug(
-                                "Found exporter %s on host %s: "
-                                "status=%s, running=%s",
-                                exporter_name, config_host_name,
-                                exp_status, exporter_running
-                            )
-
-                    if not exporter_info and exporter_name_lower in exporter_index_by_name:
-                        exporter_candidates = exporter_index_by_name[exporter_name_lower]
-                        if exporter_candidates:
-                            exporter_entry = exporter_candidates[0]
-                            exp_data = exporter_entry["data"]
-                            exp_status = exp_data.get("info", {}).get("State", {}).get("Status", "")
-                            exporter_running = exp_status.lower() in ("running", "up")
-                            exporter_container_id = exporter_entry["container_id"]
-
-                            exporter_info = {
-                                "container_id": exporter_container_id,
-                                "name": (
-                                    exp_data.get("info", {})
-                                    .get("Name", "")
-                                    .lstrip("/")
-                                ),
-                                "status": exp_status,
-                                "image": (
-                                    exp_data.get("info", {})
-                                    .get("Config", {})
-                                    .get("Image", "")
-                                ),
-                            }
-
-                            found_host = exporter_entry.get("host")
-                            logger.info(
-                                "Found exporter %s using fallback search. "
-                                "Expected host: %s, found host: %s, "
-                                "status=%s, running=%s",
-                                exporter_name, config_host_name,
-                                found_host, exp_status, exporter_running
-                            )
-                    else:
-                        logger.debug(
-                            "Exporter %s not found. "
-                            "Available exporters in index: %s",
-                            exporter_name,
-                            list(exporter_index_by_name.keys())[:10]
-                        )
-
-                container_data['prometheus_config'] = {
-                    "config_id": config.id,
-                    "status": config.status,
-                    "stack": config.stack,
-                    "exporter_image": config.exporter_image,
-                    "exporter_port": config.exporter_port,
-                    "job_name": config.job_name,
-                    "created_at": config.created_at.isoformat() if config.created_at else None,
-                    "exporter": {
-                        "exists": exporter_info is not None,
-                        "running": exporter_running,
-                        "container_id": exporter_container_id,
-                        "info": exporter_info
-                    }
-                }
-            except Exception as e:
-                logger.error(
-                    "Error processing prometheus config for container %s: %s",
-                    container_id, str(e),
-                    exc_info=True
-                )
-                container_data['prometheus_config'] = None
-                container_data['has_prometheus_config'] = False
+            container_data['prometheus_config'] = ContainersListing.build_prometheus_config(
+                config_map[container_id], exporter
+            )
         else:
             container_data['prometheus_config'] = None
 
     return data
 
 
+def get_list_filters(
+    host_id: str | None = Query(default=None, description="Идентификатор хоста"),
+    stack: str | None = Query(default=None, description="Технологический стек"),
+    state: str | None = Query(default=None, description="Статус контейнера (running, exited и т.д.)"),
+    has_prometheus_config: bool | None = Query(default=None, description="Есть конфигурация Prometheus"),
+    exporter_running: bool | None = Query(default=None, description="Экспортер запущен"),
+) -> ContainerListFilters:
+    """
+    Собирает фильтры списка контейнеров из параметров запроса.
+
+    Returns:
+        ContainerListFilters: Фильтры
+    """
+    return ContainerListFilters(
+        host_id=host_id,
+        stack=stack,
+        state=state,
+        has_prometheus_config=has_prometheus_config,
+        exporter_running=exporter_running,
+    )
+
+
+def _parse_fields(fields: str | None) -> list[str] | None:
+    """
+    Разбирает список полей для проекции.
+
+    Args:
+        fields: Пути полей через запятую
+
+    Returns:
+        list[str] | None: Пути полей или None, если проекция не задана
+    """
+    if not fields:
+        return None
+    return [field.strip() for field in fields.split(",") if field.strip()] or None
+
+
+@router.get("/containers/list", status_code=status.HTTP_200_OK)
+def list_containers(
+    filters: ContainerListFilters = Depends(get_list_filters),
+    fields: str | None = Query(
+        default=None,
+        description="Поля через запятую (пути через точку), например info.Name,info.State.Status,"
+                    "prometheus_config.exporter.running"
+    ),
+    summary: bool = Query(
+        default=True,
+        description="Если fields не задан - вернуть в info только краткие поля"
+    ),
+    cursor: str | None = Query(default=None, description="Курсор из next_cursor предыдущей страницы"),
+    limit: int = Query(
+        default=ContainersListing.DEFAULT_LIMIT, ge=1, le=ContainersListing.MAX_LIMIT,
+        description="Размер страницы"
+    ),
+    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Постраничный список контейнеров с фильтрами и проекцией полей.
+
+    Args:
+        filters: Фильтры по хосту, стеку, статусу, наличию конфигурации и статусу экспортера
+        fields: Поля для проекции
+        summary: Вернуть краткий info, если поля не заданы
+        cursor: Курсор следующей страницы
+        limit: Размер страницы
+        db: Сессия базы данных
+
+    Returns:
+        dict: items - контейнеры страницы, next_cursor - курсор следующей страницы или None
+
+    Raises:
+        HTTPException: Если курсор некорректен
+    """
+    try:
+        return ContainersListing(db).get_page(
+            filters, fields=_parse_fields(fields), summary=summary, cursor=cursor, limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+
+@router.get("/containers/stream", status_code=status.HTTP_200_OK)
+def stream_containers(
+    filters: ContainerListFilters = Depends(get_list_filters),
+    fields: str | None = Query(default=None, description="Поля через запятую (пути через точку)"),
+    summary: bool = Query(
+        default=True,
+        description="Если fields не задан - вернуть в info только краткие поля"
+    ),
+) -> StreamingResponse:
+    """
+    Список контейнеров в формате NDJSON: по одному JSON объекту на строку.
+
+    Контейнеры читаются и отправляются группами, поэтому ответ не собирается в памяти целиком.
+    Генератор использует собственную сессию БД, так как выполняется после возврата из обработчика.
+
+    Args:
+        filters: Фильтры по хосту, стеку, статусу, наличию конфигурации и статусу экспортера
+        fields: Поля для проекции
+        summary: Вернуть краткий info, если поля не заданы
+
+    Returns:
+        StreamingResponse: Поток application/x-ndjson
+    """
+    projection = _parse_fields(fields)
+
+    def generate():
+        db = SessionLocal()
+        try:
+            for item in ContainersListing(db).iter_items(filters, fields=projection, summary=summary):
+                yield json.dumps(item, default=str) + "\n"
+        finally:
+            db.close()
+
+    return StreamingResponse(generate(), media_type="application/x-ndjson")
+
+
+def _find_container(container_id: str, host_id: str | None) -> tuple[str | None, dict]:
+    """
+    Ищет контейнер в Redis. Вызывается в пуле потоков.
+
+    Args:
+        container_id: Идентификатор контейнера
+        host_id: Идентификатор хоста. Если не указан, хост определяется по индексу
+
+    Returns:
+        tuple[str | None, dict]: Идентификатор хоста и данные контейнера (или пустой словарь)
+    """
+    docker_containers = DockerContainers()
+    if not host_id:
+        host_id = docker_containers.find_container_host(container_id)
+    return host_id, docker_containers.get_container(container_id, host_id) if host_id else {}
+
+
+@router.get("/container", status_code=status.HTTP_200_OK)
+async def get_container(
+    container_id: str = Query(..., alias="id", description="Идентификатор контейнера"),
+    host_id: str | None = Query(
+        default=None, description="Идентификатор хоста. Если не указан, хост определяется по индексу"
+    ),
+    full: bool = Query(
+        default=False, description="Запросить полный docker inspect у docker_api на хосте"
+    ),
+    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Получение информации (docker inspect) об одном контейнере.
+
+    По умолчанию возвращаются данные из Redis (в объеме профиля discovery_profile).
+    С full=True полный docker inspect запрашивается у docker_api на хосте.
+
+    Args:
+        container_id: Идентификатор контейнера
+        host_id: Идентификатор хоста, на котором запущен контейнер
+        full: Запросить полный docker inspect у docker_api
+        db: Сессия базы данных
+
+    Returns:
+        dict: Данные о контейнере
+
+    Raises:
+        HTTPException: Если контейнер или хост не найден
+    """
+    host_id, container_data = await run_in_threadpool(_find_container, container_id, host_id)
+    if not container_data:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Container not found")
+
+    if full:
+        docker_api_url = await run_in_threadpool(_get_docker_api_url, db, host_id)
+        if not docker_api_url:
+            raise HTTPException(status_code=404, detail="Host not found")
+        docker_gateway = AsyncAPIGateway(docker_api_url)
+        container_data["info"] = await docker_gateway.make_request(
+            method="GET",
+            endpoint=f"/api/v1/discover/container/{container_id}"
+        )
+    return container_data
+
+
 @router.post("/container/stop", status_code=status.HTTP_200_OK)
 async def stop_container(
     container_id: str = Query(..., alias="id", description="Идентификатор контейнера"),
@@ -267,35 +367,25 @@ async def stop_container(
     """
     logger.info("Stopping container %s on host %s", container_id, host_id)
     try:
-        hosts_service = HostsService(db)
-        host_dto = hosts_service.get_host_by_id(host_id)
-        if not host_dto:
+        docker_api_url = await run_in_threadpool(_get_docker_api_url, db, host_id)
+        if not docker_api_url:
             logger.error("Host not found: %s", host_id)
             raise HTTPException(status_code=404, detail="Host not found")
 
-        # Преобразуем адрес хоста для Docker (localhost -> host.docker.internal)
-        host_address = hosts_service._resolve_host_for_docker(host_dto.host)
-        docker_api_url = f"http://{host_address}:{host_dto.port}"
-        logger.info(
-            "Resolved host address: %s -> %s, using URL: %s",
-            host_dto.host, host_address, docker_api_url
-        )
-        # Создаем APIGateway с правильным URL
-        docker_gateway = APIGateway(docker_api_url)
-        # Увеличиваем таймаут для операций с контейнерами (остановка может занять время)
-        docker_gateway.timeout = 30
+        logger.info("Resolved docker_api URL for host %s: %s", host_id, docker_api_url)
+        # Создаем AsyncAPIGateway с правильным URL
+        docker_gateway = AsyncAPIGateway(docker_api_url)
         # Увеличиваем таймаут для операций с контейнерами (остановка может занять время)
         docker_gateway.timeout = 30
         logger.info("Timeout set to: %s", docker_gateway.timeout)
 
-        result = docker_gateway.make_request(
+        result = await docker_gateway.make_request(
             method="POST",
             endpoint="/api/v1/manage/container/stop",
             json_data={"id": container_id},
         )
 
-        update_containers_service = UpdateContainers(db=db)
-        update_containers_service.upload_containers()
+        await run_in_threadpool(_refresh_containers, db, host_id)
         return result
     except HTTPException:
         raise
@@ -311,42 +401,18 @@ async def stop_container(
         )
 
 
-@router.delete("/container/remove", status_code=status.HTTP_200_OK)
-async def remove_container(
-    container_id: str = Query(..., alias="id", description="Идентификатор контейнера"),
-    host_id: str = Query(
-        ..., description="Идентификатор хоста, на котором запущен контейнер"
-    ),
-    force: bool = False,
-    db: Session = Depends(get_db),
-) -> dict:
+def _get_container_name(db: Session, container_id: str, host_id: str) -> str | None:
     """
-    Удаление контейнера и связанных ресурсов.
-
-    Удаляет контейнер, его экспортер (если существует), конфигурации Prometheus
-    и файлы из MinIO.
+    Определяет имя контейнера по БД или Redis. Вызывается в пуле потоков.
 
     Args:
+        db: Сессия базы данных
         container_id: Идентификатор контейнера
         host_id: Идентификатор хоста, на котором запущен контейнер
-        force: Принудительное удаление
-        db: Сессия базы данных
 
     Returns:
-        dict: Результат операции удаления контейнера
-
-    Raises:
-        HTTPException: Если хост не найден или произошла ошибка при удалении из БД
+        str | None: Имя контейнера без ведущего "/" или None, если контейнер не найден
     """
-    hosts_service = HostsService(db)
-    host_dto = hosts_service.get_host_by_id(host_id)
-    if not host_dto:
-        raise HTTPException(status_code=404, detail="Host not found")
-
-    # Преобразуем адрес хоста для Docker (localhost -> host.docker.internal)
-    host_address = hosts_service._resolve_host_for_docker(host_dto.host)
-    docker_api_url = f"http://{host_address}:{host_dto.port}"
-
     container = db.query(Container).filter(Container.id == container_id).first()
     container_name = None
     if container:
@@ -361,49 +427,24 @@ async def remove_container(
                 container_info.get("Name", "").lstrip("/") or
                 container_info.get("Config", {}).get("Hostname", "")
             )
+    return container_name
 
-    docker_gateway = APIGateway(docker_api_url)
-    # Увеличиваем таймаут для операций с контейнерами (удаление может занять время)
-    docker_gateway.timeout = 30
 
-    if container_name:
-        exporter_name = f"{container_name}-exporter"
-        try:
-            exporter_result = docker_gateway.make_request(
-                method="DELETE",
-                endpoint="/api/v1/manage/container/remove",
-                params={"force": True},
-                json_data={"id": exporter_name},
-            )
-            logger.info(
-                "Exporter %s removal attempted: %s",
-                exporter_name, exporter_result
-            )
-        except Exception as e:
-            logger.warning(
-                "Could not remove exporter %s: %s",
-                exporter_name, str(e)
-            )
+def _delete_container_records(db: Session, container_id: str) -> None:
+    """
+    Удаляет контейнер, его конфигурации Prometheus из БД и файлы конфигураций из MinIO,
+    затем обновляет запись представления containers:configs.
 
-    try:
-        result = docker_gateway.make_request(
-            method="DELETE",
-            endpoint="/api/v1/manage/container/remove",
-            params={"force": force},
-            json_data={"id": container_id},
-        )
-    except Exception as e:
-        logger.warning(
-            "Error removing container %s via Docker API: %s",
-            container_id, str(e)
-        )
-        result = {
-            "message": (
-                f"Container removal attempted, "
-                f"but Docker API error: {str(e)}"
-            )
-        }
+    Вызывается в пуле потоков.
+
+    Args:
+        db: Сессия базы данных
+        container_id: Идентификатор контейнера
 
+    Raises:
+        HTTPException: Если произошла ошибка при удалении из БД
+    """
+    container = db.query(Container).filter(Container.id == container_id).first()
     try:
         minio_service = MinioService()
 
@@ -469,8 +510,86 @@ async def remove_container(
             detail=f"Failed to remove container from database: {str(e)}"
         ) from e
 
-    update_containers_service = UpdateContainers(db=db)
-    update_containers_service.upload_containers()
+    ContainerConfigsService(db).refresh([container_id])
+
+
+@router.delete("/container/remove", status_code=status.HTTP_200_OK)
+async def remove_container(
+    container_id: str = Query(..., alias="id", description="Идентификатор контейнера"),
+    host_id: str = Query(
+        ..., description="Идентификатор хоста, на котором запущен контейнер"
+    ),
+    force: bool = False,
+    db: Session = Depends(get_db),
+) -> dict:
+    """
+    Удаление контейнера и связанных ресурсов.
+
+    Удаляет контейнер, его экспортер (если существует), конфигурации Prometheus
+    и файлы из MinIO.
+
+    Args:
+        container_id: Идентификатор контейнера
+        host_id: Идентификатор хоста, на котором запущен контейнер
+        force: Принудительное удаление
+        db: Сессия базы данных
+
+    Returns:
+        dict: Результат операции удаления контейнера
+
+    Raises:
+        HTTPException: Если хост не найден или произошла ошибка при удалении из БД
+    """
+    docker_api_url = await run_in_threadpool(_get_docker_api_url, db, host_id)
+    if not docker_api_url:
+        raise HTTPException(status_code=404, detail="Host not found")
+
+    container_name = await run_in_threadpool(_get_container_name, db, container_id, host_id)
+
+    docker_gateway = AsyncAPIGateway(docker_api_url)
+    # Увеличиваем таймаут для операций с контейнерами (удаление может занять время)
+    docker_gateway.timeout = 30
+
+    if container_name:
+        exporter_name = f"{container_name}-exporter"
+        try:
+            exporter_result = await docker_gateway.make_request(
+                method="DELETE",
+                endpoint="/api/v1/manage/container/remove",
+                params={"force": True},
+                json_data={"id": exporter_name},
+            )
+            logger.info(
+                "Exporter %s removal attempted: %s",
+                exporter_name, exporter_result
+            )
+        except Exception as e:
+            logger.warning(
+                "Could not remove exporter %s: %s",
+                exporter_name, str(e)
+            )
+
+    try:
+        result = await docker_gateway.make_request(
+            method="DELETE",
+            endpoint="/api/v1/manage/container/remove",
+            params={"force": force},
+            json_data={"id": container_id},
+        )
+    except Exception as e:
+        logger.warning(
+            "Error removing container %s via Docker API: %s",
+            container_id, str(e)
+        )
+        result = {
+            "message": (
+                f"Container removal attempted, "
+                f"but Docker API error: {str(e)}"
+            )
+        }
+
+    await run_in_threadpool(_delete_container_records, db, container_id)
+    await run_in_threadpool(_refresh_containers, db, host_id)
 
     return result
 
@@ -501,26 +620,21 @@ async def start_container(
     Raises:
         HTTPException: Если хост не найден
     """
-    hosts_service = HostsService(db)
-    host_dto = hosts_service.get_host_by_id(host_id)
-    if not host_dto:
+    docker_api_url = await run_in_threadpool(_get_docker_api_url, db, host_id)
+    if not docker_api_url:
         raise HTTPException(status_code=404, detail="Host not found")
 
-    # Преобразуем адрес хоста для Docker (localhost -> host.docker.internal)
-    host_address = hosts_service._resolve_host_for_docker(host_dto.host)
-    docker_api_url = f"http://{host_address}:{host_dto.port}"
-    docker_gateway = APIGateway(docker_api_url)
+    docker_gateway = AsyncAPIGateway(docker_api_url)
     # Увеличиваем таймаут для операций с контейнерами (запуск может занять время)
     docker_gateway.timeout = 30
 
-    result = docker_gateway.make_request(
+    result = await docker_gateway.make_request(
         method="POST",
         endpoint="/api/v1/manage/container/start",
         json_data={"id": container_id},
     )
 
-    update_containers_service = UpdateContainers(db=db)
-    update_containers_service.upload_containers()
+    await run_in_threadpool(_refresh_containers, db, host_id)
     return result
 
 
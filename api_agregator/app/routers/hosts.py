@@ -14,7 +14,7 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/add", status_code=status.HTTP_200_OK)
-async def add_host(name: str, host: str, port: int, db: Session = Depends(get_db)):
+def add_host(name: str, host: str, port: int, db: Session = Depends(get_db)):
     """
     Добавление нового целевого хоста.
 
@@ -52,7 +52,7 @@ async def add_host(name: str, host: str, port: int, db: Session = Depends(get_db
 
 
 @router.get("/get", status_code=status.HTTP_200_OK)
-async def get_hosts(db: Session = Depends(get_db)):
+def get_hosts(db: Session = Depends(get_db)):
     """
     Получение всех хостов из Redis.
 
@@ -71,7 +71,7 @@ async def get_hosts(db: Session = Depends(get_db)):
 
 
 @router.put("/update", status_code=status.HTTP_200_OK)
-async def update_host(
+def update_host(
         host_id: str,
         name: str | None = None,
         host: str | None = None,
@@ -114,7 +114,7 @@ async def update_host(
 
 
 @router.delete("/delete", status_code=status.HTTP_200_OK)
-async def delete_host(
+def delete_host(
     host_id: str = Query(..., alias="id", description="Идентификатор хоста для удаления"),
     db: Session = Depends(get_db)
 ):
@@ -156,7 +156,7 @@ async def delete_host(
 
 
 @router.get("/update_hosts", status_code=status.HTTP_200_OK)
-async def update_hosts_info(db: Session = Depends(get_db)) -> dict[str, dict]:
+def update_hosts_info(db: Session = Depends(get_db)) -> dict[str, dict]:
     """
     Обновление информации о хостах в Redis.
 
@@ -167,5 +167,5 @@ async def update_hosts_info(db: Session = Depends(get_db)) -> dict[str, dict]:
         dict[str, dict]: Словарь с обновленными данными о хостах
     """
     hosts_service = HostsService(db)
-    hosts = hosts_service.upload_hosts()
+    hosts = hosts_service.upload_hosts(force=True)
     return hosts
@@ -2,20 +2,26 @@
 
 import logging
 import os
+import uuid
 from typing import Any, Dict
 
 from dotenv import load_dotenv
 from fastapi import APIRouter, Depends, status, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from sqlalchemy.orm import Session
 
 from app.db.postgres.database import get_db
 from app.db.redis.docker_containers import DockerContainers
+from app.db.redis.onboarding_jobs import OnboardingJobs
 from app.models.main_config import AddServiceRequest, RemoveServiceRequest
-from app.models.postgres.container import Container
+from app.models.onboarding import OnboardingRequest
 from app.models.postgres.prometheus_config import PrometheusConfig
-from app.services.api_getaway import APIGateway
-from app.services.hosts_service import HostsService
+from app.services.api_getaway import AsyncAPIGateway
 from app.services.minio_service import MinioService
+from app.services.onboarding_service import OnboardingService
+from app.services.prometheus_configs_service import PrometheusConfigsService
+from app.services.update_containers import UpdateContainers
+from app.tasks.onboarding import run_onboarding
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -26,12 +32,12 @@ docker_api_url = os.getenv("DOCKER_API_URL")
 prometheus_manager_url = os.getenv("PROMETHEUS_MANAGER_URL")
 
 
-def get_prometheus_manager_gateway() -> APIGateway:
+def get_prometheus_manager_gateway() -> AsyncAPIGateway:
     """
-    Возвращает APIGateway для Prometheus Manager.
+    Возвращает AsyncAPIGateway для Prometheus Manager.
 
     Returns:
-        APIGateway: Gateway для Prometheus Manager
+        AsyncAPIGateway: Gateway для Prometheus Manager
 
     Raises:
         HTTPException: Если PROMETHEUS_MANAGER_URL не задан
@@ -41,7 +47,7 @@ def get_prometheus_manager_gateway() -> APIGateway:
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="PROMETHEUS_MANAGER_URL is not configured in environment"
         )
-    return APIGateway(prometheus_manager_url)
+    return AsyncAPIGateway(prometheus_manager_url)
 
 
 @router.post("/generate_config", status_code=status.HTTP_200_OK)
@@ -53,7 +59,8 @@ async def generate_config(
     """
     Генерация конфига Prometheus и сохранение в БД.
 
-    Проверяет наличие и статус экспортера перед генерацией конфигурации.
+    Обращения к БД и Redis выполняются в пуле потоков, запрос к prometheus_generation -
+    асинхронно, поэтому обработчик не блокирует цикл событий.
 
     Args:
         container_id: Идентификатор контейнера
@@ -67,135 +74,53 @@ async def generate_config(
         HTTPException: Если хост не найден, контейнер не найден,
                        экспортер не найден или не запущен
     """
-    hosts_service = HostsService(db)
-    host_dto = hosts_service.get_host_by_id(host_id)
+    host_dto, container_data = await run_in_threadpool(
+        PrometheusConfigsService(db).get_host_and_container, host_id, container_id
+    )
     if not host_dto:
         raise HTTPException(status_code=404, detail="Host not found")
 
     host = host_dto.host
 
-    docker_containers = DockerContainers()
-    container_data = docker_containers.get_container(container_id, host_id)
-
     if not container_data:
         return {"error": "Container not found"}
-    info = container_data.get("info", {})
-    classification = container_data.get("classification", {})
-
-    container_name = (
-        info.get("Name", "").lstrip("/") or
-        info.get("Config", {}).get("Hostname", "unknown")
-    )
-
-    stack = None
-    if classification.get("result"):
-        stack = classification["result"][0][0] if classification["result"] else None
 
     logger.info(
         "Proceeding with config generation for container %s (exporter will be started later)",
         container_id
     )
 
-    api_gateway = APIGateway(prometheus_generation_url)
-    config_data = api_gateway.make_request(
+    api_gateway = AsyncAPIGateway(prometheus_generation_url)
+    config_data = await api_gateway.make_request(
         method='POST',
         endpoint='/api/v1/generate/',
         json_data=container_data,
         params={'host': host}
     )
 
-    exporter_config = config_data.get("info", {})
-    config_file = config_data.get("config", {})
-
-    container = db.query(Container).filter(Container.id == container_id).first()
-
-    if not container:
-        classification_score = None
-        if classification.get("result"):
-            classification_score = classification.get("result")
-
-        container = Container(
-            id=container_id,
-            name=container_name,
-            image=info.get("Config", {}).get("Image", ""),
-            status=info.get("State", {}).get("Status", "unknown"),
-            stack=stack,
-            classification_score=classification_score,
-            docker_info=info
-        )
-        db.add(container)
-    else:
-        container.status = info.get("State", {}).get("Status", container.status)
-        container.docker_info = info
-        if stack:
-            container.stack = stack
-            container.classification_score = classification.get("result")
-
-    network_name = exporter_config.get("network")
-    exporter_image = exporter_config.get("exporter_image")
-    exporter_port = exporter_config.get("exporter_port")
-    job_name_suffix = exporter_config.get("job_name_suffix", "")
-
-    job_name = f"{container_name}{job_name_suffix}"
-
-    config_metadata = {
-        'host_name': host_id,
-        'config': config_file,
-        'info': {
-            'container_name': container_name,
-            'stack': stack,
-            'exporter_image': exporter_image,
-            'exporter_port': exporter_port,
-            'target_address': host,
-            'job_name': job_name,
-            'network': network_name,
-            'exporter_env_vars': exporter_config.get("env_vars", {}),
-        }
-    }
-
-    existing_config = db.query(PrometheusConfig).filter(
-        PrometheusConfig.container_id == container_id,
-        PrometheusConfig.status == "active"
-    ).order_by(PrometheusConfig.created_at.desc()).first()
-
-    if existing_config:
-        existing_config.container_name = container_name
-        existing_config.stack = stack
-        existing_config.exporter_image = exporter_image
-        existing_config.exporter_port = exporter_port
-        existing_config.target_address = host
-        existing_config.job_name = job_name
-        existing_config.minio_bucket = config_file.get("bucket")
-        existing_config.minio_file_path = config_file.get("file")
-        existing_config.config_metadata = config_metadata
-        existing_config.version += 1
-
-        prometheus_config = existing_config
-    else:
-        prometheus_config = PrometheusConfig(
-            container_id=container_id,
-            container_name=container_name,
-            stack=stack,
-            exporter_image=exporter_image,
-            exporter_port=exporter_port,
-            target_address=host,
-            job_name=job_name,
-            minio_bucket=config_file.get("bucket"),
-            minio_file_path=config_file.get("file"),
-            status="active",
-            config_metadata=config_metadata
-        )
-        db.add(prometheus_config)
-    db.commit()
-    db.refresh(prometheus_config)
+    config_id = await run_in_threadpool(
+        PrometheusConfigsService(db).save_generated_config, container_id, host_id, host, container_data, config_data
+    )
 
     return {
-        "config_id": prometheus_config.id,
+        "config_id": config_id,
         "container_id": container_id,
         "config": config_data
     }
 
 
+def _refresh_host_containers(db: Session, host_id: str) -> None:
+    """
+    Обновляет контейнеры хоста и индекс экспортеров после запуска экспортера,
+    чтобы списки контейнеров сразу видели его статус. Вызывается в пуле потоков.
+
+    Args:
+        db: Сессия базы данных
+        host_id: Идентификатор хоста, на котором запущен экспортер
+    """
+    UpdateContainers(db=db).upload_host_containers(host_id)
+
+
 @router.post("/up_exporter", status_code=status.HTTP_200_OK)
 async def up_exporter(container_id: str, port: int, db: Session = Depends(get_db)) -> dict[str, Any]:
     """
@@ -211,143 +136,43 @@ async def up_exporter(container_id: str, port: int, db: Session = Depends(get_db
     Returns:
         dict[str, Any]: Результат запуска экспортера или ошибка
     """
-    config = db.query(PrometheusConfig).filter(
-        PrometheusConfig.container_id == container_id,
-        PrometheusConfig.status == "active"
-    ).order_by(PrometheusConfig.created_at.desc()).first()
-
-    if not config:
-        logger.error("No active config found for container %s", container_id)
-        return {
-            "error": "No active config found for this container",
-            "container_id": container_id
-        }
-
-    config_metadata = config.config_metadata or {}
-    host_id = config_metadata.get('host_name', 'localhost')
-
-    # Получаем адрес хоста для обращения к docker_api
-    hosts_service = HostsService(db)
-    host_dto = hosts_service.get_host_by_id(host_id)
-    if not host_dto:
-        logger.error("Host %s not found", host_id)
-        return {
-            "error": f"Host {host_id} not found",
-            "container_id": container_id
-        }
-    
-    # Преобразуем адрес хоста для Docker (localhost -> host.docker.internal)
-    host_address = hosts_service._resolve_host_for_docker(host_dto.host)
-    docker_api_host_url = f"http://{host_address}:{host_dto.port}"
-
-    docker_containers = DockerContainers()
-    container_data = docker_containers.get_container(container_id, host_id)
-
-    # Если не найден с host_id, пробуем найти без фильтра по хосту
-    if not container_data:
-        logger.warning("Container %s not found with host_id %s, trying to find without host filter", container_id, host_id)
-        all_containers = docker_containers.get_containers()
-        container_data = all_containers.get(container_id)
-        
-        if container_data:
-            logger.info("Container found without host filter, using it")
-        else:
-            logger.error("Target container %s not found in Redis at all", container_id)
-            return {
-                "error": "Target container not found in Redis. Please update containers first.",
-                "container_id": container_id
-            }
-
-    exporter_info = config_metadata.get('info', {})
-
-    network_name = exporter_info.get("network")
-    exporter_env_vars = exporter_info.get("exporter_env_vars", {})
-
-    if not network_name or not exporter_env_vars:
-        logger.warning(
-            "Network or env_vars not found in config_metadata for %s, "
-            "trying to get from Redis",
-            container_id
-        )
-
-        container_info = container_data.get("info", {})
-
-        if not container_info:
-            logger.error("Container info is empty for %s", container_id)
-            return {
-                "error": "Container info is empty",
-                "container_id": container_id
-            }
-
-        if not network_name:
-            network_settings = container_info.get('NetworkSettings', {})
-            networks = network_settings.get('Networks', {})
-            if networks:
-                network_names = list(networks.keys())
-                network_name = (
-                    'bridge' if 'bridge' in network_names else
-                    network_names[0] if network_names else None
-                )
-
-        if not exporter_env_vars:
-            logger.warning("Env vars not found in config, need to regenerate config for %s", container_id)
-            return {
-                "error": "Env vars not found in config. Please regenerate config first.",
-                "container_id": container_id
-            }
+    prepared = await run_in_threadpool(PrometheusConfigsService(db).prepare_exporter_start, container_id, port)
+    if "error" in prepared:
+        return prepared
 
-    if not network_name:
-        logger.error("Target container %s has no networks. Container must be running.", container_id)
-        return {
-            "error": "Target container has no networks. Container must be running.",
-            "container_id": container_id
-        }
-
-    json_data = {
-        "image_name": config.exporter_image,
-        "name": f"{config.container_name}-exporter",
-        "ports": {f"{config.exporter_port}/tcp": port},
-        "detach": True,
-        "network": network_name
-    }
-
-    if exporter_env_vars:
-        json_data["environment"] = exporter_env_vars
-        logger.info("Using env vars from config: %s", exporter_env_vars)
-    else:
-        logger.warning(
-            "No env vars in config for container %s. "
-            "Exporter may not work correctly.",
-            container_id
-        )
+    json_data = prepared["json_data"]
+    network_name = prepared["network"]
+    exporter_env_vars = prepared["environment"]
 
     try:
         # Используем адрес хоста вместо глобального DOCKER_API_URL
-        api_gateway = APIGateway(docker_api_host_url)
-        logger.info("Using docker_api at %s for host %s", docker_api_host_url, host_id)
-        start_exporter = api_gateway.make_request(
+        api_gateway = AsyncAPIGateway(prepared["docker_api_url"])
+        logger.info("Using docker_api at %s for host %s", prepared["docker_api_url"], prepared["host_id"])
+        start_exporter = await api_gateway.make_request(
             method='POST',
             endpoint='/api/v1/manage/container/pull_and_run',
             json_data=json_data,
         )
 
         logger.info("Exporter started successfully: %s", start_exporter)
-        return {
-            "message": "Exporter started successfully",
-            "exporter": start_exporter,
-            "network": network_name,
-            "environment": exporter_env_vars,
-            "stack": config.stack
-        }
     except Exception as e:
         logger.error("Failed to start exporter: %s", e, exc_info=True)
         return {
             "error": f"Failed to start exporter: {str(e)}",
             "container_id": container_id,
             "network": network_name,
-            "stack": config.stack
+            "stack": prepared["stack"]
         }
 
+    await run_in_threadpool(_refresh_host_containers, db, prepared["host_id"])
+    return {
+        "message": "Exporter started successfully",
+        "exporter": start_exporter,
+        "network": network_name,
+        "environment": exporter_env_vars,
+        "stack": prepared["stack"]
+    }
+
 
 @router.get("/get_signature", status_code=200)
 async def get_signature() -> Dict[str, str]:
@@ -357,8 +182,8 @@ async def get_signature() -> Dict[str, str]:
     Returns:
         Dict[str, str]: Файл с настройками
     """
-    api_gateway = APIGateway(prometheus_generation_url)
-    result = api_gateway.make_request(
+    api_gateway = AsyncAPIGateway(prometheus_generation_url)
+    result = await api_gateway.make_request(
         method='GET',
         endpoint='/api/v1/signature/get'
     )
@@ -376,8 +201,8 @@ async def update_signature(new_signature: str) -> Dict[str, str]:
     Returns:
         Dict[str, str]: Результат обновления
     """
-    api_gateway = APIGateway(prometheus_generation_url)
-    result = api_gateway.make_request(
+    api_gateway = AsyncAPIGateway(prometheus_generation_url)
+    result = await api_gateway.make_request(
         method='PATCH',
         endpoint=f'/api/v1/signature/update?new_signature={new_signature}',
     )
@@ -385,10 +210,13 @@ async def update_signature(new_signature: str) -> Dict[str, str]:
 
 
 @router.get("/get_all_configs", status_code=status.HTTP_200_OK)
-async def get_all_configs(db: Session = Depends(get_db)) -> dict[str, Any]:
+def get_all_configs(db: Session = Depends(get_db)) -> dict[str, Any]:
     """
     Получает все активные конфиги Prometheus и информацию об экспортерах для них.
 
+    Обработчик синхронный: FastAPI выполняет его в пуле потоков, поэтому обращения
+    к БД и Redis не блокируют цикл событий.
+
     Args:
         db: Сессия базы данных
 
@@ -400,78 +228,47 @@ async def get_all_configs(db: Session = Depends(get_db)) -> dict[str, Any]:
     ).order_by(PrometheusConfig.created_at.desc()).all()
 
     docker_containers = DockerContainers()
-    all_containers = docker_containers.get_containers()
+    exporters = docker_containers.find_exporters([
+        (
+            (config.config_metadata or {}).get('host_name', 'localhost'),
+            f"{config.container_name.lstrip('/')}-exporter"
+        )
+        for config in configs
+    ])
+
+    exporter_containers = iter(docker_containers.get_containers_by_refs(
+        [(exporter["host_name"], exporter["container_id"]) for exporter in exporters if exporter],
+        summary=True
+    ))
 
     result = []
 
-    for config in configs:
+    for config, exporter in zip(configs, exporters):
         config_metadata = config.config_metadata or {}
         host_name = config_metadata.get('host_name', 'localhost')
-
-        normalized_container_name = config.container_name.lstrip("/")
-        exporter_name = f"{normalized_container_name}-exporter"
         exporter_info = None
         exporter_running = False
         exporter_container_id = None
 
-        logger.debug(
-            "Looking for exporter: %s on host: %s "
-            "(container_name: %s)",
-            exporter_name, host_name, config.container_name
-        )
-
-        for container_id, container_data in all_containers.items():
-            container_name = container_data.get("info", {}).get("Name", "").lstrip("/")
-            container_host = container_data.get("host_name") or container_data.get("host_id")
-
-            if "-exporter" in container_name.lower():
-                logger.debug(
-                    "Found potential exporter container: %s on host: %s",
-                    container_name, container_host
+        if exporter:
+            exporter_running = exporter["status"].lower() in ("running", "up")
+            exporter_container_id = exporter["container_id"]
+            if exporter["host_name"] != host_name:
+                logger.warning(
+                    "Found exporter using fallback: %s, host: %s "
+                    "(expected: %s), status: %s, running: %s",
+                    exporter["name"], exporter["host_name"],
+                    host_name, exporter["status"], exporter_running
                 )
 
-            if container_name.lower() == exporter_name.lower():
-                if container_host == host_name:
-                    container_status = container_data.get("info", {}).get("State", {}).get("Status", "")
-                    exporter_running = container_status.lower() in ("running", "up")
-                    exporter_container_id = container_id
-
-                    logger.info(
-                        "Found exporter: %s, host: %s, "
-                        "status: %s, running: %s",
-                        container_name, container_host,
-                        container_status, exporter_running
-                    )
-
-                    exporter_info = {
-                        "container_id": container_id,
-                        "name": container_name,
-                        "status": container_status,
-                        "image": container_data.get("info", {}).get("Config", {}).get("Image", ""),
-                        "created": container_data.get("info", {}).get("Created", ""),
-                        "network_settings": container_data.get("info", {}).get("NetworkSettings", {})
-                    }
-                    break
-                elif not exporter_info:
-                    container_status = container_data.get("info", {}).get("State", {}).get("Status", "")
-                    exporter_running = container_status.lower() in ("running", "up")
-                    exporter_container_id = container_id
-
-                    logger.warning(
-                        "Found exporter using fallback: %s, host: %s "
-                        "(expected: %s), status: %s, running: %s",
-                        container_name, container_host,
-                        host_name, container_status, exporter_running
-                    )
-
-                    exporter_info = {
-                        "container_id": container_id,
-                        "name": container_name,
-                        "status": container_status,
-                        "image": container_data.get("info", {}).get("Config", {}).get("Image", ""),
-                        "created": container_data.get("info", {}).get("Created", ""),
-                        "network_settings": container_data.get("info", {}).get("NetworkSettings", {})
-                    }
+            exporter_info = {
+                "container_id": exporter_container_id,
+                "name": exporter["name"],
+                "status": exporter["status"],
+                "image": exporter["image"],
+                "created": exporter["created"],
+                "network_settings": next(exporter_containers).get("info", {}).get("NetworkSettings", {})
+            }
 
         config_data = {
             "config_id": config.id,
@@ -504,7 +301,7 @@ async def get_all_configs(db: Session = Depends(get_db)) -> dict[str, Any]:
 
 
 @router.get("/get_config_files/{config_id}", status_code=status.HTTP_200_OK)
-async def get_config_files(config_id: int, db: Session = Depends(get_db)):
+def get_config_files(config_id: int, db: Session = Depends(get_db)):
     """
     Получает YAML файлы из MinIO по ID конфига из БД.
 
@@ -534,51 +331,22 @@ async def get_config_files(config_id: int, db: Session = Depends(get_db)):
     return result
 
 
-
-@router.post("/main_config/add", status_code=status.HTTP_200_OK)
-async def add_main_config_service(
-    request: AddServiceRequest,
-    db: Session = Depends(get_db)
-) -> Dict[str, Any]:
+def _check_job_exporter_running(db: Session, job_name: str) -> dict[str, Any]:
     """
-    Добавляет сервис в основной конфиг Prometheus.
+    Проверяет, что для конфигурации job_name запущен экспортер.
 
-    Проверяет, что экспортер запущен перед добавлением.
+    Выполняет блокирующие обращения к БД и Redis, поэтому вызывается в пуле потоков.
 
     Args:
-        request: Запрос с данными о сервисе для добавления
         db: Сессия базы данных
+        job_name: Имя job из scrape_config
 
     Returns:
-        Dict[str, Any]: Результат добавления сервиса
+        dict[str, Any]: Данные сервиса для основного конфига (exporter_name, stack, host, container_name)
 
     Raises:
-        HTTPException: Если job_name не найден, конфиг не найден,
-                       экспортер не найден или не запущен
+        HTTPException: Если конфиг не найден, экспортер не найден или не запущен
     """
-    logger.debug("Received request: %s", request.model_dump())
-    logger.debug("scrape_config type: %s", type(request.scrape_config))
-    logger.debug("scrape_config value: %s", request.scrape_config)
-
-    job_name = None
-    if request.scrape_config and isinstance(request.scrape_config, dict):
-        scrape_configs = request.scrape_config.get('scrape_configs', [])
-        logger.debug("scrape_configs: %s", scrape_configs)
-        if scrape_configs and len(scrape_configs) > 0:
-            if isinstance(scrape_configs[0], dict):
-                job_name = scrape_configs[0].get('job_name')
-            else:
-                job_name = getattr(scrape_configs[0], 'job_name', None)
-
-    logger.info("Extracted job_name: %s", job_name)
-
-    if not job_name:
-        logger.error("Job name not found in request. scrape_config: %s", request.scrape_config)
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Job name is required in scrape_config.scrape_configs[0].job_name"
-        )
-
     config = db.query(PrometheusConfig).filter(
         PrometheusConfig.job_name == job_name,
         PrometheusConfig.status == "active"
@@ -594,14 +362,8 @@ async def add_main_config_service(
     host_name = config_metadata.get('host_name', 'localhost')
     container_name = config.container_name.lstrip("/")
     exporter_name = f"{container_name}-exporter"
-    exporter_name_lower = exporter_name.lower()
 
-    docker_containers = DockerContainers()
-    all_containers_data = docker_containers.get_containers()
-
-    exporter_found = False
-    exporter_running = False
-    exporter_info = None
+    exporter = DockerContainers().find_exporter(exporter_name, host_name)
 
     logger.info(
         "Checking exporter before adding to main config: exporter_name=%s, "
@@ -609,81 +371,24 @@ async def add_main_config_service(
         exporter_name, host_name, job_name
     )
 
-    for exp_container_id, exp_container_data in all_containers_data.items():
-        if isinstance(exp_container_data, dict):
-            exp_container_name = exp_container_data.get("info", {}).get("Name", "").lstrip("/")
-            exp_container_host = exp_container_data.get("host_name") or exp_container_data.get("host_id")
-
-            logger.debug(
-                "Checking exporter candidate: name=%s, host=%s, "
-                "expected_name=%s, expected_host=%s",
-                exp_container_name, exp_container_host,
-                exporter_name_lower, host_name
-            )
-
-            if (exp_container_name.lower() == exporter_name_lower and
-                    exp_container_host == host_name):
-                exp_container_status = exp_container_data.get("info", {}).get("State", {}).get("Status", "")
-                exporter_found = True
-                exporter_running = exp_container_status.lower() in ("running", "up")
-
-                exporter_info = {
-                    "container_id": exp_container_id,
-                    "name": exp_container_name,
-                    "status": exp_container_status,
-                }
-
-                logger.info(
-                    "Found exporter: name=%s, host=%s, "
-                    "status=%s, running=%s",
-                    exp_container_name, exp_container_host,
-                    exp_container_status, exporter_running
-                )
-                break
-
-    if not exporter_found:
-        logger.debug("Exporter not found with exact host match, trying fallback search by name only")
-        for exp_container_id, exp_container_data in all_containers_data.items():
-            if isinstance(exp_container_data, dict):
-                exp_container_name = exp_container_data.get("info", {}).get("Name", "").lstrip("/")
-                exp_container_host = exp_container_data.get("host_name") or exp_container_data.get("host_id")
-
-                if exp_container_name.lower() == exporter_name_lower:
-                    exp_container_status = exp_container_data.get("info", {}).get("State", {}).get("Status", "")
-                    exporter_found = True
-                    exporter_running = exp_container_status.lower() in ("running", "up")
-
-                    exporter_info = {
-                        "container_id": exp_container_id,
-                        "name": exp_container_name,
-                        "status": exp_container_status,
-                    }
-
-                    logger.warning(
-                        "Found exporter using fallback search: name=%s, "
-                        "host=%s (expected: %s), status=%s, running=%s",
-                        exp_container_name, exp_container_host,
-                        host_name, exp_container_status, exporter_running
-                    )
-                    break
-
-    if not exporter_found:
+    if not exporter:
         logger.warning("Exporter '%s' not found on host '%s'", exporter_name, host_name)
-        all_exporters = [
-            (data.get("info", {}).get("Name", "").lstrip("/"),
-             data.get("host_name") or data.get("host_id"))
-            for data in all_containers_data.values()
-            if isinstance(data, dict) and "-exporter" in data.get("info", {}).get("Name", "").lower()
-        ]
-        logger.debug("Available exporters: %s", all_exporters)
-
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail=f"Exporter '{exporter_name}' not found on host '{host_name}'. Please start the exporter first."
         )
 
+    exporter_status = exporter["status"] or 'unknown'
+    exporter_running = exporter_status.lower() in ("running", "up")
+    if exporter["host_name"] != host_name:
+        logger.warning(
+            "Found exporter using fallback search: name=%s, "
+            "host=%s (expected: %s), status=%s, running=%s",
+            exporter["name"], exporter["host_name"],
+            host_name, exporter_status, exporter_running
+        )
+
     if not exporter_running:
-        exporter_status = exporter_info.get('status', 'unknown') if exporter_info else 'unknown'
         logger.warning(
             f"Exporter '{exporter_name}' found but not running. Status: {exporter_status}"
         )
@@ -695,6 +400,58 @@ async def add_main_config_service(
             )
         )
 
+    return PrometheusConfigsService(db).main_config_service_fields(config)
+
+
+@router.post("/main_config/add", status_code=status.HTTP_200_OK)
+async def add_main_config_service(
+    request: AddServiceRequest,
+    db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Добавляет сервис в основной конфиг Prometheus.
+
+    Проверяет, что экспортер запущен перед добавлением.
+
+    Args:
+        request: Запрос с данными о сервисе для добавления
+        db: Сессия базы данных
+
+    Returns:
+        Dict[str, Any]: Результат добавления сервиса
+
+    Raises:
+        HTTPException: Если job_name не найден, конфиг не найден,
+                       экспортер не найден или не запущен
+    """
+    logger.debug("Received request: %s", request.model_dump())
+    logger.debug("scrape_config type: %s", type(request.scrape_config))
+    logger.debug("scrape_config value: %s", request.scrape_config)
+
+    job_name = None
+    if request.scrape_config and isinstance(request.scrape_config, dict):
+        scrape_configs = request.scrape_config.get('scrape_configs', [])
+        logger.debug("scrape_configs: %s", scrape_configs)
+        if scrape_configs and len(scrape_configs) > 0:
+            if isinstance(scrape_configs[0], dict):
+                job_name = scrape_configs[0].get('job_name')
+            else:
+                job_name = getattr(scrape_configs[0], 'job_name', None)
+
+    logger.info("Extracted job_name: %s", job_name)
+
+    if not job_name:
+        logger.error("Job name not found in request. scrape_config: %s", request.scrape_config)
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Job name is required in scrape_config.scrape_configs[0].job_name"
+        )
+
+    service_fields = await run_in_threadpool(_check_job_exporter_running, db, job_name)
+    for field, value in service_fields.items():
+        if getattr(request, field) is None:
+            setattr(request, field, value)
+
     logger.info("Exporter check passed. Adding service '%s' to main config", job_name)
 
     try:
@@ -710,8 +467,8 @@ async def add_main_config_service(
         )
         logger.debug("Request data: %s", request.model_dump())
 
-        api_gateway = APIGateway(prometheus_generation_url)
-        result = api_gateway.make_request(
+        api_gateway = AsyncAPIGateway(prometheus_generation_url)
+        result = await api_gateway.make_request(
             method='POST',
             endpoint='/api/v1/main-config/add',
             json_data=request.model_dump()
@@ -740,8 +497,8 @@ async def remove_main_config_service(request: RemoveServiceRequest) -> Dict[str,
     Returns:
         Dict[str, Any]: Результат удаления сервиса
     """
-    api_gateway = APIGateway(prometheus_generation_url)
-    result = api_gateway.make_request(
+    api_gateway = AsyncAPIGateway(prometheus_generation_url)
+    result = await api_gateway.make_request(
         method='DELETE',
         endpoint='/api/v1/main-config/remove',
         json_data=request.model_dump()
@@ -767,8 +524,8 @@ async def get_main_config() -> Dict[str, Any]:
             detail="PROMETHEUS_GENERATION_URL is not configured in environment"
         )
     try:
-        api_gateway = APIGateway(prometheus_generation_url)
-        result = api_gateway.make_request(
+        api_gateway = AsyncAPIGateway(prometheus_generation_url)
+        result = await api_gateway.make_request(
             method='GET',
             endpoint='/api/v1/main-config/'
         )
@@ -801,6 +558,126 @@ async def get_main_config() -> Dict[str, Any]:
         )
 
 
+def _enqueue_onboarding(jobs: OnboardingJobs, job_id: str) -> None:
+    """
+    Ставит задачу массового подключения в очередь Celery.
+
+    Args:
+        jobs: Хранилище состояния задач
+        job_id: Идентификатор задачи
+
+    Raises:
+        HTTPException: Если очередь Celery недоступна
+    """
+    try:
+        run_onboarding.delay(job_id)
+    except Exception as e:
+        logger.error("Failed to enqueue onboarding job %s: %s", job_id, e, exc_info=True)
+        jobs.set_status(job_id, "failed", error=f"Failed to enqueue job: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Task queue is unavailable"
+        )
+
+
+@router.post("/onboarding", status_code=status.HTTP_202_ACCEPTED)
+async def start_onboarding(
+        request: OnboardingRequest,
+        db: Session = Depends(get_db)
+) -> Dict[str, Any]:
+    """
+    Массовое подключение контейнеров к мониторингу.
+
+    Выбирает контейнеры по селектору и ставит в очередь Celery задачу: генерация конфигурации,
+    запуск экспортера и регистрация в основном конфиге Prometheus (одной записью в конце).
+    Состояние задачи доступно по GET /onboarding/{job_id}.
+
+    Args:
+        request: Селектор контейнеров и параметры подключения
+        db: Сессия базы данных
+
+    Returns:
+        Dict[str, Any]: Идентификатор задачи и количество выбранных контейнеров
+
+    Raises:
+        HTTPException: Если селектор пуст, не настроен prometheus_generation,
+                       под селектор не попал ни один контейнер или очередь недоступна
+    """
+    if not (request.host_id or request.stack or request.labels or request.container_ids):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="At least one of host_id, stack, labels or container_ids is required"
+        )
+    if not prometheus_generation_url:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="PROMETHEUS_GENERATION_URL is not configured"
+        )
+
+    items = await run_in_threadpool(OnboardingService.select_containers, db, request)
+    if not items:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No containers match the selector")
+
+    job_id = uuid.uuid4().hex
+    jobs = await run_in_threadpool(OnboardingJobs)
+    await run_in_threadpool(jobs.create_job, job_id, request.model_dump(), items)
+    await run_in_threadpool(_enqueue_onboarding, jobs, job_id)
+
+    logger.info("Started onboarding job %s for %s containers", job_id, len(items))
+    return {"job_id": job_id, "status": "pending", "total": len(items)}
+
+
+@router.post("/onboarding/{job_id}/retry", status_code=status.HTTP_202_ACCEPTED)
+def retry_onboarding(job_id: str) -> Dict[str, Any]:
+    """
+    Повторно запускает задачу массового подключения.
+
+    Задача возобновляется по состоянию элементов: прерванные элементы обрабатываются
+    заново, а экспортеры, запущенные без регистрации (exporter_started_unregistered),
+    регистрируются в основном конфиге. Неуспешные элементы не повторяются.
+
+    Args:
+        job_id: Идентификатор задачи
+
+    Returns:
+        Dict[str, Any]: Идентификатор и статус задачи
+
+    Raises:
+        HTTPException: Если задача не найдена, уже выполняется или очередь недоступна
+    """
+    jobs = OnboardingJobs()
+    job = jobs.get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Onboarding job not found")
+    if jobs.is_locked(job_id):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Onboarding job is already running")
+
+    jobs.set_status(job_id, "pending")
+    _enqueue_onboarding(jobs, job_id)
+    logger.info("Retrying onboarding job %s", job_id)
+    return {"job_id": job_id, "status": "pending", "total": job["total"]}
+
+
+@router.get("/onboarding/{job_id}", status_code=status.HTTP_200_OK)
+def get_onboarding(job_id: str) -> Dict[str, Any]:
+    """
+    Состояние задачи массового подключения.
+
+    Args:
+        job_id: Идентификатор задачи
+
+    Returns:
+        Dict[str, Any]: Статус задачи, количество элементов по статусам и состояние каждого элемента
+
+    Raises:
+        HTTPException: Если задача не найдена
+    """
+    job = OnboardingJobs().get_job(job_id)
+    if not job:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Onboarding job not found")
+    return job
+
+
 @router.post("/manager/start", status_code=status.HTTP_200_OK)
 async def start_prometheus_manager() -> Dict[str, Any]:
     """
@@ -813,7 +690,7 @@ async def start_prometheus_manager() -> Dict[str, Any]:
         HTTPException: Если PROMETHEUS_MANAGER_URL не настроен
     """
     api_gateway = get_prometheus_manager_gateway()
-    result = api_gateway.make_request(
+    result = await api_gateway.make_request(
         method='POST',
         endpoint='/api/v1/manage/prometheus/start',
     )
@@ -832,7 +709,7 @@ async def stop_prometheus_manager() -> Dict[str, Any]:
         HTTPException: Если PROMETHEUS_MANAGER_URL не настроен
     """
     api_gateway = get_prometheus_manager_gateway()
-    result = api_gateway.make_request(
+    result = await api_gateway.make_request(
         method='POST',
         endpoint='/api/v1/manage/prometheus/stop',
     )
@@ -851,7 +728,7 @@ async def status_prometheus_manager() -> Dict[str, Any]:
         HTTPException: Если PROMETHEUS_MANAGER_URL не настроен
     """
     api_gateway = get_prometheus_manager_gateway()
-    result = api_gateway.make_request(
+    result = await api_gateway.make_request(
         method='GET',
         endpoint='/api/v1/manage/prometheus/status',
     )
@@ -870,7 +747,7 @@ async def get_prometheus_settings() -> Dict[str, Any]:
         HTTPException: Если PROMETHEUS_MANAGER_URL не настроен
     """
     api_gateway = get_prometheus_manager_gateway()
-    result = api_gateway.make_request(
+    result = await api_gateway.make_request(
         method='GET',
         endpoint='/api/v1/manage/prometheus/settings',
     )
@@ -892,7 +769,7 @@ async def update_prometheus_settings(settings: Dict[str, Any]) -> Dict[str, Any]
         HTTPException: Если PROMETHEUS_MANAGER_URL не настроен
     """
     api_gateway = get_prometheus_manager_gateway()
-    result = api_gateway.make_request(
+    result = await api_gateway.make_request(
         method='POST',
         endpoint='/api/v1/manage/prometheus/settings',
         json_data=settings
@@ -914,7 +791,7 @@ async def update_prometheus_config() -> Dict[str, Any]:
         HTTPException: Если PROMETHEUS_MANAGER_URL не настроен
     """
     api_gateway = get_prometheus_manager_gateway()
-    result = api_gateway.make_request(
+    result = await api_gateway.make_request(
         method='POST',
         endpoint='/api/v1/manage/config/update',
     )
@@ -1,18 +1,315 @@
+import asyncio
 import logging
+import random
+import threading
+import time
 from typing import Optional, Dict, Any
 
+import httpx
 import requests
 from fastapi import HTTPException
+from requests.adapters import HTTPAdapter
 from starlette import status
 
+from app.config import settings
+
 logger = logging.getLogger(__name__)
 
+IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS", "PUT", "DELETE"})
+RETRY_STATUS_CODES = frozenset({502, 503, 504})
+
+
+class Upstream:
+    """
+    Общие для процесса ресурсы одного сервиса (базового URL).
+
+    Содержит requests.Session и httpx.AsyncClient с пулами keep-alive соединений,
+    circuit breaker и метрики запросов. Синхронные и асинхронные запросы к сервису
+    учитываются общим circuit breaker. Экземпляры создаются один раз на базовый URL
+    через get_upstream.
+    """
+
+    def __init__(self, base_url: str):
+        """
+        Инициализация ресурсов сервиса.
+
+        Args:
+            base_url: Базовый URL сервиса
+        """
+        self.base_url = base_url
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=settings.http_pool_maxsize)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        self._adapter = adapter
+        self._async_client: Optional[httpx.AsyncClient] = None
+
+        self._lock = threading.Lock()
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._trial: Optional[object] = None
+
+        self._requests = 0
+        self._errors = 0
+        self._retries = 0
+        self._rejected = 0
+        self._latency_total_ms = 0.0
+        self._latency_max_ms = 0.0
+
+    @property
+    def async_client(self) -> httpx.AsyncClient:
+        """
+        Асинхронный HTTP клиент сервиса, создается при первом обращении.
+
+        Returns:
+            httpx.AsyncClient: Клиент с пулом не более settings.http_pool_maxsize соединений
+        """
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                limits=httpx.Limits(
+                    max_connections=settings.http_pool_maxsize,
+                    max_keepalive_connections=settings.http_pool_maxsize
+                )
+            )
+        return self._async_client
+
+    async def aclose(self) -> None:
+        """
+        Закрывает соединения асинхронного клиента.
+        """
+        if self._async_client is not None:
+            await self._async_client.aclose()
+            self._async_client = None
+
+    def before_request(self) -> Optional[object]:
+        """
+        Проверяет состояние circuit breaker перед запросом.
+
+        В открытом состоянии запросы отклоняются до истечения http_circuit_reset_timeout,
+        после чего пропускается один пробный запрос.
+
+        Returns:
+            Optional[object]: Маркер пробного запроса, который нужно передать в release_trial,
+                или None для обычного запроса
+
+        Raises:
+            HTTPException: Если circuit breaker открыт
+        """
+        with self._lock:
+            if self._opened_at is None:
+                return None
+            if time.monotonic() - self._opened_at >= settings.http_circuit_reset_timeout and self._trial is None:
+                self._trial = object()
+                return self._trial
+            self._rejected += 1
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Service at {self.base_url} is unavailable (circuit open)"
+        )
+
+    def record_success(self, latency_ms: float) -> None:
+        """
+        Учитывает успешный запрос и закрывает circuit breaker.
+
+        Args:
+            latency_ms: Длительность запроса в миллисекундах
+        """
+        with self._lock:
+            self._record_latency(latency_ms)
+            if self._opened_at is not None:
+                logger.info(f"Circuit closed for {self.base_url}")
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._trial = None
+
+    def release_trial(self, trial: Optional[object]) -> None:
+        """
+        Снимает отметку пробного запроса, если он завершился без учтенного результата
+        (отмена, непредвиденная ошибка). Circuit breaker остается открытым, и после
+        http_circuit_reset_timeout пропускается новый пробный запрос.
+
+        Args:
+            trial: Маркер, возвращенный before_request
+        """
+        if trial is None:
+            return
+        with self._lock:
+            if self._trial is trial:
+                self._trial = None
+                self._opened_at = time.monotonic()
+
+    def record_failure(self, latency_ms: float) -> None:
+        """
+        Учитывает неудачный запрос (ошибка соединения, таймаут или 5xx).
+
+        После http_circuit_failure_threshold ошибок подряд или неудачного пробного
+        запроса circuit breaker открывается.
+
+        Args:
+            latency_ms: Длительность запроса в миллисекундах
+        """
+        with self._lock:
+            self._record_latency(latency_ms)
+            self._errors += 1
+            self._consecutive_failures += 1
+            if self._trial is not None or (
+                self._opened_at is None
+                and self._consecutive_failures >= settings.http_circuit_failure_threshold
+            ):
+                if self._opened_at is None:
+                    logger.warning(
+                        f"Circuit opened for {self.base_url} after "
+                        f"{self._consecutive_failures} consecutive failures"
+                    )
+                self._opened_at = time.monotonic()
+                self._trial = None
+
+    def record_retry(self) -> None:
+        """
+        Учитывает повтор запроса.
+        """
+        with self._lock:
+            self._retries += 1
+
+    def _record_latency(self, latency_ms: float) -> None:
+        """
+        Учитывает длительность запроса. Вызывается под блокировкой.
+
+        Args:
+            latency_ms: Длительность запроса в миллисекундах
+        """
+        self._requests += 1
+        self._latency_total_ms += latency_ms
+        self._latency_max_ms = max(self._latency_max_ms, latency_ms)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Метрики запросов к сервису.
+
+        Returns:
+            Dict[str, Any]: Количество запросов, ошибок, повторов и отклонений, задержки,
+                состояние circuit breaker и переиспользование соединений пула
+        """
+        connections = 0
+        pooled_requests = 0
+        pools = self._adapter.poolmanager.pools
+        for pool_key in pools.keys():
+            pool = pools.get(pool_key)
+            # Пул мог быть вытеснен после получения списка ключей
+            if pool is not None:
+                connections += pool.num_connections
+                pooled_requests += pool.num_requests
+
+        with self._lock:
+            return {
+                "requests": self._requests,
+                "errors": self._errors,
+                "retries": self._retries,
+                "rejected": self._rejected,
+                "latency_avg_ms": round(self._latency_total_ms / self._requests, 2) if self._requests else None,
+                "latency_max_ms": round(self._latency_max_ms, 2),
+                "circuit": "closed" if self._opened_at is None else "open",
+                "consecutive_failures": self._consecutive_failures,
+                "connections_opened": connections,
+                "connection_reuse_ratio": (
+                    round(1 - connections / pooled_requests, 4) if pooled_requests else None
+                ),
+            }
+
+
+_upstreams: Dict[str, Upstream] = {}
+_upstreams_lock = threading.Lock()
+
+
+def get_upstream(base_url: str) -> Upstream:
+    """
+    Возвращает общие для процесса ресурсы сервиса, создавая их при первом обращении.
+
+    Args:
+        base_url: Базовый URL сервиса
+
+    Returns:
+        Upstream: Ресурсы сервиса
+    """
+    upstream = _upstreams.get(base_url)
+    if upstream is None:
+        with _upstreams_lock:
+            upstream = _upstreams.get(base_url)
+            if upstream is None:
+                upstream = Upstream(base_url)
+                _upstreams[base_url] = upstream
+    return upstream
+
+
+def get_upstreams_stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Метрики запросов ко всем сервисам, к которым обращался процесс.
+
+    Returns:
+        Dict[str, Dict[str, Any]]: Базовый URL -> метрики
+    """
+    return {base_url: upstream.stats() for base_url, upstream in list(_upstreams.items())}
+
+
+async def close_async_clients() -> None:
+    """
+    Закрывает асинхронные клиенты всех сервисов. Вызывается при остановке приложения.
+    """
+    for upstream in list(_upstreams.values()):
+        await upstream.aclose()
+
+
+def _raise_for_error_response(response) -> None:
+    """
+    Преобразует ответ сервиса с кодом 4xx/5xx в HTTPException.
+
+    Args:
+        response: Ответ requests или httpx
+
+    Raises:
+        HTTPException: Если сервис вернул ошибку
+    """
+    if response.status_code < 400:
+        return
+    try:
+        # Пытаемся извлечь детальное сообщение об ошибке из JSON
+        error_json = response.json()
+        error_detail = error_json.get('detail', response.text)
+        logger.error(f"Service returned error: {error_detail}")
+    except Exception:
+        error_detail = response.text or "Unknown error"
+
+    raise HTTPException(
+        status_code=response.status_code,
+        detail=error_detail
+    )
+
+
+def _get_retry_delay(upstream: Upstream, attempt: int, url: str) -> float:
+    """
+    Учитывает повтор и возвращает задержку перед ним:
+    settings.http_retry_backoff * 2^attempt со случайным разбросом.
+
+    Args:
+        upstream: Ресурсы сервиса
+        attempt: Номер неудачной попытки, начиная с 0
+        url: URL запроса
+
+    Returns:
+        float: Задержка в секундах
+    """
+    upstream.record_retry()
+    delay = random.uniform(0, settings.http_retry_backoff * 2 ** attempt)
+    logger.warning(f"Retrying request to {url} in {delay:.2f}s (attempt {attempt + 2})")
+    return delay
+
 
 class APIGateway:
     """
     Класс для выполнения HTTP запросов к внешним сервисам.
 
     Предоставляет единый интерфейс для взаимодействия с микросервисами.
+    Соединения переиспользуются через общий для процесса пул на каждый базовый URL.
     """
 
     def __init__(self, service_url: str):
@@ -31,17 +328,22 @@ class APIGateway:
             endpoint: str,
             data: Optional[Dict] = None,
             params: Optional[Dict] = None,
-            json_data: Optional[Dict] = None
+            json_data: Optional[Dict] = None,
+            retry: Optional[bool] = None
     ) -> Dict[str, Any]:
         """
         Базовый метод для выполнения HTTP запросов к сервису.
 
+        Идемпотентные запросы повторяются при ошибках установления соединения и ответах
+        502/503/504 (не более settings.http_retries раз, с экспоненциальной задержкой и разбросом).
+
         Args:
             method: HTTP метод (GET, POST, PUT, DELETE и т.д.)
             endpoint: Путь к эндпоинту
             data: Данные для отправки в теле запроса (form-data)
             params: Параметры запроса (query string)
             json_data: JSON данные для отправки в теле запроса
+            retry: Повторять ли запрос при ошибках. По умолчанию - только для идемпотентных методов
 
         Returns:
             Dict[str, Any]: Ответ от сервиса в виде словаря
@@ -54,32 +356,50 @@ class APIGateway:
         if json_data:
             logger.debug(f"Request JSON data: {json_data}")
 
-        try:
-            response = requests.request(
-                method=method,
-                url=url,
-                data=data,
-                params=params,
-                json=json_data,
-                timeout=self.timeout
-            )
-
-            logger.info(f"Response status: {response.status_code}")
+        upstream = get_upstream(self.base_url)
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (max(0, settings.http_retries) if retry else 0)
 
-            if response.status_code >= 400:
+        try:
+            for attempt in range(attempts):
+                trial = upstream.before_request()
+                started = time.perf_counter()
                 try:
-                    # Пытаемся извлечь детальное сообщение об ошибке из JSON
-                    error_json = response.json()
-                    error_detail = error_json.get('detail', response.text)
-                    logger.error(f"Service returned error: {error_detail}")
-                except Exception:
-                    error_detail = response.text or "Unknown error"
-
-                raise HTTPException(
-                    status_code=response.status_code,
-                    detail=error_detail
-                )
+                    try:
+                        response = upstream.session.request(
+                            method=method,
+                            url=url,
+                            data=data,
+                            params=params,
+                            json=json_data,
+                            timeout=self.timeout
+                        )
+                    except requests.exceptions.RequestException as e:
+                        upstream.record_failure((time.perf_counter() - started) * 1000)
+                        # Повторяем только ошибки установления соединения (включая ConnectTimeout):
+                        # при ReadTimeout запрос мог быть выполнен, а ожидание уже исчерпало таймаут
+                        retriable = isinstance(e, requests.exceptions.ConnectionError)
+                        if not retriable or attempt + 1 >= attempts:
+                            raise
+                        self._wait_before_retry(upstream, attempt, url)
+                        continue
+
+                    latency_ms = (time.perf_counter() - started) * 1000
+                    if response.status_code >= 500:
+                        upstream.record_failure(latency_ms)
+                        if response.status_code in RETRY_STATUS_CODES and attempt + 1 < attempts:
+                            self._wait_before_retry(upstream, attempt, url)
+                            continue
+                    else:
+                        upstream.record_success(latency_ms)
+                finally:
+                    # Пробный запрос, завершившийся без результата, не должен блокировать сервис
+                    upstream.release_trial(trial)
+                break
 
+            logger.info(f"Response status: {response.status_code}")
+            _raise_for_error_response(response)
             return response.json()
 
         except requests.exceptions.Timeout as e:
@@ -108,3 +428,139 @@ class APIGateway:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Internal gateway error: {str(e)}"
             )
+
+    @staticmethod
+    def _wait_before_retry(upstream: Upstream, attempt: int, url: str) -> None:
+        """
+        Ждет перед повтором запроса.
+
+        Args:
+            upstream: Ресурсы сервиса
+            attempt: Номер неудачной попытки, начиная с 0
+            url: URL запроса
+        """
+        time.sleep(_get_retry_delay(upstream, attempt, url))
+
+
+class AsyncAPIGateway:
+    """
+    Асинхронный вариант APIGateway для обработчиков FastAPI.
+
+    Запросы выполняются через общий для процесса httpx.AsyncClient сервиса и не блокируют
+    цикл событий: медленный ответ одного сервиса не задерживает другие запросы к API.
+    Повторы, circuit breaker, метрики и преобразование ошибок совпадают с APIGateway.
+    """
+
+    def __init__(self, service_url: str):
+        """
+        Инициализация асинхронного API Gateway.
+
+        Args:
+            service_url: Базовый URL сервиса
+        """
+        self.base_url = service_url
+        self.timeout = 5
+
+    async def make_request(
+            self,
+            method: str,
+            endpoint: str,
+            data: Optional[Dict] = None,
+            params: Optional[Dict] = None,
+            json_data: Optional[Dict] = None,
+            retry: Optional[bool] = None
+    ) -> Dict[str, Any]:
+        """
+        Базовый метод для выполнения HTTP запросов к сервису.
+
+        Args:
+            method: HTTP метод (GET, POST, PUT, DELETE и т.д.)
+            endpoint: Путь к эндпоинту
+            data: Данные для отправки в теле запроса (form-data)
+            params: Параметры запроса (query string)
+            json_data: JSON данные для отправки в теле запроса
+            retry: Повторять ли запрос при ошибках. По умолчанию - только для идемпотентных методов
+
+        Returns:
+            Dict[str, Any]: Ответ от сервиса в виде словаря
+
+        Raises:
+            HTTPException: При ошибках запроса или ответа от сервиса
+        """
+        url = f"{self.base_url}{endpoint}"
+        logger.info(f"Making async {method} request to {url}")
+        if json_data:
+            logger.debug(f"Request JSON data: {json_data}")
+
+        upstream = get_upstream(self.base_url)
+        if retry is None:
+            retry = method.upper() in IDEMPOTENT_METHODS
+        attempts = 1 + (max(0, settings.http_retries) if retry else 0)
+
+        try:
+            for attempt in range(attempts):
+                trial = upstream.before_request()
+                started = time.perf_counter()
+                try:
+                    try:
+                        response = await upstream.async_client.request(
+                            method=method,
+                            url=url,
+                            data=data,
+                            params=params,
+                            json=json_data,
+                            timeout=self.timeout
+                        )
+                    except httpx.RequestError as e:
+                        upstream.record_failure((time.perf_counter() - started) * 1000)
+                        # Повторяем только ошибки установления соединения, как и в APIGateway
+                        retriable = isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout))
+                        if not retriable or attempt + 1 >= attempts:
+                            raise
+                        await asyncio.sleep(_get_retry_delay(upstream, attempt, url))
+                        continue
+
+                    latency_ms = (time.perf_counter() - started) * 1000
+                    if response.status_code >= 500:
+                        upstream.record_failure(latency_ms)
+                        if response.status_code in RETRY_STATUS_CODES and attempt + 1 < attempts:
+                            await asyncio.sleep(_get_retry_delay(upstream, attempt, url))
+                            continue
+                    else:
+                        upstream.record_success(latency_ms)
+                finally:
+                    # Отмена (CancelledError) или непредвиденная ошибка пробного запроса
+                    # не должны оставлять circuit breaker открытым навсегда
+                    upstream.release_trial(trial)
+                break
+
+            logger.info(f"Response status: {response.status_code}")
+            _raise_for_error_response(response)
+            return response.json()
+
+        except httpx.TimeoutException as e:
+            logger.error(f"Request timeout to {url}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+                detail=f"Request to service timed out: {url}"
+            )
+        except httpx.NetworkError as e:
+            logger.error(f"Connection error to {url}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail=f"Cannot connect to service at {url}. Please check if the service is running."
+            )
+        except httpx.RequestError as e:
+            logger.error(f"Request error to {url}: {str(e)}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Request error: {str(e)}"
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Unexpected error in API Gateway: {str(e)}", exc_info=True)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Internal gateway error: {str(e)}"
+            )
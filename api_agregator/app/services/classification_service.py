@@ -0,0 +1,256 @@
+import importlib.util
+import logging
+import os
+from functools import lru_cache
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from app.config import settings
+from app.db.redis.classification_cache import ClassificationCache
+from app.services.api_getaway import APIGateway
+
+logger = logging.getLogger(__name__)
+
+
+@lru_cache()
+def _load_discovery_provider(library_path: str) -> Any:
+    """
+    Импортирует docker_classification и возвращает общий для процесса DiscoveryProvider.
+
+    Модуль загружается по пути, так как оба сервиса используют пакет `app`.
+    Результат кешируется, поэтому правила читаются один раз на процесс
+    и перечитываются только при изменении signatures.yml.
+
+    Args:
+        library_path: Путь к docker_classification/app/services/docker_clasification.py
+
+    Returns:
+        Any: Экземпляр DiscoveryProvider
+    """
+    spec = importlib.util.spec_from_file_location("docker_clasification", library_path)
+    if spec is None or spec.loader is None:
+        raise ImportError(f"Cannot load classification library from {library_path}")
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logger.info("Using in-process classification from %s", library_path)
+    return module.get_discovery_provider()
+
+
+class ClassificationService:
+    """
+    Сервис классификации контейнеров (определение технологического стека).
+
+    Работает в одном из двух режимов:
+    - HTTP: контейнеры отправляются пачками в /api/v1/classificate/batch сервиса docker_classification;
+    - библиотечный: если задан CLASSIFICATION_LIBRARY_PATH, WeightedDiscovery импортируется
+      напрямую из docker_classification и классификация выполняется в процессе, без HTTP.
+
+    Результаты кешируются в Redis по отпечатку контейнера (ClassificationCache), поэтому
+    классифицируются только новые или изменившиеся контейнеры.
+    """
+
+    def __init__(self):
+        """
+        Инициализация сервиса классификации.
+
+        Если не задан ни CLASSIFICATION_LIBRARY_PATH, ни DOCKER_CLASSIFICATION_API_URL,
+        классификация отключена и для всех контейнеров возвращается пустой результат.
+        """
+        load_dotenv()
+        self.batch_size = max(1, settings.classification_batch_size)
+        self._discovery_provider = None
+        self._gateway = None
+        self._cache = None
+        self._rules_version = None
+
+        if settings.classification_library_path:
+            self._discovery_provider = _load_discovery_provider(settings.classification_library_path)
+        else:
+            docker_classification_api_url = os.getenv("DOCKER_CLASSIFICATION_API_URL")
+            if docker_classification_api_url:
+                self._gateway = APIGateway(docker_classification_api_url)
+
+        if self.enabled and settings.classification_cache_enabled:
+            try:
+                self._cache = ClassificationCache()
+            except Exception as e:
+                logger.warning(f"Classification cache is unavailable, classifying without cache: {str(e)}")
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Доступна ли классификация.
+
+        Returns:
+            bool: True, если настроен HTTP или библиотечный режим
+        """
+        return self._discovery_provider is not None or self._gateway is not None
+
+    @staticmethod
+    def get_container_params(container: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Извлекает из docker inspect параметры, по которым выполняется классификация.
+
+        Args:
+            container: Данные о контейнере из Docker API
+
+        Returns:
+            Dict[str, Any]: Метки, переменные окружения, образ и открытые порты
+        """
+        config = container.get("Config") or {}
+        return {
+            "labels": config.get("Labels") or {},
+            "envs": config.get("Env") or [],
+            "image": config.get("Image") or "",
+            "ports": [port.split("/")[0] for port in (config.get("ExposedPorts") or {}).keys()],
+        }
+
+    def classify(self, containers: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Классифицирует список контейнеров.
+
+        Результаты сначала ищутся в кеше, классифицируются только промахи
+        (одинаковые контейнеры - один раз). В HTTP режиме выполняется один запрос
+        на каждые batch_size контейнеров.
+
+        Args:
+            containers: Список данных о контейнерах из Docker API
+
+        Returns:
+            List[Dict[str, Any]]: Результаты классификации в порядке входного списка
+        """
+        if not self.enabled:
+            return [{} for _ in containers]
+
+        params = [self.get_container_params(container) for container in containers]
+
+        discovery = self._discovery_provider.get() if self._discovery_provider is not None else None
+        version = discovery.version if discovery is not None else self._get_remote_rules_version()
+        if self._cache is None or not version:
+            return self._classify_params(discovery, params)
+
+        fingerprints = [ClassificationCache.fingerprint(container_params) for container_params in params]
+        try:
+            self._cache.ensure_version(version)
+            known = self._cache.get_many(version, fingerprints)
+        except Exception as e:
+            logger.warning(f"Error reading classification cache: {str(e)}")
+            return self._classify_params(discovery, params)
+
+        missing = {}
+        for fingerprint, container_params in zip(fingerprints, params):
+            if fingerprint not in known and fingerprint not in missing:
+                missing[fingerprint] = container_params
+
+        if missing:
+            classified = dict(zip(missing, self._classify_params(discovery, list(missing.values()))))
+            known.update(classified)
+            try:
+                self._cache.set_many(
+                    version,
+                    {fingerprint: result for fingerprint, result in classified.items() if "error" not in result}
+                )
+            except Exception as e:
+                logger.warning(f"Error writing classification cache: {str(e)}")
+
+        try:
+            self._cache.record(hits=len(params) - len(missing), misses=len(missing))
+        except Exception as e:
+            logger.warning(f"Error updating classification cache stats: {str(e)}")
+
+        return [known.get(fingerprint, {}) for fingerprint in fingerprints]
+
+    def _classify_params(self, discovery: Any, params: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Классифицирует контейнеры без обращения к кешу.
+
+        В HTTP режиме контейнеры без образа не отправляются: docker_classification отклоняет
+        такую пачку целиком, поэтому для них сразу возвращается результат с ошибкой.
+
+        Args:
+            discovery: Экземпляр WeightedDiscovery для библиотечного режима или None
+            params: Параметры контейнеров для классификации
+
+        Returns:
+            List[Dict[str, Any]]: Результаты классификации в порядке входного списка
+
+        Raises:
+            ValueError: Если docker_classification вернул не по одному результату на контейнер пачки
+        """
+        if discovery is not None:
+            return [self._classify_local(discovery, container_params) for container_params in params]
+
+        results: List[Dict[str, Any]] = [
+            {} if container_params["image"] else {"error": "Container image is empty"}
+            for container_params in params
+        ]
+        indexes = [index for index, container_params in enumerate(params) if container_params["image"]]
+        for start in range(0, len(indexes), self.batch_size):
+            batch = indexes[start:start + self.batch_size]
+            response = self._gateway.make_request(
+                method="POST",
+                endpoint="/api/v1/classificate/batch",
+                json_data=[params[index] for index in batch]
+            )
+            batch_results = response.get("results", [])
+            if len(batch_results) != len(batch):
+                raise ValueError(
+                    f"Classification service returned {len(batch_results)} results "
+                    f"for a batch of {len(batch)} containers"
+                )
+            for index, result in zip(batch, batch_results):
+                results[index] = result
+        return results
+
+    def _get_remote_rules_version(self) -> str | None:
+        """
+        Возвращает версию набора правил docker_classification.
+
+        Версия запрашивается один раз на экземпляр сервиса (на один цикл обновления).
+
+        Returns:
+            str | None: Версия правил или None, если получить ее не удалось
+        """
+        if self._rules_version is None:
+            try:
+                stats = self._gateway.make_request(method="GET", endpoint="/api/v1/classificate/stats")
+                self._rules_version = stats.get("version")
+            except Exception as e:
+                logger.warning(f"Cannot get classification rules version, cache is bypassed: {str(e)}")
+        return self._rules_version
+
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """
+        Статистика кеша результатов классификации.
+
+        Returns:
+            Dict[str, Any]: Счетчики попаданий и промахов, размер кеша и версия правил
+        """
+        if self._cache is None:
+            return {"enabled": False}
+        return {"enabled": True, **self._cache.get_stats()}
+
+    @staticmethod
+    def _classify_local(discovery: Any, container_params: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Классифицирует контейнер в процессе через WeightedDiscovery.
+
+        Args:
+            discovery: Экземпляр WeightedDiscovery
+            container_params: Параметры контейнера для классификации
+
+        Returns:
+            Dict[str, Any]: Результат в формате ответа docker_classification
+        """
+        try:
+            result = discovery.classify_container(
+                container_params["labels"],
+                container_params["envs"],
+                container_params["image"],
+                container_params["ports"],
+            )
+            return {"result": [list(item) for item in result]}
+        except Exception as e:
+            logger.error(f"Error classifying container: {str(e)}", exc_info=True)
+            return {"error": str(e)}
@@ -0,0 +1,165 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.redis.container_configs import ContainerConfigs
+from app.models.postgres.container import Container
+from app.models.postgres.prometheus_config import PrometheusConfig
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerConfigsService:
+    """
+    Сервис материализованного представления конфигураций Prometheus контейнеров.
+
+    Для каждого контейнера в Redis хранится выбранная конфигурация и данные для поиска
+    его экспортера. Представление обновляется точечно после изменения конфигураций в БД
+    и при синхронизации контейнеров, а списки контейнеров читают его вместо БД.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Инициализация сервиса представления конфигураций.
+
+        Args:
+            db: Сессия базы данных SQLAlchemy
+        """
+        self.db = db
+        self.view = ContainerConfigs()
+
+    @staticmethod
+    def select_configs(configs: List[PrometheusConfig]) -> Dict[str, PrometheusConfig]:
+        """
+        Выбирает по одной конфигурации Prometheus на контейнер.
+
+        Предпочитается активная конфигурация, среди конфигураций с одинаковым статусом - самая новая.
+
+        Args:
+            configs: Конфигурации Prometheus
+
+        Returns:
+            Dict[str, PrometheusConfig]: Идентификатор контейнера -> конфигурация
+        """
+        config_map = {}
+        for config in configs:
+            if config.container_id not in config_map:
+                config_map[config.container_id] = config
+            else:
+                existing = config_map[config.container_id]
+                if config.status == "active" and existing.status != "active":
+                    config_map[config.container_id] = config
+                elif config.status == existing.status:
+                    if config.created_at and existing.created_at:
+                        if config.created_at > existing.created_at:
+                            config_map[config.container_id] = config
+        return config_map
+
+    @staticmethod
+    def to_view_config(config: PrometheusConfig, container_name: Optional[str]) -> Dict[str, Any]:
+        """
+        Формирует запись представления по конфигурации из БД.
+
+        Args:
+            config: Выбранная конфигурация Prometheus
+            container_name: Имя контейнера из БД или None
+
+        Returns:
+            Dict[str, Any]: Запись представления
+        """
+        return {
+            "config_id": config.id,
+            "status": config.status,
+            "stack": config.stack,
+            "exporter_image": config.exporter_image,
+            "exporter_port": config.exporter_port,
+            "job_name": config.job_name,
+            "created_at": config.created_at.isoformat() if config.created_at else None,
+            "container_name": (container_name or config.container_name or "").lstrip("/"),
+            "host_name": (config.config_metadata or {}).get("host_name"),
+        }
+
+    def _load(self, container_ids: Optional[List[str]] = None) -> Dict[str, Dict[str, Any]]:
+        """
+        Читает выбранные конфигурации из БД.
+
+        Args:
+            container_ids: Идентификаторы контейнеров. Если None, читаются все конфигурации
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Записи представления (container_id -> config)
+        """
+        configs_query = self.db.query(PrometheusConfig)
+        names_query = self.db.query(Container.id, Container.name)
+        if container_ids is not None:
+            configs_query = configs_query.filter(PrometheusConfig.container_id.in_(container_ids))
+            names_query = names_query.filter(Container.id.in_(container_ids))
+
+        config_map = self.select_configs(configs_query.all())
+        if not config_map:
+            return {}
+        names = dict(names_query.all())
+        return {
+            container_id: self.to_view_config(config, names.get(container_id))
+            for container_id, config in config_map.items()
+        }
+
+    def rebuild(self) -> int:
+        """
+        Перестраивает представление целиком по БД.
+
+        Returns:
+            int: Количество контейнеров с конфигурацией
+        """
+        configs = self._load()
+        self.view.replace_configs(configs)
+        return len(configs)
+
+    def ensure_ready(self) -> None:
+        """
+        Перестраивает представление, если оно не построено или было сброшено.
+        """
+        if not self.view.is_ready():
+            self.rebuild()
+
+    def refresh(self, container_ids: List[str]) -> None:
+        """
+        Обновляет записи представления для контейнеров после изменения их конфигураций.
+
+        Ошибка обновления не прерывает вызывающую операцию: представление сбрасывается
+        и будет перестроено при следующем чтении.
+
+        Args:
+            container_ids: Идентификаторы контейнеров
+        """
+        container_ids = list(dict.fromkeys(container_ids))
+        if not container_ids:
+            return
+        try:
+            configs = self._load(container_ids)
+            removed_ids = [container_id for container_id in container_ids if container_id not in configs]
+            self.view.update_configs(configs, removed_ids)
+        except Exception as e:
+            logger.error(f"Failed to refresh container configs view for {container_ids}: {e}", exc_info=True)
+            try:
+                self.view.invalidate()
+            except Exception:
+                logger.error("Failed to invalidate container configs view", exc_info=True)
+
+    def get_configs(self, container_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Возвращает выбранные конфигурации контейнеров из представления.
+
+        Args:
+            container_ids: Идентификаторы контейнеров
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Записи представления для контейнеров с конфигурацией
+        """
+        self.ensure_ready()
+        return {
+            container_id: config
+            for container_id, config in zip(container_ids, self.view.get_configs(container_ids))
+            if config is not None
+        }
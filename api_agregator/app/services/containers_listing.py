@@ -0,0 +1,350 @@
+import base64
+import bisect
+import json
+import logging
+from typing import Any, Dict, Iterator, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.db.redis.docker_containers import DockerContainers
+from app.models.containers_list import ContainerListFilters
+from app.services.container_configs_service import ContainerConfigsService
+
+logger = logging.getLogger(__name__)
+
+
+class ContainersListing:
+    """
+    Постраничная выдача контейнеров с фильтрами и проекцией полей.
+
+    Контейнеры упорядочены по (хост, идентификатор); курсор - закодированная пара последнего
+    просмотренного контейнера, поэтому выдача не требует построения полного списка в памяти.
+    Данные контейнеров, выбранные конфигурации Prometheus (представление containers:configs)
+    и статус экспортеров читаются из Redis только для контейнеров текущей страницы.
+    """
+
+    DEFAULT_LIMIT = 100
+    MAX_LIMIT = 1000
+    SUMMARY_INFO_FIELDS = frozenset({
+        "Id", "Name", "Created", "State", "State.Status", "Config.Image", "Config.Labels"
+    })
+
+    def __init__(self, db: Session):
+        """
+        Инициализация сервиса списка контейнеров.
+
+        Args:
+            db: Сессия базы данных SQLAlchemy
+        """
+        self.db = db
+        self.docker_containers = DockerContainers()
+        self.configs_service = ContainerConfigsService(db)
+
+    @staticmethod
+    def encode_cursor(ref: tuple[str, str]) -> str:
+        """
+        Кодирует курсор по ссылке на контейнер.
+
+        Args:
+            ref: Пара (имя хоста, идентификатор контейнера)
+
+        Returns:
+            str: Курсор
+        """
+        return base64.urlsafe_b64encode(json.dumps(list(ref)).encode("utf-8")).decode("ascii")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> tuple[str, str]:
+        """
+        Декодирует курсор.
+
+        Args:
+            cursor: Курсор из предыдущего ответа
+
+        Returns:
+            tuple[str, str]: Пара (имя хоста, идентификатор контейнера)
+
+        Raises:
+            ValueError: Если курсор некорректен
+        """
+        try:
+            host_name, container_id = json.loads(base64.urlsafe_b64decode(cursor.encode("ascii")))
+        except Exception as e:
+            raise ValueError(f"Invalid cursor: {cursor}") from e
+        return str(host_name), str(container_id)
+
+    @staticmethod
+    def build_prometheus_config(config: Dict[str, Any], exporter: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Формирует описание конфигурации Prometheus и экспортера контейнера.
+
+        Args:
+            config: Выбранная конфигурация из представления containers:configs
+            exporter: Запись экспортера из индекса или None, если экспортер не найден
+
+        Returns:
+            Dict[str, Any]: Поле prometheus_config элемента списка контейнеров
+        """
+        exporter_info = None
+        exporter_running = False
+        if exporter:
+            exporter_running = exporter["status"].lower() in ("running", "up")
+            exporter_info = {
+                "container_id": exporter["container_id"],
+                "name": exporter["name"],
+                "status": exporter["status"],
+                "image": exporter["image"],
+            }
+
+        return {
+            "config_id": config["config_id"],
+            "status": config["status"],
+            "stack": config["stack"],
+            "exporter_image": config["exporter_image"],
+            "exporter_port": config["exporter_port"],
+            "job_name": config["job_name"],
+            "created_at": config["created_at"],
+            "exporter": {
+                "exists": exporter_info is not None,
+                "running": exporter_running,
+                "container_id": exporter_info["container_id"] if exporter_info else None,
+                "info": exporter_info
+            }
+        }
+
+    @staticmethod
+    def project(item: Dict[str, Any], fields: List[str]) -> Dict[str, Any]:
+        """
+        Оставляет в элементе только указанные поля (пути через точку). Поле id сохраняется всегда.
+
+        Args:
+            item: Элемент списка контейнеров
+            fields: Пути полей, например info.Name или prometheus_config.exporter.running
+
+        Returns:
+            Dict[str, Any]: Элемент с выбранными полями
+        """
+        result = {"id": item["id"]}
+        for field in fields:
+            parts = field.split(".")
+            value = item
+            for part in parts:
+                if not isinstance(value, dict) or part not in value:
+                    break
+                value = value[part]
+            else:
+                target = result
+                for part in parts[:-1]:
+                    target = target.setdefault(part, {})
+                target[parts[-1]] = value
+        return result
+
+    @classmethod
+    def needs_full_info(cls, fields: Optional[List[str]], summary: bool) -> bool:
+        """
+        Нужен ли полный docker inspect для ответа.
+
+        Args:
+            fields: Запрошенные поля или None
+            summary: Вернуть краткий info, если поля не указаны
+
+        Returns:
+            bool: True, если запрошены поля info вне краткого набора
+        """
+        if not fields:
+            return not summary
+        return any(
+            field == "info" or (field.startswith("info.") and field[5:] not in cls.SUMMARY_INFO_FIELDS)
+            for field in fields
+        )
+
+    @staticmethod
+    def _get_stack(item: Dict[str, Any]) -> Optional[str]:
+        """
+        Технологический стек контейнера: результат классификации, иначе стек конфигурации.
+
+        Args:
+            item: Элемент списка контейнеров
+
+        Returns:
+            Optional[str]: Стек или None
+        """
+        result = (item.get("classification") or {}).get("result")
+        if result:
+            return result[0][0]
+        return (item.get("prometheus_config") or {}).get("stack")
+
+    def _matches(self, item: Dict[str, Any], filters: ContainerListFilters) -> bool:
+        """
+        Проверяет элемент на соответствие фильтрам.
+
+        Args:
+            item: Элемент списка контейнеров
+            filters: Фильтры
+
+        Returns:
+            bool: True, если элемент проходит все фильтры
+        """
+        if filters.state is not None:
+            status = (item.get("info", {}).get("State") or {}).get("Status") or ""
+            if status.lower() != filters.state.lower():
+                return False
+        if filters.stack is not None and (self._get_stack(item) or "").lower() != filters.stack.lower():
+            return False
+        if filters.has_prometheus_config is not None and item["has_prometheus_config"] != filters.has_prometheus_config:
+            return False
+        if filters.exporter_running is not None:
+            exporter_running = bool(item["prometheus_config"] and item["prometheus_config"]["exporter"]["running"])
+            if exporter_running != filters.exporter_running:
+                return False
+        return True
+
+    def _build_items(self, refs: List[tuple[str, str]], full_info: bool) -> List[Optional[Dict[str, Any]]]:
+        """
+        Собирает элементы списка для группы контейнеров.
+
+        Args:
+            refs: Пары (имя хоста, идентификатор контейнера)
+            full_info: Читать полный docker inspect
+
+        Returns:
+            List[Optional[Dict[str, Any]]]: Элементы в порядке refs; None, если контейнер удален
+        """
+        containers = self.docker_containers.get_containers_by_refs(refs, summary=not full_info)
+        container_ids = [container_id for (_, container_id), data in zip(refs, containers) if data]
+
+        configs = self.configs_service.get_configs(container_ids) if container_ids else {}
+
+        exporter_lookups = {}
+        for (host_name, container_id), data in zip(refs, containers):
+            config = configs.get(container_id)
+            if not data or not config:
+                continue
+            container_name = data["info"].get("Name", "").lstrip("/") or config["container_name"]
+            if container_name:
+                config_host_name = config["host_name"] or host_name
+                exporter_lookups[(host_name, container_id)] = (config_host_name, f"{container_name}-exporter")
+
+        exporters = {}
+        if exporter_lookups:
+            exporters = dict(zip(
+                exporter_lookups,
+                self.docker_containers.find_exporters(list(exporter_lookups.values()))
+            ))
+
+        items = []
+        for ref, data in zip(refs, containers):
+            if not data:
+                items.append(None)
+                continue
+            config = configs.get(ref[1])
+            items.append({
+                "id": ref[1],
+                **data,
+                "has_prometheus_config": config is not None,
+                "prometheus_config": (
+                    self.build_prometheus_config(config, exporters.get(ref)) if config is not None else None
+                ),
+            })
+        return items
+
+    def get_page(
+            self,
+            filters: ContainerListFilters,
+            fields: Optional[List[str]] = None,
+            summary: bool = True,
+            cursor: Optional[str] = None,
+            limit: int = DEFAULT_LIMIT
+    ) -> Dict[str, Any]:
+        """
+        Возвращает страницу списка контейнеров.
+
+        Контейнеры просматриваются группами по limit после курсора, пока страница не заполнится
+        или список не закончится.
+
+        Args:
+            filters: Фильтры
+            fields: Пути полей для проекции. Если не указаны, возвращаются все поля
+            summary: Если поля не указаны - вернуть info только с краткими полями
+            cursor: Курсор из предыдущего ответа
+            limit: Размер страницы (не более MAX_LIMIT)
+
+        Returns:
+            Dict[str, Any]: items - элементы страницы, next_cursor - курсор следующей страницы
+                или None, если список закончился
+
+        Raises:
+            ValueError: Если курсор некорректен
+        """
+        limit = max(1, min(limit, self.MAX_LIMIT))
+        refs = self.docker_containers.get_container_refs(filters.host_id)
+        index = bisect.bisect_right(refs, self.decode_cursor(cursor)) if cursor else 0
+        items, index = self._collect(refs, index, filters, fields, summary, limit)
+        return {
+            "items": items,
+            "next_cursor": self.encode_cursor(refs[index - 1]) if index < len(refs) else None,
+        }
+
+    def _collect(
+            self,
+            refs: List[tuple[str, str]],
+            index: int,
+            filters: ContainerListFilters,
+            fields: Optional[List[str]],
+            summary: bool,
+            limit: int
+    ) -> tuple[List[Dict[str, Any]], int]:
+        """
+        Набирает до limit элементов, просматривая refs начиная с index.
+
+        Args:
+            refs: Отсортированные ссылки на контейнеры
+            index: Позиция, с которой начинается просмотр
+            filters: Фильтры
+            fields: Пути полей для проекции
+            summary: Если поля не указаны - вернуть info только с краткими полями
+            limit: Максимальное количество элементов
+
+        Returns:
+            tuple[List[Dict[str, Any]], int]: Элементы и позиция первого непросмотренного контейнера
+        """
+        full_info = self.needs_full_info(fields, summary)
+        items = []
+        while index < len(refs) and len(items) < limit:
+            chunk = refs[index:index + limit]
+            for item in self._build_items(chunk, full_info):
+                index += 1
+                if item is None or not self._matches(item, filters):
+                    continue
+                items.append(self.project(item, fields) if fields else item)
+                if len(items) == limit:
+                    break
+        return items, index
+
+    def iter_items(
+            self,
+            filters: ContainerListFilters,
+            fields: Optional[List[str]] = None,
+            summary: bool = True,
+            page_size: int = DEFAULT_LIMIT
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        Последовательно выдает все элементы списка, читая их группами по page_size.
+
+        Список ссылок на контейнеры читается один раз, данные - по мере выдачи.
+
+        Args:
+            filters: Фильтры
+            fields: Пути полей для проекции
+            summary: Если поля не указаны - вернуть info только с краткими полями
+            page_size: Размер страницы чтения
+
+        Yields:
+            Dict[str, Any]: Элемент списка контейнеров
+        """
+        page_size = max(1, min(page_size, self.MAX_LIMIT))
+        refs = self.docker_containers.get_container_refs(filters.host_id)
+        index = 0
+        while index < len(refs):
+            items, index = self._collect(refs, index, filters, fields, summary, page_size)
+            yield from items
@@ -0,0 +1,118 @@
+from datetime import datetime
+from typing import Any, Dict, List
+
+from sqlalchemy import func, null
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.redis.docker_containers import DockerContainers
+from app.models.postgres.container import Container
+
+
+class ContainersPersistence:
+    """
+    Сохранение обнаруженных контейнеров в PostgreSQL.
+
+    Контейнеры хоста записываются одним пакетным INSERT ... ON CONFLICT DO UPDATE.
+    Записываются только контейнеры, digest которых отличается от сохраненного в строке,
+    поэтому неизменившиеся контейнеры не создают новых версий строк.
+    """
+
+    # Ограничение числа строк в одном INSERT (PostgreSQL допускает не более 65535 параметров)
+    MAX_ROWS_PER_STATEMENT = 1000
+
+    def __init__(self, db: Session):
+        """
+        Инициализация сервиса сохранения контейнеров.
+
+        Args:
+            db: Сессия базы данных SQLAlchemy
+        """
+        self.db = db
+
+    @staticmethod
+    def _to_row(container_id: str, data: Dict[str, Any], digest: str, now: datetime) -> Dict[str, Any]:
+        """
+        Формирует строку таблицы containers по данным синхронизации.
+
+        Args:
+            container_id: Идентификатор контейнера
+            data: Данные контейнера (info, classification, host_id, host_name)
+            digest: digest данных контейнера
+            now: Время записи
+
+        Returns:
+            Dict[str, Any]: Значения колонок
+        """
+        info = data.get("info", {})
+        classification_result = (data.get("classification") or {}).get("result") or None
+        return {
+            "id": container_id,
+            "name": info.get("Name", "").lstrip("/") or container_id,
+            "image": (info.get("Config") or {}).get("Image", ""),
+            "status": (info.get("State") or {}).get("Status", "unknown"),
+            "stack": classification_result[0][0] if classification_result else None,
+            # SQL NULL, а не JSON null: иначе COALESCE при конфликте затрет сохраненный результат
+            "classification_score": classification_result if classification_result else null(),
+            "docker_info": info,
+            "digest": digest,
+            "created_at": now,
+            "updated_at": now,
+        }
+
+    def upsert_host_containers(self, containers: Dict[str, Dict[str, Any]]) -> int:
+        """
+        Записывает изменившиеся контейнеры хоста в таблицу containers.
+
+        Сохраненные digest читаются одним запросом, затем изменившиеся и новые контейнеры
+        записываются пакетным upsert. Стек и результат классификации обновляются только если
+        контейнер классифицирован, чтобы не затирать стек, сохраненный при генерации конфигурации.
+
+        Args:
+            containers: Контейнеры хоста (container_id -> data)
+
+        Returns:
+            int: Количество записанных строк
+        """
+        if not containers:
+            return 0
+
+        digests = {container_id: DockerContainers.digest(data) for container_id, data in containers.items()}
+        stored = dict(
+            self.db.query(Container.id, Container.digest).filter(Container.id.in_(list(digests))).all()
+        )
+        now = datetime.utcnow()
+        rows: List[Dict[str, Any]] = [
+            self._to_row(container_id, containers[container_id], digest, now)
+            for container_id, digest in digests.items()
+            if stored.get(container_id) != digest
+        ]
+        if not rows:
+            return 0
+
+        try:
+            for start in range(0, len(rows), self.MAX_ROWS_PER_STATEMENT):
+                statement = insert(Container).values(rows[start:start + self.MAX_ROWS_PER_STATEMENT])
+                excluded = statement.excluded
+                statement = statement.on_conflict_do_update(
+                    index_elements=[Container.id],
+                    set_={
+                        "name": excluded.name,
+                        "image": excluded.image,
+                        "status": excluded.status,
+                        "stack": func.coalesce(excluded.stack, Container.stack),
+                        "classification_score": func.coalesce(
+                            excluded.classification_score, Container.classification_score
+                        ),
+                        "docker_info": excluded.docker_info,
+                        "digest": excluded.digest,
+                        "updated_at": excluded.updated_at,
+                    },
+                    where=Container.digest.is_distinct_from(excluded.digest),
+                )
+                self.db.execute(statement)
+            self.db.commit()
+        except Exception:
+            self.db.rollback()
+            raise
+        return len(rows)
@@ -1,9 +1,12 @@
 import logging
+import time
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 import requests
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.models.postgres.host import Host
 from app.db.redis.hosts import Hosts
 
@@ -85,33 +88,108 @@ class HostsService:
             return None
         return HostDTO(host_id=host.id, name=host.name, host=host.host, port=host.port)
 
-    def upload_hosts(self) -> dict[str, dict]:
+    def get_docker_api_url(self, host_id: str) -> str | None:
+        """
+        Возвращает URL docker_api на хосте.
+
+        Args:
+            host_id: Идентификатор хоста
+
+        Returns:
+            str | None: URL docker_api или None, если хост не найден
+        """
+        host_dto = self.get_host_by_id(host_id)
+        if not host_dto:
+            return None
+        # Преобразуем адрес хоста для Docker (localhost -> host.docker.internal)
+        return f"http://{self._resolve_host_for_docker(host_dto.host)}:{host_dto.port}"
+
+    def upload_hosts(self, force: bool = False) -> dict[str, dict]:
         """
         Проверяет хосты на работоспособность и записывает результат в Redis.
 
+        Хосты проверяются параллельно (не более settings.hosts_probe_max_workers одновременно).
+        Недоступные хосты проверяются повторно с экспоненциальной задержкой, до ее истечения
+        сохраняется прежний статус. Записи в Redis обновляются на месте.
+
+        Args:
+            force: Проверить все хосты, не учитывая задержку для недоступных
+
         Returns:
             dict[str, dict]: Словарь с данными о хостах (host_id -> data)
         """
         hosts = self.get_all_hosts_from_db()
+        previous = self.redis_hosts.get_hosts()
+        now = time.time()
+
         result = {}
+        hosts_to_probe = []
         for host in hosts:
             result[host.id] = {'name': host.name, 'host': host.host, 'port': host.port}
-            try:
-                resolved_host = self._resolve_host_for_docker(host.host)
-                base_url = f"http://{resolved_host}:{host.port}"
-                response = requests.get(f'{base_url}/health', timeout=3)
-                result[host.id]['status'] = response.status_code
-            except requests.exceptions.Timeout:
-                result[host.id]['status'] = 'timeout'
-            except requests.exceptions.ConnectionError:
-                result[host.id]['status'] = 'down'
-            except Exception as e:
-                result[host.id]['status'] = 'down'
-        
-        self.redis_hosts.delete_hosts()
-        self.redis_hosts.upload_hosts(result)
+            prev = previous.get(host.id) or {}
+            same_address = prev.get('host') == host.host and prev.get('port') == host.port
+            if not force and same_address and prev.get('next_probe_at', 0) > now:
+                result[host.id].update({
+                    'status': prev.get('status'),
+                    'failures': prev.get('failures', 0),
+                    'next_probe_at': prev['next_probe_at'],
+                })
+            else:
+                hosts_to_probe.append(host)
+
+        if hosts_to_probe:
+            max_workers = max(1, min(settings.hosts_probe_max_workers, len(hosts_to_probe)))
+            with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="host-probe") as executor:
+                statuses = list(executor.map(self._probe_host, hosts_to_probe))
+
+            for host, host_status in zip(hosts_to_probe, statuses):
+                prev = previous.get(host.id) or {}
+                failures = 0 if host_status == 200 else prev.get('failures', 0) + 1
+                result[host.id].update({
+                    'status': host_status,
+                    'failures': failures,
+                    'next_probe_at': now + self._get_backoff(failures) if failures else 0,
+                })
+
+        self.redis_hosts.replace_hosts(result)
+        logger.debug(f"Probed {len(hosts_to_probe)} of {len(hosts)} hosts")
         return result
 
+    def _probe_host(self, host: HostDTO) -> int | str:
+        """
+        Проверяет /health docker_api на хосте.
+
+        Args:
+            host: DTO хоста
+
+        Returns:
+            int | str: HTTP статус ответа, 'timeout' или 'down'
+        """
+        try:
+            resolved_host = self._resolve_host_for_docker(host.host)
+            base_url = f"http://{resolved_host}:{host.port}"
+            response = requests.get(f'{base_url}/health', timeout=settings.hosts_probe_timeout)
+            return response.status_code
+        except requests.exceptions.Timeout:
+            return 'timeout'
+        except requests.exceptions.ConnectionError:
+            return 'down'
+        except Exception:
+            return 'down'
+
+    @staticmethod
+    def _get_backoff(failures: int) -> float:
+        """
+        Задержка до следующей проверки хоста после failures неудачных проверок подряд.
+
+        Args:
+            failures: Количество неудачных проверок подряд
+
+        Returns:
+            float: Задержка в секундах
+        """
+        return min(settings.hosts_probe_backoff_max, settings.hosts_probe_backoff_base * 2 ** (failures - 1))
+
     def add_host_to_redis(self, host_id: str, name: str, host: str, port: int) -> None:
         """
         Быстро добавляет один хост в Redis без проверки статуса.
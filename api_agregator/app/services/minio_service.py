@@ -1,6 +1,8 @@
 import os
 import logging
-from typing import Optional, Dict, Any, List
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, Dict, Any, Iterable, List
 
 import boto3
 import yaml
@@ -10,6 +12,70 @@ from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+# Количество одновременных запросов к MinIO при пакетном чтении
+MAX_WORKERS = int(os.getenv('MINIO_MAX_WORKERS', '16'))
+# Максимальное количество ключей в одном запросе DeleteObjects
+DELETE_BATCH_SIZE = 1000
+
+# Размер пула соединений общего клиента: запросы обработчиков и пакетные операции
+MAX_POOL_CONNECTIONS = int(os.getenv('MINIO_MAX_POOL_CONNECTIONS', '50'))
+BUCKET_NAME = 'prometheus'
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Возвращает общий для процесса клиент S3 (MinIO).
+
+    Клиент создается один раз и переиспользует пул соединений между запросами.
+    Клиенты boto3 потокобезопасны.
+
+    Returns:
+        botocore.client.S3: Клиент S3
+    """
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            load_dotenv()
+            _s3_client = boto3.client(
+                's3',
+                endpoint_url=os.getenv('MINIO_ENDPOINT'),
+                aws_access_key_id=os.getenv('MINIO_USR'),
+                aws_secret_access_key=os.getenv('MINIO_PWD'),
+                config=Config(signature_version='s3v4', max_pool_connections=MAX_POOL_CONNECTIONS),
+                region_name='us-east-1'
+            )
+        return _s3_client
+
+
+def ensure_bucket() -> None:
+    """
+    Создает бакет, если его нет. Вызывается один раз при старте приложения.
+    """
+    client = get_s3_client()
+    try:
+        client.head_bucket(Bucket=BUCKET_NAME)
+    except ClientError:
+        client.create_bucket(Bucket=BUCKET_NAME)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает общий для процесса пул потоков для пакетных запросов к MinIO.
+
+    Returns:
+        ThreadPoolExecutor: Пул потоков размером MAX_WORKERS
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='minio')
+        return _executor
+
 
 class MinioService:
     """
@@ -22,24 +88,10 @@ class MinioService:
         """
         Инициализация сервиса MinIO.
 
-        Загружает параметры подключения из переменных окружения.
+        Использует общий для процесса клиент S3; наличие бакета проверяется при старте приложения.
         """
-        load_dotenv()
-
-        endpoint = os.getenv('MINIO_ENDPOINT')
-        access_key = os.getenv('MINIO_USR')
-        secret_key = os.getenv('MINIO_PWD')
-
-        self.bucket_name = 'prometheus'
-
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=endpoint,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version='s3v4'),
-            region_name='us-east-1'
-        )
+        self.bucket_name = BUCKET_NAME
+        self.s3_client = get_s3_client()
 
     def _get_file(self, file_path: str, bucket: Optional[str] = None) -> Optional[str]:
         """
@@ -80,6 +132,8 @@ class MinioService:
         """
         Выводит список файлов в бакете с заданным префиксом.
 
+        Список читается постранично, поэтому возвращаются все файлы, а не первые 1000.
+
         Args:
             prefix: Префикс для фильтрации файлов
             bucket: Имя бакета. Если None, используется bucket_name по умолчанию.
@@ -90,9 +144,9 @@ class MinioService:
         bucket = bucket or self.bucket_name
         result = []
         try:
-            response = self.s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
-            if 'Contents' in response:
-                for obj in response['Contents']:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
                     result.append(obj['Key'])
             return result
         except ClientError as e:
@@ -103,6 +157,8 @@ class MinioService:
         """
         Получает все YAML файлы с заданным префиксом.
 
+        Файлы загружаются параллельно в общем пуле потоков.
+
         Args:
             conf_path: Префикс пути к файлам
             bucket: Имя бакета. Если None, используется bucket_name по умолчанию.
@@ -112,11 +168,11 @@ class MinioService:
         """
         bucket = bucket or self.bucket_name
         files_paths = self._list_files(prefix=conf_path, bucket=bucket)
-        result = {}
-        for file_path in files_paths:
-            content = self._get_yaml_file(file_path, bucket)
-            result[file_path.split('/')[-1]] = content
-        return result
+        contents = get_executor().map(lambda file_path: self._get_yaml_file(file_path, bucket), files_paths)
+        return {
+            file_path.split('/')[-1]: content
+            for file_path, content in zip(files_paths, contents)
+        }
 
     def delete_file(self, file_path: str, bucket: Optional[str] = None) -> bool:
         """
@@ -137,6 +193,36 @@ class MinioService:
             logger.error(f"Ошибка при удалении файла {file_path}: {e}")
             return False
 
+    def delete_files(self, file_paths: Iterable[str], bucket: Optional[str] = None) -> int:
+        """
+        Удаляет файлы из MinIO пакетами по DELETE_BATCH_SIZE ключей в запросе.
+
+        Args:
+            file_paths: Пути к файлам в MinIO
+            bucket: Имя бакета. Если None, используется bucket_name по умолчанию.
+
+        Returns:
+            int: Количество удаленных файлов
+        """
+        bucket = bucket or self.bucket_name
+        file_paths = list(dict.fromkeys(file_paths))
+        deleted_count = 0
+        for start in range(0, len(file_paths), DELETE_BATCH_SIZE):
+            batch = file_paths[start:start + DELETE_BATCH_SIZE]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={'Objects': [{'Key': file_path} for file_path in batch], 'Quiet': True}
+                )
+            except ClientError as e:
+                logger.error(f"Ошибка при удалении файлов: {e}")
+                continue
+            errors = response.get('Errors', [])
+            for error in errors:
+                logger.error(f"Ошибка при удалении файла {error.get('Key')}: {error.get('Message')}")
+            deleted_count += len(batch) - len(errors)
+        return deleted_count
+
     def delete_files_by_prefix(self, prefix: str, bucket: Optional[str] = None) -> int:
         """
         Удаляет все файлы с заданным префиксом из MinIO.
@@ -151,19 +237,9 @@ class MinioService:
         bucket = bucket or self.bucket_name
         try:
             files_to_delete = self._list_files(prefix=prefix, bucket=bucket)
-
             if not files_to_delete:
                 return 0
-
-            deleted_count = 0
-            for file_path in files_to_delete:
-                try:
-                    self.s3_client.delete_object(Bucket=bucket, Key=file_path)
-                    deleted_count += 1
-                except ClientError as e:
-                    logger.error(f"Ошибка при удалении файла {file_path}: {e}")
-
-            return deleted_count
+            return self.delete_files(files_to_delete, bucket=bucket)
         except Exception as e:
             logger.error(f"Ошибка при удалении файлов с префиксом {prefix}: {e}")
             return 0
@@ -0,0 +1,425 @@
+"""Bulk onboarding service module."""
+
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Optional
+
+from dotenv import load_dotenv
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.db.postgres.database import SessionLocal
+from app.db.redis.docker_containers import DockerContainers
+from app.db.redis.onboarding_jobs import OnboardingJobs
+from app.models.containers_list import ContainerListFilters
+from app.models.onboarding import OnboardingRequest
+from app.services.api_getaway import APIGateway
+from app.services.containers_listing import ContainersListing
+from app.services.prometheus_configs_service import PrometheusConfigsService
+from app.services.update_containers import UpdateContainers
+
+logger = logging.getLogger(__name__)
+
+
+class ExporterPortAllocator:
+    """
+    Выбор внешних портов экспортеров на хостах в рамках одной задачи подключения.
+
+    При первом обращении к хосту занятые порты читаются из Redis (порты, опубликованные
+    контейнерами хоста). Выданные порты запоминаются, поэтому одновременно запускаемые
+    экспортеры одного хоста получают разные порты: вместо занятого выдается ближайший
+    свободный порт выше желаемого.
+    """
+
+    MAX_PORT = 65535
+
+    def __init__(self, docker_containers: Optional[DockerContainers] = None):
+        """
+        Инициализация выбора портов.
+
+        Args:
+            docker_containers: Хранилище контейнеров в Redis. Если None, создается при первом обращении
+        """
+        self._docker_containers = docker_containers
+        self._lock = threading.Lock()
+        self._used: Dict[str, set[int]] = {}
+
+    def _get_used(self, host_id: str) -> set[int]:
+        """
+        Возвращает занятые порты хоста, читая их из Redis при первом обращении.
+        Вызывается под блокировкой.
+
+        Args:
+            host_id: Идентификатор хоста
+
+        Returns:
+            set[int]: Занятые и выданные порты хоста
+        """
+        if host_id not in self._used:
+            if self._docker_containers is None:
+                self._docker_containers = DockerContainers()
+            self._used[host_id] = self._docker_containers.get_published_ports(host_id)
+        return self._used[host_id]
+
+    def reserve(self, host_id: str, port: int) -> None:
+        """
+        Отмечает порт хоста занятым (например, порт экспортера, запущенного до перезапуска задачи).
+
+        Args:
+            host_id: Идентификатор хоста
+            port: Порт
+        """
+        with self._lock:
+            self._get_used(host_id).add(port)
+
+    def allocate(self, host_id: str, desired: int) -> int:
+        """
+        Выдает свободный порт хоста, не меньший желаемого.
+
+        Args:
+            host_id: Идентификатор хоста
+            desired: Желаемый порт
+
+        Returns:
+            int: Выданный порт
+
+        Raises:
+            ValueError: Если на хосте нет свободного порта не меньше желаемого
+        """
+        with self._lock:
+            used = self._get_used(host_id)
+            port = int(desired)
+            while port in used:
+                port += 1
+            if port > self.MAX_PORT:
+                raise ValueError(f"No free port starting from {desired} on host {host_id}")
+            used.add(port)
+            return port
+
+
+class OnboardingService:
+    """
+    Массовое подключение контейнеров к мониторингу.
+
+    Задача выполняется в Celery (app.tasks.run_onboarding), состояние задачи и элементов
+    хранится в Redis (OnboardingJobs). Элементы обрабатываются параллельно: генерация
+    конфигурации, выбор свободного порта на хосте и запуск экспортера; затем все запущенные
+    экспортеры регистрируются в основном конфиге Prometheus одной записью.
+
+    Выполнение возобновляемо: при повторном запуске задачи (перезапуск воркера или повтор
+    по запросу) зарегистрированные и неуспешные элементы пропускаются, экспортеры,
+    запущенные без регистрации (exporter_started_unregistered), регистрируются заново,
+    а прерванные элементы обрабатываются с начала, если их экспортер еще не запущен.
+    """
+
+    # Элементы, обработка которых была прервана до запуска экспортера или во время него
+    IN_PROGRESS_STATUSES = ("pending", "generating", "starting_exporter")
+    STARTED_STATUSES = ("exporter_started", "exporter_started_unregistered")
+
+    def __init__(self, jobs: Optional[OnboardingJobs] = None):
+        """
+        Инициализация сервиса массового подключения.
+
+        Args:
+            jobs: Хранилище состояния задач. Если None, создается подключение к Redis
+        """
+        load_dotenv()
+        self.prometheus_generation_url = os.getenv("PROMETHEUS_GENERATION_URL")
+        self.jobs = jobs or OnboardingJobs()
+
+    @staticmethod
+    def select_containers(db: Session, request: OnboardingRequest) -> dict[str, dict[str, Any]]:
+        """
+        Выбирает контейнеры для подключения к мониторингу по селектору.
+
+        Контейнеры читаются из Redis; экспортеры не выбираются. Порты экспортеров
+        назначаются при запуске (ExporterPortAllocator).
+
+        Args:
+            db: Сессия базы данных
+            request: Запрос с селектором
+
+        Returns:
+            dict[str, dict[str, Any]]: Начальные состояния элементов (container_id -> состояние)
+        """
+        filters = ContainerListFilters(host_id=request.host_id, stack=request.stack)
+        fields = ["host_id", "info.Name", "info.Config.Labels", "has_prometheus_config"]
+        wanted_ids = set(request.container_ids)
+        items = {}
+
+        for container in ContainersListing(db).iter_items(filters, fields=fields):
+            if wanted_ids and container["id"] not in wanted_ids:
+                continue
+            info = container.get("info", {})
+            container_name = info.get("Name", "").lstrip("/")
+            if DockerContainers.exporter_index_name(container_name):
+                continue
+            labels = (info.get("Config") or {}).get("Labels") or {}
+            if any(
+                key not in labels or (value is not None and labels[key] != value)
+                for key, value in request.labels.items()
+            ):
+                continue
+
+            items[container["id"]] = {
+                "host_id": container["host_id"],
+                "name": container_name,
+                "has_config": container["has_prometheus_config"],
+                "port": None,
+                "status": "pending",
+                "error": None,
+                "config_id": None,
+                "job_name": None,
+            }
+        return items
+
+    @staticmethod
+    def _refresh_hosts_containers(host_ids: set[str]) -> None:
+        """
+        Обновляет контейнеры и индекс экспортеров хостов в Redis.
+
+        Args:
+            host_ids: Идентификаторы хостов
+        """
+        if not host_ids:
+            return
+        db = SessionLocal()
+        try:
+            update_containers = UpdateContainers(db=db)
+            for host_id in host_ids:
+                update_containers.upload_host_containers(host_id)
+        finally:
+            db.close()
+
+    def _recover_interrupted(self, items: dict[str, dict[str, Any]]) -> None:
+        """
+        Восстанавливает элементы, прерванные во время запуска экспортера.
+
+        Контейнеры хостов таких элементов перечитываются; если экспортер элемента уже
+        запущен, элемент считается запущенным, иначе обрабатывается с начала.
+
+        Args:
+            items: Состояния элементов (container_id -> состояние), обновляются на месте
+        """
+        interrupted = {
+            container_id: item for container_id, item in items.items()
+            if item["status"] == "starting_exporter" and item.get("port") and item.get("job_name")
+        }
+        if not interrupted:
+            return
+        self._refresh_hosts_containers({item["host_id"] for item in interrupted.values()})
+        exporters = DockerContainers().find_exporters([
+            (item["host_id"], f"{item['name']}-exporter") for item in interrupted.values()
+        ])
+        for (container_id, item), exporter in zip(interrupted.items(), exporters):
+            if exporter and exporter["host_name"] == item["host_id"]:
+                logger.info("Exporter of container %s was started before the job was interrupted", container_id)
+                item["status"] = "exporter_started"
+
+    def _onboard_container(
+            self,
+            job_id: str,
+            container_id: str,
+            item: dict[str, Any],
+            request: OnboardingRequest,
+            allocator: ExporterPortAllocator
+    ) -> None:
+        """
+        Генерирует конфигурацию и запускает экспортер для одного контейнера.
+
+        Каждый элемент использует собственную сессию БД: элементы обрабатываются параллельно.
+
+        Args:
+            job_id: Идентификатор задачи
+            container_id: Идентификатор контейнера
+            item: Состояние элемента, обновляется на месте
+            request: Запрос подключения
+            allocator: Выбор портов экспортеров на хостах
+        """
+        db = SessionLocal()
+        try:
+            configs_service = PrometheusConfigsService(db)
+            if request.regenerate or not item["has_config"]:
+                item["status"] = "generating"
+                self.jobs.update_items(job_id, {container_id: item})
+                host_dto, container_data = configs_service.get_host_and_container(item["host_id"], container_id)
+                if not host_dto or not container_data:
+                    raise ValueError("Host or container not found")
+                config_data = APIGateway(self.prometheus_generation_url).make_request(
+                    method='POST',
+                    endpoint='/api/v1/generate/',
+                    json_data=container_data,
+                    params={'host': host_dto.host}
+                )
+                item["config_id"] = configs_service.save_generated_config(
+                    container_id, item["host_id"], host_dto.host, container_data, config_data
+                )
+
+            prepared = configs_service.prepare_exporter_start(
+                container_id, item["port"] or request.port_start, allocate_port=allocator.allocate
+            )
+            if "error" in prepared:
+                raise ValueError(prepared["error"])
+
+            # Порт и job сохраняются до запуска: по ним прерванный элемент восстанавливается
+            item.update(status="starting_exporter", port=prepared["port"], job_name=prepared["job_name"])
+            self.jobs.update_items(job_id, {container_id: item})
+            response = APIGateway(prepared["docker_api_url"]).make_request(
+                method='POST',
+                endpoint='/api/v1/manage/container/pull_and_run',
+                json_data=prepared["json_data"],
+            )
+            run_result = response.get("result") if isinstance(response, dict) else None
+            if isinstance(run_result, dict) and run_result.get("error"):
+                raise ValueError(run_result["error"])
+
+            item["status"] = "exporter_started"
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            logger.warning("Onboarding of container %s failed: %s", container_id, detail)
+            item.update(status="failed", error=detail)
+        finally:
+            db.close()
+            self.jobs.update_items(job_id, {container_id: item})
+
+    def _build_services(self, items: dict[str, dict[str, Any]]) -> dict[str, dict[str, Any]]:
+        """
+        Формирует записи основного конфига для запущенных экспортеров.
+
+        Args:
+            items: Состояния запущенных элементов (container_id -> состояние)
+
+        Returns:
+            dict[str, dict[str, Any]]: Идентификатор контейнера -> данные AddServiceRequest
+        """
+        db = SessionLocal()
+        try:
+            configs_service = PrometheusConfigsService(db)
+            services = {}
+            for container_id, item in items.items():
+                prepared = configs_service.prepare_exporter_start(container_id, item["port"])
+                if "error" in prepared:
+                    item.update(status="exporter_started_unregistered", error=prepared["error"])
+                    continue
+                services[container_id] = configs_service.build_main_config_service(
+                    prepared["job_name"], prepared["target_address"], prepared["port"], prepared["service"]
+                )
+            return services
+        finally:
+            db.close()
+
+    def _register(self, items: dict[str, dict[str, Any]]) -> dict[str, Any] | None:
+        """
+        Регистрирует запущенные экспортеры в основном конфиге Prometheus одной записью.
+
+        При ошибке элементы получают статус exporter_started_unregistered: экспортеры
+        продолжают работать и регистрируются при повторе задачи.
+
+        Args:
+            items: Состояния запущенных элементов (container_id -> состояние), обновляются на месте
+
+        Returns:
+            dict[str, Any] | None: Ответ prometheus_generation, ошибка регистрации или None
+        """
+        services = self._build_services(items)
+        if not services:
+            return None
+        try:
+            main_config = APIGateway(self.prometheus_generation_url).make_request(
+                method='POST',
+                endpoint='/api/v1/main-config/bulk',
+                json_data={"add": list(services.values()), "remove": []}
+            )
+        except Exception as e:
+            detail = getattr(e, "detail", None) or str(e)
+            logger.error("Failed to register onboarded jobs in main config: %s", detail)
+            for container_id in services:
+                items[container_id].update(
+                    status="exporter_started_unregistered",
+                    error=f"Main config registration failed: {detail}"
+                )
+            return {"error": detail}
+        for container_id in services:
+            items[container_id].update(status="registered", error=None)
+        return main_config
+
+    @staticmethod
+    def _final_status(items: dict[str, dict[str, Any]], request: OnboardingRequest) -> str:
+        """
+        Определяет итоговый статус задачи по статусам элементов.
+
+        Args:
+            items: Состояния элементов
+            request: Запрос подключения
+
+        Returns:
+            str: completed - все элементы подключены, failed - ни один, partial - часть
+        """
+        success_status = "registered" if request.add_to_main_config else "exporter_started"
+        succeeded = sum(1 for item in items.values() if item["status"] == success_status)
+        if succeeded == len(items):
+            return "completed"
+        return "partial" if succeeded else "failed"
+
+    def run(self, job_id: str) -> dict[str, Any]:
+        """
+        Выполняет (или возобновляет) задачу массового подключения.
+
+        Args:
+            job_id: Идентификатор задачи
+
+        Returns:
+            dict[str, Any]: Итоговый статус задачи и количество элементов по статусам
+        """
+        if not self.jobs.acquire_lock(job_id, settings.onboarding_task_time_limit + 60):
+            logger.warning("Onboarding job %s is already running", job_id)
+            return {"job_id": job_id, "status": "running"}
+        try:
+            job = self.jobs.get_job(job_id)
+            if not job:
+                logger.warning("Onboarding job %s not found or expired", job_id)
+                return {"job_id": job_id, "status": "not_found"}
+            request = OnboardingRequest(**job["selector"])
+            items = job["items"]
+            self.jobs.set_status(job_id, "running")
+
+            allocator = ExporterPortAllocator()
+            self._recover_interrupted(items)
+            for item in items.values():
+                if item.get("port") and item["status"] in self.STARTED_STATUSES:
+                    allocator.reserve(item["host_id"], item["port"])
+
+            pending = {
+                container_id: item for container_id, item in items.items()
+                if item["status"] in self.IN_PROGRESS_STATUSES
+            }
+            concurrency = request.concurrency or settings.onboarding_max_concurrency
+            with ThreadPoolExecutor(max_workers=concurrency) as executor:
+                for container_id, item in pending.items():
+                    executor.submit(self._onboard_container, job_id, container_id, item, request, allocator)
+
+            started = {
+                container_id: item for container_id, item in items.items()
+                if item["status"] in self.STARTED_STATUSES
+            }
+            main_config = None
+            if request.add_to_main_config and started:
+                main_config = self._register(started)
+                self.jobs.update_items(job_id, started)
+
+            self._refresh_hosts_containers({
+                item["host_id"] for item in items.values()
+                if item["status"] in self.STARTED_STATUSES + ("registered",)
+            })
+            final_status = self._final_status(items, request)
+            self.jobs.set_status(job_id, final_status, main_config=main_config)
+            logger.info("Onboarding job %s finished with status %s", job_id, final_status)
+            return {"job_id": job_id, "status": final_status, "counts": self.jobs.get_job(job_id)["counts"]}
+        except Exception as e:
+            logger.error("Onboarding job %s failed: %s", job_id, e, exc_info=True)
+            self.jobs.set_status(job_id, "failed", error=str(e))
+            raise
+        finally:
+            self.jobs.release_lock(job_id)
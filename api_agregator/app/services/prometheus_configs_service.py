@@ -0,0 +1,359 @@
+"""Prometheus configs service module."""
+
+import logging
+from typing import Any, Callable
+
+from sqlalchemy.orm import Session
+
+from app.db.redis.docker_containers import DockerContainers
+from app.models.postgres.container import Container
+from app.models.postgres.prometheus_config import PrometheusConfig
+from app.services.container_configs_service import ContainerConfigsService
+from app.services.hosts_service import HostsService
+
+logger = logging.getLogger(__name__)
+
+
+class PrometheusConfigsService:
+    """
+    Сервис сгенерированных конфигураций Prometheus контейнеров.
+
+    Сохраняет ответы prometheus_generation в БД и собирает по сохраненной конфигурации
+    параметры запуска экспортера и запись сервиса для основного конфига Prometheus.
+    Используется обработчиками API и задачей массового подключения.
+    """
+
+    def __init__(self, db: Session):
+        """
+        Инициализация сервиса конфигураций Prometheus.
+
+        Args:
+            db: Сессия базы данных SQLAlchemy
+        """
+        self.db = db
+
+    def get_host_and_container(self, host_id: str, container_id: str) -> tuple[Any, dict]:
+        """
+        Загружает хост из БД и данные контейнера из Redis.
+
+        Args:
+            host_id: Идентификатор хоста
+            container_id: Идентификатор контейнера
+
+        Returns:
+            tuple[Any, dict]: DTO хоста (или None) и данные контейнера (или пустой словарь)
+        """
+        host_dto = HostsService(self.db).get_host_by_id(host_id)
+        if not host_dto:
+            return None, {}
+        return host_dto, DockerContainers().get_container(container_id, host_id)
+
+    def save_generated_config(
+            self,
+            container_id: str,
+            host_id: str,
+            host: str,
+            container_data: dict,
+            config_data: dict
+    ) -> int:
+        """
+        Сохраняет контейнер и сгенерированную конфигурацию Prometheus в БД
+        и обновляет запись представления containers:configs.
+
+        Args:
+            container_id: Идентификатор контейнера
+            host_id: Идентификатор хоста
+            host: Адрес хоста
+            container_data: Данные контейнера из Redis
+            config_data: Ответ prometheus_generation
+
+        Returns:
+            int: Идентификатор сохраненной конфигурации
+        """
+        info = container_data.get("info", {})
+        classification = container_data.get("classification", {})
+
+        container_name = (
+            info.get("Name", "").lstrip("/") or
+            info.get("Config", {}).get("Hostname", "unknown")
+        )
+
+        stack = None
+        if classification.get("result"):
+            stack = classification["result"][0][0] if classification["result"] else None
+
+        exporter_config = config_data.get("info", {})
+        config_file = config_data.get("config", {})
+
+        container = self.db.query(Container).filter(Container.id == container_id).first()
+
+        if not container:
+            classification_score = None
+            if classification.get("result"):
+                classification_score = classification.get("result")
+
+            container = Container(
+                id=container_id,
+                name=container_name,
+                image=info.get("Config", {}).get("Image", ""),
+                status=info.get("State", {}).get("Status", "unknown"),
+                stack=stack,
+                classification_score=classification_score,
+                docker_info=info
+            )
+            self.db.add(container)
+        else:
+            container.status = info.get("State", {}).get("Status", container.status)
+            container.docker_info = info
+            if stack:
+                container.stack = stack
+                container.classification_score = classification.get("result")
+
+        network_name = exporter_config.get("network")
+        exporter_image = exporter_config.get("exporter_image")
+        exporter_port = exporter_config.get("exporter_port")
+        job_name_suffix = exporter_config.get("job_name_suffix", "")
+
+        job_name = f"{container_name}{job_name_suffix}"
+
+        config_metadata = {
+            'host_name': host_id,
+            'config': config_file,
+            'info': {
+                'container_name': container_name,
+                'stack': stack,
+                'exporter_image': exporter_image,
+                'exporter_port': exporter_port,
+                'target_address': host,
+                'job_name': job_name,
+                'network': network_name,
+                'exporter_env_vars': exporter_config.get("env_vars", {}),
+            }
+        }
+
+        existing_config = self.db.query(PrometheusConfig).filter(
+            PrometheusConfig.container_id == container_id,
+            PrometheusConfig.status == "active"
+        ).order_by(PrometheusConfig.created_at.desc()).first()
+
+        if existing_config:
+            existing_config.container_name = container_name
+            existing_config.stack = stack
+            existing_config.exporter_image = exporter_image
+            existing_config.exporter_port = exporter_port
+            existing_config.target_address = host
+            existing_config.job_name = job_name
+            existing_config.minio_bucket = config_file.get("bucket")
+            existing_config.minio_file_path = config_file.get("file")
+            existing_config.config_metadata = config_metadata
+            existing_config.version += 1
+
+            prometheus_config = existing_config
+        else:
+            prometheus_config = PrometheusConfig(
+                container_id=container_id,
+                container_name=container_name,
+                stack=stack,
+                exporter_image=exporter_image,
+                exporter_port=exporter_port,
+                target_address=host,
+                job_name=job_name,
+                minio_bucket=config_file.get("bucket"),
+                minio_file_path=config_file.get("file"),
+                status="active",
+                config_metadata=config_metadata
+            )
+            self.db.add(prometheus_config)
+        self.db.commit()
+        self.db.refresh(prometheus_config)
+        ContainerConfigsService(self.db).refresh([container_id])
+        return prometheus_config.id
+
+    def main_config_service_fields(self, config: PrometheusConfig) -> dict[str, Any]:
+        """
+        Возвращает данные сервиса для основного конфига Prometheus: имя экспортера и идентичность
+        контейнера (стек, хост, имя), по которым prometheus_generation группирует jobs.
+
+        Args:
+            config: Конфигурация Prometheus контейнера
+
+        Returns:
+            dict[str, Any]: Поля exporter_name, stack, host и container_name для AddServiceRequest
+        """
+        container_name = config.container_name.lstrip("/")
+        host_id = (config.config_metadata or {}).get('host_name')
+        host = HostsService(self.db).get_host_by_id(host_id) if host_id else None
+        return {
+            "exporter_name": f"{container_name}-exporter",
+            "stack": config.stack,
+            "host": host.name if host and host.name else host_id,
+            "container_name": container_name,
+        }
+
+    def prepare_exporter_start(
+            self,
+            container_id: str,
+            port: int | None,
+            allocate_port: Callable[[str, int], int] | None = None
+    ) -> dict[str, Any]:
+        """
+        Собирает параметры запуска экспортера из сохраненной конфигурации, БД и Redis.
+
+        Args:
+            container_id: Идентификатор контейнера
+            port: Внешний порт экспортера. Если None, используется порт экспортера из конфигурации
+            allocate_port: Выбор внешнего порта на хосте по идентификатору хоста и желаемому порту.
+                Если задан, порт экспортера может быть заменен свободным
+
+        Returns:
+            dict[str, Any]: Параметры запуска (host_id, docker_api_url, json_data, network,
+                environment, stack, port, job_name, target_address, service) или словарь с ключом error
+        """
+        config = self.db.query(PrometheusConfig).filter(
+            PrometheusConfig.container_id == container_id,
+            PrometheusConfig.status == "active"
+        ).order_by(PrometheusConfig.created_at.desc()).first()
+
+        if not config:
+            logger.error("No active config found for container %s", container_id)
+            return {
+                "error": "No active config found for this container",
+                "container_id": container_id
+            }
+
+        config_metadata = config.config_metadata or {}
+        host_id = config_metadata.get('host_name', 'localhost')
+
+        # Получаем адрес хоста для обращения к docker_api
+        docker_api_host_url = HostsService(self.db).get_docker_api_url(host_id)
+        if not docker_api_host_url:
+            logger.error("Host %s not found", host_id)
+            return {
+                "error": f"Host {host_id} not found",
+                "container_id": container_id
+            }
+
+        docker_containers = DockerContainers()
+        container_data = docker_containers.get_container(container_id, host_id)
+
+        # Если не найден с host_id, пробуем найти без фильтра по хосту
+        if not container_data:
+            logger.warning("Container %s not found with host_id %s, trying to find without host filter", container_id, host_id)
+            found_host_id = docker_containers.find_container_host(container_id)
+            container_data = docker_containers.get_container(container_id, found_host_id) if found_host_id else {}
+
+            if container_data:
+                logger.info("Container found without host filter, using it")
+            else:
+                logger.error("Target container %s not found in Redis at all", container_id)
+                return {
+                    "error": "Target container not found in Redis. Please update containers first.",
+                    "container_id": container_id
+                }
+
+        exporter_info = config_metadata.get('info', {})
+
+        network_name = exporter_info.get("network")
+        exporter_env_vars = exporter_info.get("exporter_env_vars", {})
+
+        if not network_name or not exporter_env_vars:
+            logger.warning(
+                "Network or env_vars not found in config_metadata for %s, "
+                "trying to get from Redis",
+                container_id
+            )
+
+            container_info = container_data.get("info", {})
+
+            if not container_info:
+                logger.error("Container info is empty for %s", container_id)
+                return {
+                    "error": "Container info is empty",
+                    "container_id": container_id
+                }
+
+            if not network_name:
+                network_settings = container_info.get('NetworkSettings', {})
+                networks = network_settings.get('Networks', {})
+                if networks:
+                    network_names = list(networks.keys())
+                    network_name = (
+                        'bridge' if 'bridge' in network_names else
+                        network_names[0] if network_names else None
+                    )
+
+            if not exporter_env_vars:
+                logger.warning("Env vars not found in config, need to regenerate config for %s", container_id)
+                return {
+                    "error": "Env vars not found in config. Please regenerate config first.",
+                    "container_id": container_id
+                }
+
+        if not network_name:
+            logger.error("Target container %s has no networks. Container must be running.", container_id)
+            return {
+                "error": "Target container has no networks. Container must be running.",
+                "container_id": container_id
+            }
+
+        host_port = port or config.exporter_port
+        if allocate_port is not None:
+            host_port = allocate_port(host_id, host_port)
+        json_data = {
+            "image_name": config.exporter_image,
+            "name": f"{config.container_name}-exporter",
+            "ports": {f"{config.exporter_port}/tcp": host_port},
+            "detach": True,
+            "network": network_name
+        }
+
+        if exporter_env_vars:
+            json_data["environment"] = exporter_env_vars
+            logger.info("Using env vars from config: %s", exporter_env_vars)
+        else:
+            logger.warning(
+                "No env vars in config for container %s. "
+                "Exporter may not work correctly.",
+                container_id
+            )
+
+        return {
+            "host_id": host_id,
+            "docker_api_url": docker_api_host_url,
+            "json_data": json_data,
+            "network": network_name,
+            "environment": exporter_env_vars,
+            "stack": config.stack,
+            "port": host_port,
+            "job_name": config.job_name,
+            "target_address": config.target_address,
+            "service": self.main_config_service_fields(config),
+        }
+
+    @staticmethod
+    def build_main_config_service(job_name: str, target_address: str, port: int, service: dict[str, Any]) -> dict[str, Any]:
+        """
+        Формирует запись сервиса для основного конфига Prometheus.
+
+        Args:
+            job_name: Имя job
+            target_address: Адрес хоста экспортера
+            port: Внешний порт экспортера
+            service: Данные сервиса (exporter_name, stack, host, container_name)
+
+        Returns:
+            dict[str, Any]: Данные AddServiceRequest
+        """
+        return {
+            "scrape_config": {
+                "scrape_configs": [{
+                    "job_name": job_name,
+                    "scrape_interval": "15s",
+                    "scrape_timeout": "10s",
+                    "file_sd_configs": [{"files": [f"targets/{job_name}.yml"]}],
+                }]
+            },
+            "target": [{"targets": [f"{target_address}:{port}"], "labels": {}}],
+            "target_name": f"{job_name}.yml",
+            **service,
+        }
@@ -1,14 +1,19 @@
-import json
 import logging
 import os
-from typing import Any, Dict
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict
 
 from dotenv import load_dotenv
 from sqlalchemy.orm import Session
 
+from app.config import settings
 from app.db.postgres.database import get_db
 from app.db.redis.docker_containers import DockerContainers
 from app.services.api_getaway import APIGateway
+from app.services.classification_service import ClassificationService
+from app.services.container_configs_service import ContainerConfigsService
+from app.services.containers_persistence import ContainersPersistence
 from app.services.hosts_service import HostsService
 
 logger = logging.getLogger(__name__)
@@ -35,10 +40,7 @@ class UpdateContainers:
         """
         load_dotenv()
         self._external_db: Session | None = db
-        docker_classification_api_url = os.getenv("DOCKER_CLASSIFICATION_API_URL")
-        self._classification_gateway = (
-            APIGateway(docker_classification_api_url) if docker_classification_api_url else None
-        )
+        self._classification_service = ClassificationService()
 
     def _get_db(self) -> Session:
         """
@@ -51,45 +53,89 @@ class UpdateContainers:
             return self._external_db
         return next(get_db())
 
-    def _classificate_container(
+    def _resolve_docker_api_url(self, host_data: Dict[str, Any]) -> str:
+        """
+        Формирует URL docker_api для хоста.
+
+        Args:
+            host_data: Данные о хосте из Redis
+
+        Returns:
+            str: URL в формате http://host:port
+        """
+        # Преобразуем localhost в host.docker.internal для Docker
+        host = host_data["host"]
+        if os.path.exists('/.dockerenv'):
+            if host in ('localhost', '127.0.0.1', '0.0.0.0'):
+                host = 'host.docker.internal'
+        return f'http://{host}:{host_data["port"]}'
+
+    def _get_host_containers(
         self,
-        container: Dict[str, Any],
-        classification_gateway: APIGateway,
-    ) -> Dict[str, Any]:
+        host_id: str,
+        host_data: Dict[str, Any],
+    ) -> Dict[str, Dict[str, Any]]:
         """
-        Классификация контейнера (определение технологий) по информации о нем.
+        Получение и классификация контейнеров одного хоста.
 
         Args:
-            container: Данные о контейнере из Docker API
-            classification_gateway: Gateway для обращения к сервису классификации
+            host_id: Идентификатор хоста
+            host_data: Данные о хосте из Redis
 
         Returns:
-            Dict[str, Any]: Результат классификации
-        """
-        container_params = {
-            "labels": container.get("Config", {}).get("Labels"),
-            "envs": container.get("Config", {}).get("Env"),
-            "image": container.get("Config", {}).get("Image"),
-            "ports": [
-                port.split("/")[0]
-                for port in container.get("Config", {}).get("ExposedPorts", {}).keys()
-            ]
-            if container.get("Config", {}).get("ExposedPorts")
-            else [],
-        }
-        classificate_response = classification_gateway.make_request(
+            Dict[str, Dict[str, Any]]: Словарь с данными о контейнерах хоста (container_id -> data)
+        """
+        docker_api = APIGateway(self._resolve_docker_api_url(host_data))
+        # Таймаут на запрос к хосту, чтобы один медленный хост не задерживал остальные
+        docker_api.timeout = settings.discovery_host_timeout
+
+        response = docker_api.make_request(
             method="POST",
-            endpoint="/api/v1/classificate/",
-            json_data=container_params
+            endpoint="/api/v1/discover/",
+            params={"profile": settings.discovery_profile},
         )
-        return classificate_response
 
-    def _get_all_hosts_containers(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        containers = [
+            container for container in response.get("containers", [])
+            if container.get("Id")
+        ]
+        classifications = self._classification_service.classify(containers)
+        host_containers: Dict[str, Dict[str, Any]] = {}
+
+        for container, classification in zip(containers, classifications):
+            container_id = container["Id"]
+            host_containers[container_id] = {
+                "info": container,
+                "classification": classification,
+                "host_id": host_id,
+                "host_name": host_data['name'],
+            }
+
+        return host_containers
+
+    def _get_all_hosts_containers(
+        self,
+        on_host_result: Callable[[str, Dict[str, Dict[str, Any]]], None] | None = None,
+    ) -> Dict[str, Dict[str, Dict[str, Any]]]:
         """
         Получение всех контейнеров по всем хостам.
 
+        Хосты опрашиваются параллельно (не более settings.discovery_max_workers
+        одновременно) с общим дедлайном settings.discovery_deadline, который не зависит
+        от количества хостов. Хосты, не ответившие к дедлайну, пропускаются.
+        Время обработки результатов (on_host_result) продлевает опрос, но в сумме
+        не больше чем на settings.discovery_save_budget; результаты, которые не успели
+        обработать за это время, пропускаются. Так задача укладывается в ограничение
+        времени Celery при любом количестве хостов.
+
+        Args:
+            on_host_result: Функция, вызываемая сразу по получении контейнеров хоста
+                (host_id, host_containers). Позволяет сохранять результат, не дожидаясь
+                остальных хостов.
+
         Returns:
-            Dict[str, Dict[str, Dict[str, Any]]]: Словарь с данными о контейнерах:
+            Dict[str, Dict[str, Dict[str, Any]]]: Словарь с данными о контейнерах
+                успешно опрошенных хостов:
                 {
                     host_id: {
                         container_id: {
@@ -108,117 +154,197 @@ class UpdateContainers:
         logger.debug(f"Получено хостов: {len(hosts)}")
 
         result: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if not hosts:
+            return result
 
-        for host_id, host_data in hosts.items():
-            # Преобразуем localhost в host.docker.internal для Docker
-            host = host_data["host"]
-            if os.path.exists('/.dockerenv'):
-                if host in ('localhost', '127.0.0.1', '0.0.0.0'):
-                    host = 'host.docker.internal'
-            
-            docker_api = APIGateway(f'http://{host}:{host_data["port"]}')
-            # Уменьшаем таймаут для запросов к хостам, чтобы не зависать
-            docker_api.timeout = 5
+        max_workers = max(1, min(settings.discovery_max_workers, len(hosts)))
+        executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="discovery")
+        futures = {
+            executor.submit(self._get_host_containers, host_id, host_data): host_id
+            for host_id, host_data in hosts.items()
+        }
 
+        def handle(future: Future) -> None:
+            host_id = futures[future]
+            host_data = hosts[host_id]
             try:
-                response = docker_api.make_request(
-                    method="POST",
-                    endpoint="/api/v1/discover/",
-                )
+                host_containers = future.result()
             except Exception as e:
-                logger.warning(f"Failed to get containers from host {host_id} ({host}:{host_data['port']}): {e}")
-                continue
+                logger.warning(
+                    f"Failed to get containers from host {host_id} "
+                    f"({host_data['host']}:{host_data['port']}): {e}"
+                )
+                return
+
+            result[host_id] = host_containers
+            if on_host_result is not None:
+                on_host_result(host_id, host_containers)
 
-            containers = response.get("containers", [])
-            host_containers: Dict[str, Dict[str, Any]] = {}
+        deadline_at = time.monotonic() + settings.discovery_deadline
+        # Предел, до которого опрос может продлеваться на время сохранения результатов
+        save_deadline_at = deadline_at + settings.discovery_save_budget
+        not_handled = []
 
-            for container in containers:
-                container_id = container.get("Id")
-                if not container_id:
+        def handle_done(done) -> None:
+            nonlocal deadline_at
+            for future in done:
+                started = time.monotonic()
+                if started >= save_deadline_at:
+                    not_handled.append(futures[future])
                     continue
-                if self._classification_gateway is None:
-                    classification = {}
-                else:
-                    classification = self._classificate_container(
-                        container=container,
-                        classification_gateway=self._classification_gateway,
-                    )
-                host_containers[container_id] = {
-                    "info": container,
-                    "classification": classification,
-                    "host_id": host_id,
-                    "host_name": host_data['name'],
-                }
+                handle(future)
+                deadline_at = min(deadline_at + time.monotonic() - started, save_deadline_at)
 
-            result[host_id] = host_containers
+        not_done = set(futures)
+        try:
+            while not_done:
+                remaining = deadline_at - time.monotonic()
+                if remaining <= 0:
+                    break
+                done, not_done = wait(not_done, timeout=remaining, return_when=FIRST_COMPLETED)
+                handle_done(done)
+
+            # Хосты, ответившие к дедлайну, но еще не обработанные
+            done = {future for future in not_done if future.done()}
+            not_done -= done
+            handle_done(done)
+            if not_done:
+                logger.warning(
+                    f"Discovery deadline exceeded, skipping hosts: {[futures[future] for future in not_done]}"
+                )
+            if not_handled:
+                logger.warning(f"Discovery save budget exceeded, skipping results of hosts: {not_handled}")
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
 
         return result
 
-    def upload_containers(self) -> None:
+    def _save_host_containers(
+        self,
+        docker_containers: DockerContainers,
+        configs_service: ContainerConfigsService,
+        host_id: str,
+        containers: Dict[str, Dict[str, Any]],
+        summary: Dict[str, int],
+    ) -> None:
+        """
+        Синхронизирует контейнеры хоста с Redis и PostgreSQL и обновляет представление конфигураций.
+
+        В PostgreSQL записываются только контейнеры с изменившимся digest (одним пакетным upsert),
+        ошибка записи в БД не прерывает синхронизацию Redis. Записи представления containers:configs
+        обновляются только для новых и изменившихся контейнеров. Ошибка синхронизации с Redis
+        логируется и не пробрасывается, чтобы не прерывать сохранение остальных хостов: данные
+        хоста в Redis остаются прежними до следующей синхронизации.
+
+        Args:
+            docker_containers: Хранилище контейнеров в Redis
+            configs_service: Сервис представления конфигураций Prometheus
+            host_id: Идентификатор хоста
+            containers: Контейнеры хоста (container_id -> data)
+            summary: Счетчики added, changed и removed, увеличиваются на количество изменений
+        """
+        try:
+            changes = docker_containers.sync_host_containers(containers, host_id)
+        except Exception as e:
+            logger.error(f"Error loading containers of host {host_id} into Redis: {e}", exc_info=True)
+            return
+        for change_type, container_ids in changes.items():
+            summary[change_type] += len(container_ids)
+        if settings.containers_db_sync_enabled:
+            try:
+                persisted = ContainersPersistence(configs_service.db).upsert_host_containers(containers)
+                logger.debug(f"Persisted {persisted} containers of host {host_id} to PostgreSQL")
+            except Exception as e:
+                logger.error(f"Error persisting containers of host {host_id} to PostgreSQL: {e}", exc_info=True)
+        configs_service.refresh(changes["added"] + changes["changed"])
+        logger.debug(
+            f"Synced {len(containers)} containers for host {host_id}: "
+            f"added {len(changes['added'])}, changed {len(changes['changed'])}, "
+            f"removed {len(changes['removed'])}"
+        )
+
+    def upload_host_containers(self, host_id: str) -> Dict[str, int]:
+        """
+        Обновление информации о контейнерах одного хоста.
+
+        Используется после операций с контейнерами и экспортерами хоста, чтобы не опрашивать
+        остальные хосты. Ошибка опроса хоста не пробрасывается: данные хоста в Redis
+        остаются прежними до следующей полной синхронизации.
+
+        Args:
+            host_id: Идентификатор хоста
+
+        Returns:
+            Dict[str, int]: Количество добавленных, измененных и удаленных контейнеров хоста
+        """
+        summary = {"added": 0, "changed": 0, "removed": 0}
+        db = self._get_db()
+        host_data = HostsService(db).get_all_hosts().get(host_id)
+        if not host_data:
+            logger.warning(f"Host {host_id} not found, skipping containers update")
+            return summary
+
+        try:
+            containers = self._get_host_containers(host_id, host_data)
+        except Exception as e:
+            logger.warning(
+                f"Failed to get containers from host {host_id} "
+                f"({host_data['host']}:{host_data['port']}): {e}"
+            )
+            return summary
+
+        configs_service = ContainerConfigsService(db)
+        configs_service.ensure_ready()
+        self._save_host_containers(DockerContainers(), configs_service, host_id, containers, summary)
+        return summary
+
+    def upload_containers(self) -> Dict[str, int]:
         """
         Обновление информации о контейнерах в Redis.
 
-        Получает данные о всех контейнерах со всех хостов и сохраняет их в Redis.
-        Использует атомарную операцию для предотвращения race conditions:
-        1. Сначала загружаем все новые контейнеры
-        2. Затем удаляем только те старые, которых нет в новых данных
-        
-        Важно: Если не удалось получить контейнеры с хостов (ошибка подключения),
-        старые контейнеры НЕ удаляются, чтобы избежать потери данных.
+        Получает данные о всех контейнерах со всех хостов и синхронизирует их с Redis.
+        Контейнеры каждого хоста синхронизируются сразу после ответа хоста:
+        записываются только новые и изменившиеся (по digest) контейнеры,
+        удаляются только исчезнувшие. Изменения публикуются в канал containers:changes,
+        для новых и изменившихся контейнеров обновляется представление containers:configs.
+
+        Важно: Если не удалось получить контейнеры с хоста (ошибка подключения),
+        его старые контейнеры НЕ удаляются, чтобы избежать потери данных.
+        Контейнеры хостов, которых больше нет в списке, удаляются после опроса.
+
+        Returns:
+            Dict[str, int]: Количество добавленных, измененных и удаленных контейнеров за запуск
         """
-        all_containers_by_host = self._get_all_hosts_containers()
         docker_containers = DockerContainers()
-        
-        logger.info(f"Updating containers for {len(all_containers_by_host)} hosts")
-        
-        # Проверяем, есть ли хосты с контейнерами
+        configs_service = ContainerConfigsService(self._get_db())
+        configs_service.ensure_ready()
+        summary = {"added": 0, "changed": 0, "removed": 0}
+
+        def save_host_containers(host_id: str, containers: Dict[str, Dict[str, Any]]) -> None:
+            self._save_host_containers(docker_containers, configs_service, host_id, containers, summary)
+
+        all_containers_by_host = self._get_all_hosts_containers(on_host_result=save_host_containers)
+
         total_containers_count = sum(len(containers) for containers in all_containers_by_host.values())
-        
+
         if total_containers_count == 0:
             logger.warning(
                 "No containers received from any host. "
                 "This might indicate connection issues. "
                 "Keeping existing containers in Redis to prevent data loss."
             )
-            return
-        
-        # Собираем множество новых ключей для проверки
-        new_keys = set()
-        pipe = docker_containers.client.pipeline()
-        total_containers = 0
-        
-        # Сначала загружаем все новые контейнеры
-        for host_id, containers in all_containers_by_host.items():
-            logger.debug(f"Processing {len(containers)} containers for host {host_id}")
-            for container_id, data in containers.items():
-                if isinstance(data, dict):
-                    data.setdefault("host_name", host_id)
-                key = f"container:{host_id}:{container_id}"
-                new_keys.add(key)
-                pipe.set(key, json.dumps(data))
-                total_containers += 1
-        
-        # Выполняем загрузку новых контейнеров
-        if new_keys:
-            try:
-                pipe.execute()
-                logger.info(f"Loaded {len(new_keys)} new containers into Redis (total: {total_containers})")
-            except Exception as e:
-                logger.error(f"Error loading containers into Redis: {e}", exc_info=True)
-                raise
-        
-        # Удаляем только те старые контейнеры, которых нет в новых данных
-        # Только если мы успешно загрузили новые контейнеры
-        if new_keys:
-            old_keys = docker_containers.client.keys("container:*")
-            # Преобразуем bytes в строки для сравнения
-            old_keys_str = {
-                k.decode('utf-8') if isinstance(k, bytes) else k 
-                for k in old_keys
-            }
-            keys_to_delete = list(old_keys_str - new_keys)
-            
-            if keys_to_delete:
-                deleted_count = docker_containers.client.delete(*keys_to_delete)
-                logger.info(f"Deleted {deleted_count} old containers that are no longer present")
+            return summary
+
+        # Удаляем контейнеры хостов, которые были удалены из списка хостов
+        db = self._get_db()
+        known_hosts = set(HostsService(db).get_all_hosts().keys())
+        removed_by_host = docker_containers.delete_containers_except_hosts(known_hosts)
+        for host_id, container_ids in removed_by_host.items():
+            summary["removed"] += len(container_ids)
+            logger.info(f"Deleted {len(container_ids)} containers of removed host {host_id}")
 
+        logger.info(
+            f"Updated containers for {len(all_containers_by_host)} hosts: "
+            f"added {summary['added']}, changed {summary['changed']}, removed {summary['removed']}"
+        )
+        return summary
@@ -1,3 +1,4 @@
+from app.tasks.onboarding import run_onboarding
 from app.tasks.update_containers import update_containers
 
-__all__ = ['update_containers']
\ No newline at end of file
+__all__ = ['run_onboarding', 'update_containers']
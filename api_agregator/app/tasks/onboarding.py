@@ -0,0 +1,26 @@
+from app.celery_app import celery_app
+from app.config import settings
+from app.services.onboarding_service import OnboardingService
+
+
+@celery_app.task(
+    name='app.tasks.run_onboarding',
+    acks_late=True,
+    reject_on_worker_lost=True,
+    soft_time_limit=settings.onboarding_task_time_limit,
+    time_limit=settings.onboarding_task_time_limit + 60,
+)
+def run_onboarding(job_id: str):
+    """
+    Задача Celery массового подключения контейнеров к мониторингу.
+
+    Сообщение подтверждается после выполнения, поэтому при остановке воркера задача
+    доставляется повторно и возобновляется по состоянию элементов в Redis.
+
+    Args:
+        job_id: Идентификатор задачи
+
+    Returns:
+        dict: Итоговый статус задачи и количество элементов по статусам
+    """
+    return OnboardingService().run(job_id)
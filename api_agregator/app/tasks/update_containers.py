@@ -9,6 +9,9 @@ def update_containers():
 
     Получает информацию о всех контейнерах со всех хостов
     и сохраняет их в Redis.
+
+    Returns:
+        dict: Количество добавленных, измененных и удаленных контейнеров
     """
     update_containers_service = UpdateContainers()
-    update_containers_service.upload_containers()
+    return update_containers_service.upload_containers()
@@ -1,6 +1,7 @@
 from fastapi import FastAPI
 
 from app.routers import discover, manage
+from app.services.container_inventory import get_container_inventory, is_events_watcher_enabled
 
 app = FastAPI(
     title="Docker API",
@@ -13,6 +14,24 @@ app.include_router(discover.router, prefix="/api/v1/discover", tags=["discover"]
 app.include_router(manage.router, prefix="/api/v1/manage", tags=["manage"])
 
 
+@app.on_event("startup")
+async def start_events_watcher():
+    """
+    Запуск наблюдения за событиями Docker, если оно включено (DOCKER_EVENTS_ENABLED).
+    """
+    if is_events_watcher_enabled():
+        get_container_inventory().start()
+
+
+@app.on_event("shutdown")
+async def stop_events_watcher():
+    """
+    Остановка наблюдения за событиями Docker.
+    """
+    if is_events_watcher_enabled():
+        get_container_inventory().stop()
+
+
 @app.get("/")
 async def root():
     """
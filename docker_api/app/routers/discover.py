@@ -1,7 +1,9 @@
 import logging
+from typing import List, Optional
 
-from fastapi import APIRouter, status, HTTPException
+from fastapi import APIRouter, status, HTTPException, Query
 
+from app.services.container_inventory import get_container_inventory, is_events_watcher_enabled
 from app.services.docker_manager import DockerManager
 
 router = APIRouter()
@@ -18,11 +20,45 @@ def get_docker_manager() -> DockerManager:
     return DockerManager()
 
 
+def resolve_fields(profile: str, fields: Optional[str]) -> Optional[List[str]]:
+    """
+    Определяет набор возвращаемых полей docker inspect.
+
+    Args:
+        profile: Профиль полей: full (все данные) или summary (DockerManager.SUMMARY_FIELDS)
+        fields: Пути к полям через запятую (например, Name,State.Status). Имеют приоритет над profile
+
+    Returns:
+        Optional[List[str]]: Пути к полям или None для полных данных
+
+    Raises:
+        ValueError: При неизвестном профиле
+    """
+    if fields:
+        requested = [field.strip() for field in fields.split(",") if field.strip()]
+        return ["Id"] + [field for field in requested if field != "Id"]
+    if profile == "full":
+        return None
+    if profile == "summary":
+        return DockerManager.SUMMARY_FIELDS
+    raise ValueError(f"Unknown profile '{profile}', expected 'full' or 'summary'")
+
+
 @router.post("/", status_code=status.HTTP_201_CREATED)
-async def get_containers():
+async def get_containers(
+    profile: str = Query(default="full", description="Профиль полей: full или summary"),
+    fields: Optional[str] = Query(
+        default=None, description="Поля docker inspect через запятую, например Name,State.Status,Config.Image"
+    ),
+):
     """
     Получение списка всех контейнеров.
 
+    Args:
+        profile: Профиль полей: full (полный docker inspect) или summary (поля для классификации,
+            генерации конфигурации и интерфейса)
+        fields: Поля docker inspect через запятую. Имеют приоритет над profile, Id возвращается всегда
+
     Returns:
         dict: Словарь с контейнерами и метаданными
 
@@ -30,6 +66,7 @@ async def get_containers():
         HTTPException: При ошибках подключения к Docker или других ошибках
     """
     try:
+        selected_fields = resolve_fields(profile, fields)
         docker_manager = get_docker_manager()
 
         try:
@@ -41,7 +78,7 @@ async def get_containers():
                 detail="Docker daemon is not responding"
             )
 
-        containers = docker_manager.discover_containers()
+        containers = docker_manager.discover_containers(fields=selected_fields)
 
         if not containers:
             return {"containers": [], "message": "No containers found"}
@@ -72,3 +109,84 @@ async def get_containers():
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to discover containers: {str(e)}"
         )
+
+
+@router.get("/changes", status_code=status.HTTP_200_OK)
+async def get_changes(
+    cursor: Optional[str] = Query(default=None, description="Курсор из предыдущего ответа"),
+    timeout: float = Query(default=25.0, ge=0, le=60, description="Максимальное ожидание изменений, секунды"),
+    profile: str = Query(default="full", description="Профиль полей: full или summary"),
+    fields: Optional[str] = Query(default=None, description="Поля docker inspect через запятую"),
+):
+    """
+    Изменения контейнеров по событиям Docker (long-poll).
+
+    Без курсора, а также для устаревшего курсора возвращается полный список контейнеров
+    (resync=True). Иначе запрос ждет изменений не дольше timeout секунд и возвращает
+    обновленные контейнеры (upserted) и идентификаторы удаленных (removed).
+    Ожидание асинхронное, поэтому ожидающие запросы не занимают потоки пула.
+
+    Args:
+        cursor: Курсор из предыдущего ответа
+        timeout: Максимальное время ожидания изменений в секундах
+        profile: Профиль полей контейнеров: full или summary
+        fields: Поля docker inspect через запятую. Имеют приоритет над profile
+
+    Returns:
+        dict: Новый курсор и изменения
+
+    Raises:
+        HTTPException: Если наблюдение за событиями отключено или не синхронизировано с Docker
+    """
+    if not is_events_watcher_enabled():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Docker events watcher is disabled"
+        )
+    try:
+        selected_fields = resolve_fields(profile, fields)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+    try:
+        changes = await get_container_inventory().get_changes(cursor, timeout)
+    except RuntimeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e)
+        )
+
+    for key in ("containers", "upserted"):
+        if key in changes:
+            changes[key] = [DockerManager.project_container(attrs, selected_fields) for attrs in changes[key]]
+    return changes
+
+
+@router.get("/changes/stats", status_code=status.HTTP_200_OK)
+async def get_changes_stats():
+    """
+    Состояние списка контейнеров, обновляемого по событиям Docker.
+
+    Returns:
+        dict: Курсор, признак синхронизации, количество контейнеров и хранимых изменений
+    """
+    return {"enabled": is_events_watcher_enabled(), **get_container_inventory().stats()}
+
+
+@router.get("/container/{container_id}", status_code=status.HTTP_200_OK)
+async def get_container(container_id: str):
+    """
+    Полные данные одного контейнера (docker inspect).
+
+    Args:
+        container_id: Идентификатор или имя контейнера
+
+    Returns:
+        dict: Данные контейнера
+
+    Raises:
+        HTTPException: Если контейнер не найден
+    """
+    attrs = get_docker_manager().inspect_container(container_id)
+    if attrs is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Container not found")
+    return attrs
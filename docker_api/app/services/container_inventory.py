@@ -0,0 +1,318 @@
+import asyncio
+import logging
+import os
+import threading
+import uuid
+from collections import deque
+from functools import lru_cache
+from typing import Optional
+
+from app.services.docker_manager import DockerManager
+
+logger = logging.getLogger(__name__)
+
+
+class ContainerInventory:
+    """
+    Локальный список контейнеров, обновляемый по событиям Docker.
+
+    Фоновый поток подписывается на события контейнеров через DockerManager и поддерживает
+    словарь container_id -> docker inspect. Каждое изменение получает порядковый номер,
+    поэтому клиенты могут запрашивать изменения после своего курсора (long-poll).
+    Курсор имеет вид "{epoch}:{seq}", где epoch меняется при перезапуске сервиса:
+    для устаревшего или чужого курсора возвращается полный список (resync).
+    Ожидающие изменений запросы не занимают потоки: это future цикла событий, которые
+    поток наблюдения будит через call_soon_threadsafe.
+    """
+
+    def __init__(self, history_size: int = 10000):
+        """
+        Инициализация списка контейнеров.
+
+        Args:
+            history_size: Сколько последних изменений хранить для выдачи по курсору
+        """
+        self.epoch = uuid.uuid4().hex[:12]
+        self._containers: dict = {}
+        self._history: deque = deque(maxlen=history_size)
+        self._seq = 0
+        self._synced = False
+        self._lock = threading.Lock()
+        self._waiters: set = set()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._manager: Optional[DockerManager] = None
+
+    def start(self) -> None:
+        """
+        Запускает фоновый поток наблюдения за событиями Docker.
+        """
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="docker-events-watcher", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        """
+        Останавливает фоновый поток.
+        """
+        self._stop.set()
+        if self._manager is not None:
+            self._manager.close_events()
+
+    def _run(self) -> None:
+        """
+        Цикл наблюдения: подписка на события, полная синхронизация и обработка событий.
+
+        При обрыве соединения с Docker переподключается с экспоненциальной задержкой
+        и заново синхронизирует список, чтобы не потерять пропущенные события.
+        """
+        delay = 1.0
+        while not self._stop.is_set():
+            try:
+                self._manager = DockerManager()
+                self._manager.watch_container_events(
+                    on_event=self._handle_event,
+                    on_subscribed=self._resync
+                )
+                delay = 1.0
+            except Exception as e:
+                if self._stop.is_set():
+                    break
+                logger.warning(f"Docker events stream failed, reconnecting in {delay:.0f}s: {str(e)}")
+            with self._lock:
+                self._synced = False
+                self._notify()
+            self._stop.wait(delay)
+            delay = min(delay * 2, 30.0)
+
+    def _resync(self) -> None:
+        """
+        Полная синхронизация со списком контейнеров Docker.
+
+        Различия с текущим списком записываются как обычные изменения,
+        поэтому действующие курсоры клиентов остаются валидными.
+        """
+        actual = {attrs["Id"]: attrs for attrs in self._manager.discover_containers()}
+        with self._lock:
+            for container_id in list(self._containers):
+                if container_id not in actual:
+                    self._remove(container_id)
+            for container_id, attrs in actual.items():
+                if self._containers.get(container_id) != attrs:
+                    self._upsert(container_id, attrs)
+            self._synced = True
+            self._notify()
+        logger.info(f"Container inventory synced: {len(actual)} containers")
+
+    def _handle_event(self, event: dict) -> None:
+        """
+        Применяет событие Docker к списку контейнеров.
+
+        Args:
+            event: Событие из потока docker events
+        """
+        container_id = (event.get("Actor") or {}).get("ID") or event.get("id")
+        action = event.get("Action") or event.get("status")
+        if not container_id:
+            return
+
+        attrs = None if action == "destroy" else self._manager.inspect_container(container_id)
+        with self._lock:
+            if attrs is None:
+                self._remove(container_id)
+            else:
+                self._upsert(container_id, attrs)
+            self._notify()
+        logger.debug(f"Docker event {action} for container {container_id}")
+
+    def _notify(self) -> None:
+        """
+        Будит запросы, ожидающие изменений. Вызывается под блокировкой.
+        """
+        for loop, future in self._waiters:
+            try:
+                loop.call_soon_threadsafe(self._wake, future)
+            except RuntimeError:
+                # Цикл событий уже закрыт
+                pass
+        self._waiters.clear()
+
+    @staticmethod
+    def _wake(future: asyncio.Future) -> None:
+        """
+        Завершает future ожидающего запроса. Выполняется в его цикле событий.
+
+        Args:
+            future: Future ожидающего запроса
+        """
+        if not future.done():
+            future.set_result(None)
+
+    def _upsert(self, container_id: str, attrs: dict) -> None:
+        """
+        Добавляет или обновляет контейнер. Вызывается под блокировкой.
+
+        Args:
+            container_id: Идентификатор контейнера
+            attrs: Данные контейнера (docker inspect)
+        """
+        self._containers[container_id] = attrs
+        self._seq += 1
+        self._history.append((self._seq, container_id))
+
+    def _remove(self, container_id: str) -> None:
+        """
+        Удаляет контейнер. Вызывается под блокировкой.
+
+        Args:
+            container_id: Идентификатор контейнера
+        """
+        if self._containers.pop(container_id, None) is None:
+            return
+        self._seq += 1
+        self._history.append((self._seq, container_id))
+
+    def _cursor(self) -> str:
+        """
+        Текущий курсор. Вызывается под блокировкой.
+
+        Returns:
+            str: Курсор в формате "{epoch}:{seq}"
+        """
+        return f"{self.epoch}:{self._seq}"
+
+    def _parse_cursor(self, cursor: Optional[str]) -> Optional[int]:
+        """
+        Извлекает номер изменения из курсора. Вызывается под блокировкой.
+
+        Args:
+            cursor: Курсор клиента
+
+        Returns:
+            Optional[int]: Номер изменения или None, если по курсору нельзя выдать изменения
+        """
+        if not cursor:
+            return None
+        epoch, _, seq = cursor.partition(":")
+        if epoch != self.epoch or not seq.isdigit():
+            return None
+        seq = int(seq)
+        oldest_seq = self._history[0][0] if self._history else self._seq + 1
+        if seq > self._seq or (seq < self._seq and seq + 1 < oldest_seq):
+            return None
+        return seq
+
+    def _snapshot(self) -> dict:
+        """
+        Полный список контейнеров с текущим курсором. Вызывается под блокировкой.
+
+        Returns:
+            dict: cursor, resync=True и containers
+        """
+        return {
+            "cursor": self._cursor(),
+            "resync": True,
+            "containers": list(self._containers.values()),
+        }
+
+    def _changes_since(self, seq: int) -> dict:
+        """
+        Изменения после номера seq. Вызывается под блокировкой.
+
+        Args:
+            seq: Номер изменения из курсора клиента
+
+        Returns:
+            dict: cursor, resync=False, upserted и removed
+        """
+        changed_ids = {container_id for change_seq, container_id in self._history if change_seq > seq}
+        return {
+            "cursor": self._cursor(),
+            "resync": False,
+            "upserted": [self._containers[cid] for cid in changed_ids if cid in self._containers],
+            "removed": [cid for cid in changed_ids if cid not in self._containers],
+        }
+
+    async def get_changes(self, cursor: Optional[str], timeout: float) -> dict:
+        """
+        Возвращает изменения после курсора, ожидая их не дольше timeout секунд.
+
+        Если курсор не задан, устарел или выдан до перезапуска сервиса,
+        возвращается полный список контейнеров с признаком resync. Ожидание
+        не блокирует цикл событий и не занимает поток из пула.
+
+        Args:
+            cursor: Курсор из предыдущего ответа
+            timeout: Максимальное время ожидания изменений в секундах
+
+        Returns:
+            dict: cursor и либо containers (resync), либо upserted и removed
+
+        Raises:
+            RuntimeError: Если список контейнеров еще не синхронизирован с Docker
+        """
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + timeout
+        while True:
+            with self._lock:
+                if not self._synced:
+                    raise RuntimeError("Container inventory is not synced with Docker")
+
+                seq = self._parse_cursor(cursor)
+                if seq is None:
+                    return self._snapshot()
+
+                remaining = deadline - loop.time()
+                if self._seq != seq or remaining <= 0:
+                    return self._changes_since(seq)
+
+                waiter = (loop, loop.create_future())
+                self._waiters.add(waiter)
+
+            try:
+                await asyncio.wait_for(waiter[1], remaining)
+            except asyncio.TimeoutError:
+                pass
+            finally:
+                with self._lock:
+                    self._waiters.discard(waiter)
+
+    def stats(self) -> dict:
+        """
+        Состояние списка контейнеров.
+
+        Returns:
+            dict: Курсор, признак синхронизации, количество контейнеров, хранимых изменений
+                и ожидающих запросов
+        """
+        with self._lock:
+            return {
+                "cursor": self._cursor(),
+                "synced": self._synced,
+                "containers": len(self._containers),
+                "history": len(self._history),
+                "waiters": len(self._waiters),
+            }
+
+
+def is_events_watcher_enabled() -> bool:
+    """
+    Включено ли наблюдение за событиями Docker (DOCKER_EVENTS_ENABLED).
+
+    Returns:
+        bool: True, если наблюдение включено
+    """
+    return os.getenv("DOCKER_EVENTS_ENABLED", "true").lower() == "true"
+
+
+@lru_cache()
+def get_container_inventory() -> ContainerInventory:
+    """
+    Общий для процесса список контейнеров.
+
+    Returns:
+        ContainerInventory: Экземпляр списка контейнеров
+    """
+    return ContainerInventory(history_size=int(os.getenv("DOCKER_EVENTS_HISTORY_SIZE", 10000)))
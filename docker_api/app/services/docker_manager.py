@@ -1,5 +1,5 @@
 import logging
-from typing import Optional, Dict
+from typing import Callable, Iterable, Optional, Dict
 
 import docker
 
@@ -13,6 +13,19 @@ class DockerManager:
     Предоставляет методы для работы с контейнерами, образами, томами и сетями Docker.
     """
 
+    WATCHED_EVENTS = ["create", "start", "die", "destroy", "rename"]
+
+    # Поля docker inspect, которых достаточно для классификации, генерации конфигурации
+    # экспортеров и отображения контейнера в интерфейсе
+    SUMMARY_FIELDS = [
+        "Id", "Name", "Created", "Image",
+        "State.Status", "State.Running", "State.StartedAt", "State.FinishedAt",
+        "State.ExitCode", "State.Health.Status",
+        "Config.Image", "Config.Labels", "Config.Env", "Config.ExposedPorts", "Config.Hostname",
+        "NetworkSettings.IPAddress", "NetworkSettings.Ports", "NetworkSettings.Networks",
+        "HostConfig.NetworkMode",
+    ]
+
     def __init__(self):
         """
         Инициализация DockerManager.
@@ -20,30 +33,126 @@ class DockerManager:
         Создает клиент Docker из переменных окружения.
         """
         self.client = docker.from_env()
+        self._events = None
+
+    @staticmethod
+    def is_own_container(attrs: dict) -> bool:
+        """
+        Проверяет, относится ли контейнер к самому приложению (docker-compose).
+
+        Args:
+            attrs: Данные контейнера (docker inspect)
+
+        Returns:
+            bool: True, если контейнер нужно исключить из обнаружения
+        """
+        labels = (attrs.get('Config') or {}).get('Labels') or {}
+        container_name = attrs.get('Name', '')
+
+        compose_project = labels.get('com.docker.compose.project', '')
+        if compose_project == 'auto_observability':
+            return True
 
-    def discover_containers(self) -> list:
+        return container_name.startswith('/auto_observability_') or container_name.startswith('auto_observability_')
+
+    @staticmethod
+    def project_container(attrs: dict, fields: Optional[Iterable[str]]) -> dict:
+        """
+        Оставляет в данных контейнера только указанные поля.
+
+        Args:
+            attrs: Данные контейнера (docker inspect)
+            fields: Пути к полям через точку (например, Config.Image). Если None, данные не меняются
+
+        Returns:
+            dict: Данные контейнера с сохранением вложенности только по указанным полям
+        """
+        if fields is None:
+            return attrs
+
+        result: dict = {}
+        for field in fields:
+            path = field.split(".")
+            value = attrs
+            for part in path:
+                if not isinstance(value, dict) or part not in value:
+                    break
+                value = value[part]
+            else:
+                target = result
+                for part in path[:-1]:
+                    target = target.setdefault(part, {})
+                target[path[-1]] = value
+        return result
+
+    def discover_containers(self, fields: Optional[Iterable[str]] = None) -> list:
         """
-        Возвращает список словарей со всеми данными каждого контейнера.
+        Возвращает список словарей с данными каждого контейнера.
         Исключает контейнеры самого приложения (docker-compose).
 
+        Args:
+            fields: Пути к полям docker inspect, которые нужно вернуть. Если None, возвращаются все данные
+
         Returns:
             list: Список словарей с данными контейнеров
         """
         all_data = []
         for container in self.client.containers.list(all=True):
-            labels = container.attrs.get('Config', {}).get('Labels', {})
-            container_name = container.attrs.get('Name', '')
-            
-            compose_project = labels.get('com.docker.compose.project', '')
-            if compose_project == 'auto_observability':
-                continue
-            
-            if container_name.startswith('/auto_observability_') or container_name.startswith('auto_observability_'):
+            if self.is_own_container(container.attrs):
                 continue
-            
-            all_data.append(container.attrs)
+            all_data.append(self.project_container(container.attrs, fields))
         return all_data
 
+    def inspect_container(self, container_id: str) -> Optional[dict]:
+        """
+        Возвращает данные одного контейнера (docker inspect).
+
+        Args:
+            container_id: Идентификатор контейнера
+
+        Returns:
+            Optional[dict]: Данные контейнера или None, если контейнер не найден
+                или относится к самому приложению
+        """
+        try:
+            attrs = self.client.api.inspect_container(container_id)
+        except docker.errors.NotFound:
+            return None
+        if self.is_own_container(attrs):
+            return None
+        return attrs
+
+    def watch_container_events(self, on_event: Callable[[dict], None], on_subscribed: Callable[[], None]) -> None:
+        """
+        Подписывается на события контейнеров Docker и передает их в on_event.
+
+        Учитываются только события create, start, die, destroy и rename.
+        on_subscribed вызывается после открытия потока событий, но до их чтения:
+        в нем можно выполнить полную синхронизацию, не пропустив события.
+        Метод блокируется до закрытия потока (close_events) или ошибки соединения.
+
+        Args:
+            on_event: Обработчик события Docker
+            on_subscribed: Вызывается после подписки на события
+        """
+        self._events = self.client.events(
+            decode=True,
+            filters={"type": "container", "event": self.WATCHED_EVENTS}
+        )
+        try:
+            on_subscribed()
+            for event in self._events:
+                on_event(event)
+        finally:
+            self._events.close()
+
+    def close_events(self) -> None:
+        """
+        Закрывает поток событий, открытый в watch_container_events.
+        """
+        if self._events is not None:
+            self._events.close()
+
     def start_container(self, container_id_or_name: str) -> str:
         """
         Запустить контейнер.
@@ -1,9 +1,10 @@
 import logging
+from typing import List
 
-from fastapi import APIRouter, status
+from fastapi import APIRouter, HTTPException, status
 
 from app.models.classificate import ContainerInspectData
-from app.services.docker_clasification import WeightedDiscovery
+from app.services.docker_clasification import get_discovery_provider
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -21,7 +22,7 @@ async def classificate(container_attrs: ContainerInspectData) -> dict:
         dict: Результат классификации с технологиями и баллами или ошибка
     """
     try:
-        discovery = WeightedDiscovery()
+        discovery = get_discovery_provider().get()
         result = discovery.classify_container(
             container_attrs.labels,
             container_attrs.envs,
@@ -31,3 +32,67 @@ async def classificate(container_attrs: ContainerInspectData) -> dict:
     except Exception as e:
         logger.error(f"Error classifying container: {str(e)}", exc_info=True)
         return {"error": str(e)}
+
+
+@router.post("/batch", status_code=status.HTTP_200_OK)
+async def classificate_batch(containers: List[ContainerInspectData]) -> dict:
+    """
+    Классифицировать несколько контейнеров за один запрос.
+
+    Ошибка классификации одного контейнера не прерывает обработку остальных.
+
+    Args:
+        containers: Список данных инспекции контейнеров
+
+    Returns:
+        dict: Список результатов в том же порядке, что и входные данные.
+            Каждый элемент - {"result": [...]} или {"error": "..."}
+    """
+    discovery = get_discovery_provider().get()
+    results = []
+    for container_attrs in containers:
+        try:
+            result = discovery.classify_container(
+                container_attrs.labels,
+                container_attrs.envs,
+                container_attrs.image,
+                container_attrs.ports)
+            results.append({"result": result})
+        except Exception as e:
+            logger.error(f"Error classifying container: {str(e)}", exc_info=True)
+            results.append({"error": str(e)})
+    return {"results": results}
+
+
+@router.post("/reload", status_code=status.HTTP_200_OK)
+async def reload_rules() -> dict:
+    """
+    Принудительно перезагрузить правила классификации из signatures.yml.
+
+    Returns:
+        dict: Информация о загруженном наборе правил
+
+    Raises:
+        HTTPException: Если файл правил не удалось прочитать или разобрать
+    """
+    provider = get_discovery_provider()
+    try:
+        provider.reload()
+    except Exception as e:
+        logger.error(f"Error reloading classification rules: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reload rules: {str(e)}"
+        )
+    return provider.stats()
+
+
+@router.get("/stats", status_code=status.HTTP_200_OK)
+async def get_stats() -> dict:
+    """
+    Получить версию и время загрузки текущего набора правил.
+
+    Returns:
+        dict: Версия (хеш содержимого signatures.yml), время и длительность загрузки, число правил
+    """
+    return get_discovery_provider().stats()
@@ -1,6 +1,23 @@
+import hashlib
 import os
-import yaml
+import re
+import threading
+import time
 from collections import defaultdict
+from datetime import datetime, timezone
+from functools import lru_cache
+
+import yaml
+
+
+def _default_rules_path() -> str:
+    """
+    Путь к signatures.yml рядом с модулем.
+
+    Returns:
+        str: Абсолютный путь к файлу правил
+    """
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), 'signatures.yml')
 
 
 class WeightedDiscovery:
@@ -19,12 +36,111 @@ class WeightedDiscovery:
             rules_path: Путь к файлу с правилами классификации.
                        Если None, используется signatures.yml в текущей директории.
         """
-        if rules_path is None:
-            current_dir = os.path.dirname(os.path.abspath(__file__))
-            rules_path = os.path.join(current_dir, 'signatures.yml')
-        with open(rules_path, 'r', encoding='utf-8') as f:
-            self.rules = yaml.safe_load(f)
+        started = time.perf_counter()
+        self.rules_path = rules_path or _default_rules_path()
+        with open(self.rules_path, 'rb') as f:
+            content = f.read()
+        self.version = hashlib.sha256(content).hexdigest()[:12]
+        self.rules = yaml.safe_load(content.decode('utf-8'))
         self.threshold = 50
+        self._compile_rules()
+        self.loaded_at = datetime.now(timezone.utc)
+        self.load_time_ms = round((time.perf_counter() - started) * 1000, 2)
+
+    @staticmethod
+    def _build_substring_pattern(keys: list) -> re.Pattern:
+        """
+        Собирает одно регулярное выражение для поиска всех ключей как подстрок.
+
+        Ключи объединяются в префиксное дерево, поэтому в каждой позиции строки
+        выражение ветвится по символу, а не перебирает все ключи. Lookahead позволяет
+        находить пересекающиеся вхождения; в каждой позиции находится самый длинный ключ.
+
+        Args:
+            keys: Список строковых ключей правил
+
+        Returns:
+            re.Pattern: Скомпилированное выражение с группой 1 - найденным ключом
+        """
+        trie: dict = {}
+        for key in keys:
+            node = trie
+            for char in key:
+                node = node.setdefault(char, {})
+            node[None] = True
+
+        def build(node: dict) -> str:
+            branches = [re.escape(char) + build(child) for char, child in node.items() if char is not None]
+            if not branches:
+                return ''
+            body = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+            return '(?:' + body + ')?' if None in node else body
+
+        if not keys:
+            return re.compile(r'(?!)')
+        return re.compile('(?=(' + build(trie) + '))')
+
+    @staticmethod
+    def _build_prefix_map(keys: list) -> dict:
+        """
+        Для каждого ключа находит все ключи, являющиеся его префиксами (включая его самого).
+
+        Выражение возвращает в каждой позиции только самый длинный ключ, а более короткие
+        ключи, начинающиеся в той же позиции, всегда являются его префиксами.
+
+        Args:
+            keys: Список строковых ключей правил
+
+        Returns:
+            dict: Ключ -> список ключей-префиксов
+        """
+        return {key: [other for other in keys if key.startswith(other)] for key in keys}
+
+    def _compile_rules(self) -> None:
+        """
+        Компилирует правила в индексы для классификации за один проход по атрибутам контейнера.
+
+        Порты и метки индексируются словарями, ключи env и подстроки образов - общими
+        регулярными выражениями. Каждому правилу присваивается порядковый номер, чтобы
+        баллы суммировались в том же порядке, что и при последовательном переборе правил,
+        и порядок технологий с равными баллами не менялся.
+        """
+        ordinal = 0
+        indexes = {}
+        for section in ('ports', 'env', 'images', 'labels'):
+            index = {}
+            for key, data in (self.rules.get(section) or {}).items():
+                index[key] = (ordinal, data['tech'], data['weight'])
+                ordinal += 1
+            indexes[section] = index
+
+        self._port_index = indexes['ports']
+        self._env_index = indexes['env']
+        self._image_index = indexes['images']
+        self._label_index = indexes['labels']
+
+        self._env_pattern = self._build_substring_pattern(list(self._env_index))
+        self._env_prefixes = self._build_prefix_map(list(self._env_index))
+        self._image_pattern = self._build_substring_pattern(list(self._image_index))
+        self._image_prefixes = self._build_prefix_map(list(self._image_index))
+
+    @staticmethod
+    def _match_substrings(pattern: re.Pattern, prefixes: dict, text: str) -> set:
+        """
+        Находит все ключи правил, входящие в текст как подстроки.
+
+        Args:
+            pattern: Выражение из _build_substring_pattern
+            prefixes: Карта префиксов из _build_prefix_map
+            text: Текст для поиска
+
+        Returns:
+            set: Множество найденных ключей
+        """
+        matched = set()
+        for match in pattern.finditer(text):
+            matched.update(prefixes[match.group(1)])
+        return matched
 
     def classify_container(self, labels: dict, envs: list, image: str, ports: list) -> list:
         """
@@ -39,27 +155,129 @@ class WeightedDiscovery:
         Returns:
             list: Отсортированный список кортежей (технология, балл)
         """
-        scores = defaultdict(int)
+        matches = []
 
-        for port, data in self.rules['ports'].items():
-            if port in ports:
-                scores[data['tech']] += data['weight']
+        for port in set(ports):
+            rule = self._port_index.get(port)
+            if rule is not None:
+                matches.append(rule)
 
-        for env_key, data in self.rules['env'].items():
-            if any(env_key in env_var for env_var in envs):
-                scores[data['tech']] += data['weight']
+        # Переменные окружения не содержат '\n', поэтому ключ не может совпасть на стыке строк
+        for env_key in self._match_substrings(self._env_pattern, self._env_prefixes, '\n'.join(envs)):
+            matches.append(self._env_index[env_key])
 
-        for img_part, data in self.rules['images'].items():
-            if img_part in image:
-                scores[data['tech']] += data['weight']
+        for img_part in self._match_substrings(self._image_pattern, self._image_prefixes, image):
+            matches.append(self._image_index[img_part])
 
-        for lb_key, data in self.rules['labels'].items():
-            if lb_key in labels:
-                tech = labels[lb_key] if data['tech'] == "auto" else data['tech']
-                scores[tech] += data['weight']
+        for lb_key, value in labels.items():
+            rule = self._label_index.get(lb_key)
+            if rule is not None:
+                ordinal, tech, weight = rule
+                matches.append((ordinal, value if tech == "auto" else tech, weight))
+
+        scores = defaultdict(int)
+        for _, tech, weight in sorted(matches):
+            scores[tech] += weight
 
         final_decision = {tech: score for tech, score in scores.items() if score >= self.threshold}
 
         return sorted(final_decision.items(), key=lambda x: x[1], reverse=True)
 
 
+class DiscoveryProvider:
+    """
+    Процессный кеш WeightedDiscovery с горячей перезагрузкой правил.
+
+    Правила загружаются один раз. При каждом обращении проверяется только mtime файла;
+    файл перечитывается, если mtime изменился, а правила пересобираются, только если
+    изменился хеш содержимого.
+    """
+
+    def __init__(self, rules_path: str = None) -> None:
+        """
+        Инициализация провайдера.
+
+        Args:
+            rules_path: Путь к файлу с правилами классификации.
+                       Если None, используется signatures.yml в текущей директории.
+        """
+        self.rules_path = rules_path or _default_rules_path()
+        self._lock = threading.Lock()
+        self._discovery = None
+        self._mtime_ns = None
+        self.reloads = 0
+
+    def get(self) -> WeightedDiscovery:
+        """
+        Возвращает актуальный экземпляр WeightedDiscovery.
+
+        Returns:
+            WeightedDiscovery: Классификатор с текущей версией правил
+        """
+        mtime_ns = os.stat(self.rules_path).st_mtime_ns
+        if self._discovery is None or mtime_ns != self._mtime_ns:
+            with self._lock:
+                if self._discovery is None or mtime_ns != self._mtime_ns:
+                    self._refresh(mtime_ns, force=False)
+        return self._discovery
+
+    def reload(self) -> WeightedDiscovery:
+        """
+        Принудительно перечитывает и пересобирает правила.
+
+        Returns:
+            WeightedDiscovery: Классификатор с перезагруженными правилами
+        """
+        with self._lock:
+            self._refresh(os.stat(self.rules_path).st_mtime_ns, force=True)
+        return self._discovery
+
+    def _refresh(self, mtime_ns: int, force: bool) -> None:
+        """
+        Перезагружает правила, если изменилось содержимое файла.
+
+        Args:
+            mtime_ns: mtime файла правил на момент проверки
+            force: Пересобрать правила независимо от хеша
+        """
+        if not force and self._discovery is not None:
+            with open(self.rules_path, 'rb') as f:
+                version = hashlib.sha256(f.read()).hexdigest()[:12]
+            if version == self._discovery.version:
+                self._mtime_ns = mtime_ns
+                return
+
+        self._discovery = WeightedDiscovery(self.rules_path)
+        self._mtime_ns = mtime_ns
+        self.reloads += 1
+
+    def stats(self) -> dict:
+        """
+        Информация о загруженном наборе правил.
+
+        Returns:
+            dict: Версия (хеш содержимого), время и длительность загрузки, число правил
+        """
+        discovery = self.get()
+        return {
+            "version": discovery.version,
+            "rules_path": discovery.rules_path,
+            "loaded_at": discovery.loaded_at.isoformat(),
+            "load_time_ms": discovery.load_time_ms,
+            "reloads": self.reloads,
+            "rules": {
+                section: len(discovery.rules.get(section) or {})
+                for section in ('ports', 'env', 'images', 'labels')
+            },
+        }
+
+
+@lru_cache()
+def get_discovery_provider() -> DiscoveryProvider:
+    """
+    Получение общего для процесса провайдера классификатора.
+
+    Returns:
+        DiscoveryProvider: Экземпляр провайдера
+    """
+    return DiscoveryProvider()
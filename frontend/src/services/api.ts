@@ -280,6 +280,7 @@ export interface MainPrometheusConfig {
   targets: {
     [fileName: string]: any
   }
+  services?: string[]
 }
 
 export interface AddServiceRequest {
@@ -4,6 +4,7 @@ from fastapi import FastAPI
 
 from app.routers import generate, main_config, signature
 from app.services.main_config import MainPrometheusConfig
+from app.services.minio import ensure_bucket
 
 logger = logging.getLogger(__name__)
 
@@ -23,10 +24,12 @@ async def startup_event():
     """
     Инициализация при старте приложения.
     
-    Проверяет наличие основного конфига Prometheus в MinIO
-    и создает его при первом запуске, если он отсутствует.
+    Создает общий клиент MinIO и бакет, если его нет, проверяет наличие основного
+    конфига Prometheus и создает его при первом запуске, если он отсутствует.
+    Для jobs существующего конфига создаются недостающие фрагменты.
     """
     try:
+        ensure_bucket()
         config = MainPrometheusConfig()
         main_config = config.minio_client.get_yaml_file('mainConfig/prometheus.yml')
         
@@ -36,6 +39,9 @@ async def startup_event():
             print("INFO: Базовый конфиг Prometheus успешно создан в MinIO")
         else:
             print("INFO: Основной конфиг Prometheus найден в MinIO")
+            created = config.ensure_fragments()
+            if created:
+                logger.info(f"Созданы фрагменты для {created} jobs основного конфига")
     except Exception as e:
         print(f"ERROR: Ошибка при инициализации конфига Prometheus: {e}")
         logger.error(f"Ошибка при инициализации конфига Prometheus: {e}", exc_info=True)
@@ -1,4 +1,4 @@
-from typing import Dict, Any
+from typing import Dict, Any, List, Optional
 
 from pydantic import BaseModel
 
@@ -11,11 +11,20 @@ class AddServiceRequest(BaseModel):
         scrape_config: Конфигурация scrape для Prometheus
         target: Целевой адрес или список адресов
         target_name: Имя целевого файла
+        exporter_name: Имя контейнера экспортера. Используется prometheus_manager
+            для определения опубликованного порта экспортера
+        stack: Стек сервиса. В режимах per_stack и per_stack_host определяет общий job
+        host: Хост сервиса. В режиме per_stack_host определяет общий job
+        container_name: Имя контейнера сервиса, метка container в общих jobs
     """
 
     scrape_config: Dict[str, Any]
     target: list | dict
     target_name: str
+    exporter_name: Optional[str] = None
+    stack: Optional[str] = None
+    host: Optional[str] = None
+    container_name: Optional[str] = None
 
 
 class RemoveServiceRequest(BaseModel):
@@ -29,3 +38,16 @@ class RemoveServiceRequest(BaseModel):
 
     job_name: str
     target_name: str
+
+
+class BulkServicesRequest(BaseModel):
+    """
+    Модель запроса для добавления и удаления нескольких сервисов одной записью основного конфига.
+
+    Attributes:
+        add: Добавляемые сервисы
+        remove: Удаляемые сервисы
+    """
+
+    add: List[AddServiceRequest] = []
+    remove: List[RemoveServiceRequest] = []
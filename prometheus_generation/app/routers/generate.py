@@ -12,10 +12,12 @@ logger = logging.getLogger(__name__)
 
 
 @router.post("/", status_code=status.HTTP_200_OK)
-async def generate(container_data: ContainerData, host: str) -> Dict[str, Dict]:
+def generate(container_data: ContainerData, host: str) -> Dict[str, Dict]:
     """
     Генерирует конфигурацию Prometheus для контейнера.
 
+    Запись в MinIO блокирующая, поэтому обработчик синхронный и выполняется в пуле потоков.
+
     Args:
         container_data: Данные о контейнере
         host: Адрес хоста
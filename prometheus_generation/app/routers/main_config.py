@@ -1,15 +1,15 @@
-from typing import Dict
+from typing import Any, Dict
 
 from fastapi import APIRouter, status, HTTPException
 
-from app.models.main_config import AddServiceRequest, RemoveServiceRequest
+from app.models.main_config import AddServiceRequest, BulkServicesRequest, RemoveServiceRequest
 from app.services.main_config import MainPrometheusConfig
 
 router = APIRouter()
 
 
 @router.post("/add", status_code=status.HTTP_200_OK)
-async def add_service(request: AddServiceRequest) -> Dict[str, str]:
+def add_service(request: AddServiceRequest) -> Dict[str, str]:
     """
     Добавляет сервис в основной конфиг Prometheus.
 
@@ -27,7 +27,11 @@ async def add_service(request: AddServiceRequest) -> Dict[str, str]:
         result = config.add_service(
             scrape_config=request.scrape_config,
             target=request.target,
-            target_name=request.target_name
+            target_name=request.target_name,
+            exporter_name=request.exporter_name,
+            stack=request.stack,
+            host=request.host,
+            container_name=request.container_name
         )
 
         if result:
@@ -45,7 +49,7 @@ async def add_service(request: AddServiceRequest) -> Dict[str, str]:
 
 
 @router.delete("/remove", status_code=status.HTTP_200_OK)
-async def remove_service(request: RemoveServiceRequest) -> Dict[str, str]:
+def remove_service(request: RemoveServiceRequest) -> Dict[str, str]:
     """
     Удаляет сервис из основного конфига Prometheus.
 
@@ -79,8 +83,61 @@ async def remove_service(request: RemoveServiceRequest) -> Dict[str, str]:
         )
 
 
+@router.post("/bulk", status_code=status.HTTP_200_OK)
+def apply_bulk(request: BulkServicesRequest) -> Dict[str, Any]:
+    """
+    Добавляет и удаляет несколько сервисов одной записью основного конфига Prometheus.
+
+    Args:
+        request: Списки добавляемых и удаляемых сервисов
+
+    Returns:
+        Dict[str, Any]: Результат и версия записанного конфига
+
+    Raises:
+        HTTPException: При ошибке обновления конфига
+    """
+    try:
+        version = MainPrometheusConfig().apply_changes(
+            add=[item.model_dump() for item in request.add],
+            remove=[(item.job_name, item.target_name) for item in request.remove]
+        )
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при обновлении конфига: {str(e)}"
+        )
+    return {
+        "status": "success",
+        "added": len(request.add),
+        "removed": len(request.remove),
+        "version": version
+    }
+
+
+@router.post("/rebuild", status_code=status.HTTP_200_OK)
+def rebuild_config() -> Dict[str, Any]:
+    """
+    Собирает основной конфиг Prometheus заново из фрагментов jobs.
+
+    Returns:
+        Dict[str, Any]: Результат и версия записанного конфига
+
+    Raises:
+        HTTPException: При ошибке сборки конфига
+    """
+    try:
+        version = MainPrometheusConfig().rebuild()
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Ошибка при сборке конфига: {str(e)}"
+        )
+    return {"status": "success", "version": version}
+
+
 @router.get("/", status_code=status.HTTP_200_OK)
-async def get_full_config() -> Dict:
+def get_full_config() -> Dict:
     """
     Получает полный конфиг Prometheus и все файлы targets.
 
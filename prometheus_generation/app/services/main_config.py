@@ -1,9 +1,12 @@
 import logging
-from typing import Any, Dict, List, Optional
+import os
+import random
+import re
+import threading
+import time
+from typing import Any, Dict, List, Optional, Set, Tuple
 
-import docker
-
-from app.services.minio import MinioService
+from app.services.minio import MinioService, PreconditionFailed
 
 logger = logging.getLogger(__name__)
 
@@ -14,86 +17,326 @@ class MainPrometheusConfig:
 
     Предоставляет методы для добавления, удаления сервисов
     и получения полной конфигурации Prometheus.
+
+    Каждый job хранится отдельным фрагментом mainConfig/jobs/{job_name}.yml, основной конфиг
+    mainConfig/prometheus.yml собирается из jobs по имени и записывается с проверкой ETag.
+    Версия конфига хранится в метаданных объекта и увеличивается при каждой записи.
+
+    Режим jobs задается SCRAPE_JOBS_MODE:
+    - per_container (по умолчанию) - отдельный job и файл targets/{job_name}.yml на сервис;
+    - per_stack, per_stack_host - один job на стек (или стек и хост) с общим file_sd
+      targets/{group}/*.yml. Сервис (контейнер) определяется метками target service, container,
+      stack и host, а основной конфиг не растет с количеством контейнеров.
+    Сервисы по-прежнему добавляются и удаляются по своему job_name; группа сервиса хранится
+    в его фрагменте. Пустые группы и смена режима применяются методом rebuild.
     """
 
+    MAIN_CONFIG_PATH = 'mainConfig/prometheus.yml'
+    JOBS_PREFIX = 'mainConfig/jobs/'
+    TARGETS_PATH = 'mainConfig/targets'
+    VERSION_METADATA = 'config-version'
+    EXPORTER_LABEL = '__exporter_name__'
+    SERVICE_METADATA_KEY = 'x-service'
+    GROUP_JOB_PREFIX = 'stack_'
+    JOBS_MODES = ('per_container', 'per_stack', 'per_stack_host')
+    COMMIT_RETRIES = 10
+    _commit_lock = threading.Lock()
+
     def __init__(self):
         """
         Инициализация класса MainPrometheusConfig.
         """
         self.bucket = 'prometheus'
         self.minio_client = MinioService()
+        self.jobs_mode = os.getenv('SCRAPE_JOBS_MODE', 'per_container')
+        if self.jobs_mode not in self.JOBS_MODES:
+            logger.warning(f"Неизвестный режим SCRAPE_JOBS_MODE={self.jobs_mode}, используется per_container")
+            self.jobs_mode = 'per_container'
 
-    def _get_exporter_host_port(self) -> Optional[str]:
+    @staticmethod
+    def _label_target(target: list | dict, labels: Dict[str, Optional[str]]) -> list | dict:
         """
-        Получает внешний порт экспортера на хосте.
-        Убирает выбор порта - всегда использует первый найденный внешний порт экспортера.
+        Добавляет метки во все группы target.
+
+        Args:
+            target: Конфигурация target (список или словарь)
+            labels: Метки; метки со значением None не добавляются
 
         Returns:
-            Optional[str]: Внешний порт на хосте или None, если не найден
+            Конфигурация target с метками
         """
-        try:
-            docker_client = docker.from_env()
-            for container in docker_client.containers.list(all=True):
-                if 'exporter' in container.name.lower():
-                    ports = container.attrs.get('NetworkSettings', {}).get('Ports', {})
-                    for internal_port, port_bindings in ports.items():
-                        if port_bindings and len(port_bindings) > 0:
-                            host_port = port_bindings[0].get('HostPort')
-                            if host_port:
-                                return host_port
-        except Exception as e:
-            pass
-
-    def _fix_target_port(self, target: List[Dict[str, Any]] | Dict[str, Any]) -> List[Dict[str, Any]] | Dict[str, Any]:
-        """
-        Исправляет порт в target на внешний порт хоста экспортера.
-        Всегда использует внешний порт хоста вместо внутреннего порта контейнера.
+        labels = {name: value for name, value in labels.items() if value}
+        if not labels:
+            return target
+        for target_item in target if isinstance(target, list) else [target]:
+            if isinstance(target_item, dict) and 'targets' in target_item:
+                target_item['labels'] = {**(target_item.get('labels') or {}), **labels}
+        return target
+
+    def _group_name(self, stack: Optional[str], host: Optional[str]) -> Optional[str]:
+        """
+        Имя общего job сервиса в текущем режиме.
 
         Args:
-            target: Конфигурация target (может быть списком или словарем)
+            stack: Стек сервиса
+            host: Хост сервиса
 
         Returns:
-            Исправленная конфигурация target
-        """
-        if isinstance(target, dict):
-            target = [target]
-        
-        host_port = self._get_exporter_host_port()
-        if not host_port:
-            return target if isinstance(target, list) else target[0] if target else {}
-        
-        for target_item in target:
-            if isinstance(target_item, dict) and 'targets' in target_item:
-                targets_list = target_item.get('targets', [])
-                for i, target_address in enumerate(targets_list):
-                    if isinstance(target_address, str) and ':' in target_address:
-                        host_part = target_address.split(':')[0]
-                        port_part = target_address.split(':')[-1]
-                        new_target = f"{host_part}:{host_port}"
-                        if target_address != new_target:
-                            targets_list[i] = new_target
-        
-        return target if isinstance(target, list) else target[0] if target else {}
+            Optional[str]: Имя общего job или None, если у сервиса отдельный job
+        """
+        if self.jobs_mode == 'per_container' or not stack:
+            return None
+        parts = [stack]
+        if self.jobs_mode == 'per_stack_host' and host:
+            parts.append(host)
+        return self.GROUP_JOB_PREFIX + re.sub(r'[^a-zA-Z0-9_]', '_', '_'.join(parts)).lower()
+
+    @classmethod
+    def _target_path(cls, target_name: str, group: Optional[str]) -> str:
+        """
+        Путь файла targets сервиса в MinIO.
 
-    def first_init(self):
+        Args:
+            target_name: Имя файла target
+            group: Общий job сервиса или None
+
+        Returns:
+            str: Путь файла targets
         """
-        Начальная инициализация конфига Prometheus.
+        if group:
+            return f'{cls.TARGETS_PATH}/{group}/{target_name}'
+        return f'{cls.TARGETS_PATH}/{target_name}'
+
+    @staticmethod
+    def _group_job(group: str, job: dict) -> dict:
+        """
+        Формирует общий job по job одного из сервисов группы.
+
+        Настройки scrape берутся из job сервиса, targets - из всех файлов директории группы.
+
+        Args:
+            group: Имя общего job
+            job: Job сервиса
+
+        Returns:
+            dict: Общий job
+        """
+        settings = {name: value for name, value in job.items() if name not in ('job_name', 'file_sd_configs')}
+        return {
+            'job_name': group,
+            **settings,
+            'file_sd_configs': [{'files': [f'targets/{group}/*.yml']}]
+        }
+
+    @staticmethod
+    def _is_group_job(job: dict) -> bool:
+        """
+        Является ли job основного конфига общим job группы сервисов.
+
+        Args:
+            job: Job основного конфига
+
+        Returns:
+            bool: True для общего job
+        """
+        return any(
+            file_path.endswith('/*.yml')
+            for sd_config in job.get('file_sd_configs') or []
+            for file_path in sd_config.get('files') or []
+        )
 
-        Создает базовую конфигурацию с пустым списком scrape_configs.
+    @classmethod
+    def _job_fragment_path(cls, job_name: str) -> str:
         """
-        config = {
+        Путь фрагмента job в MinIO.
+
+        Args:
+            job_name: Имя job
+
+        Returns:
+            str: Путь фрагмента
+        """
+        return f'{cls.JOBS_PREFIX}{job_name}.yml'
+
+    @staticmethod
+    def _base_config() -> dict:
+        """
+        Базовая конфигурация с пустым списком scrape_configs.
+
+        Returns:
+            dict: Конфигурация Prometheus
+        """
+        return {
             'global': {
                 'scrape_interval': '15s'
             },
             'scrape_configs': []
         }
-        self.minio_client.upload_main(
-            config,
-            'mainConfig',
-            'prometheus.yml'
+
+    def first_init(self):
+        """
+        Начальная инициализация конфига Prometheus.
+
+        Создает базовую конфигурацию с пустым списком scrape_configs, если конфига еще нет.
+        """
+        try:
+            self.minio_client.put_yaml_file(
+                self._base_config(),
+                self.MAIN_CONFIG_PATH,
+                if_none_match='*',
+                metadata={self.VERSION_METADATA: '0'}
+            )
+        except PreconditionFailed:
+            logger.info("Основной конфиг Prometheus уже создан другим экземпляром")
+
+    def _commit(self, upserts: Dict[str, dict], removed: Set[str]) -> int:
+        """
+        Применяет изменения jobs к основному конфигу одной записью.
+
+        Конфиг читается вместе с ETag и записывается условно (If-Match, для нового файла -
+        If-None-Match), поэтому параллельная запись другим экземпляром не теряется:
+        при конфликте изменения применяются заново к актуальной версии. Внутри процесса
+        записи выполняются по очереди.
+
+        Args:
+            upserts: Добавляемые и обновляемые jobs (job_name -> scrape config job)
+            removed: Имена удаляемых jobs
+
+        Returns:
+            int: Версия записанного конфига
+
+        Raises:
+            RuntimeError: Если не удалось записать конфиг за COMMIT_RETRIES попыток
+        """
+        with self._commit_lock:
+            for attempt in range(self.COMMIT_RETRIES):
+                main_config, etag, metadata = self.minio_client.get_yaml_file_versioned(self.MAIN_CONFIG_PATH)
+                if not isinstance(main_config, dict):
+                    main_config = self._base_config()
+
+                jobs = {
+                    job['job_name']: job
+                    for job in main_config.get('scrape_configs') or []
+                    if isinstance(job, dict) and job.get('job_name')
+                }
+                for job_name in removed:
+                    jobs.pop(job_name, None)
+                jobs.update(upserts)
+                main_config['scrape_configs'] = list(jobs.values())
+
+                version = int(metadata.get(self.VERSION_METADATA) or 0) + 1
+                try:
+                    self.minio_client.put_yaml_file(
+                        main_config,
+                        self.MAIN_CONFIG_PATH,
+                        if_match=etag,
+                        if_none_match=None if etag else '*',
+                        metadata={self.VERSION_METADATA: str(version)}
+                    )
+                except PreconditionFailed:
+                    logger.info(
+                        "Основной конфиг изменен параллельно, повтор записи (попытка %s)", attempt + 1
+                    )
+                    time.sleep(random.uniform(0, min(1.0, 0.05 * 2 ** attempt)))
+                    continue
+
+                logger.info(
+                    "Основной конфиг Prometheus записан: версия %s, jobs %s (добавлено/обновлено %s, удалено %s)",
+                    version, len(jobs), len(upserts), len(removed)
+                )
+                return version
+
+        raise RuntimeError(
+            f"Не удалось записать основной конфиг Prometheus за {self.COMMIT_RETRIES} попыток"
         )
 
-    def add_service(self, scrape_config: dict, target: list | dict, target_name: str) -> bool:
+    def apply_changes(self, add: List[Dict[str, Any]] = (), remove: List[Tuple[str, str]] = ()) -> int:
+        """
+        Добавляет и удаляет сервисы одной записью основного конфига.
+
+        Сначала записываются фрагменты jobs и файлы targets добавляемых сервисов, затем основной
+        конфиг, после этого удаляются фрагменты и targets удаленных сервисов - Prometheus
+        не видит job без файла targets. Если сервис при повторном добавлении попал в другую
+        группу, его прежние job и файл targets удаляются.
+
+        Args:
+            add: Добавляемые сервисы: scrape_config, target, target_name и необязательные
+                exporter_name, stack, host, container_name
+            remove: Пары (job_name, target_name) удаляемых сервисов
+
+        Returns:
+            int: Версия записанного конфига
+        """
+        services = []
+        for service in add:
+            jobs = service['scrape_config'].get('scrape_configs') or []
+            services.append((service, jobs[0] if jobs else None))
+
+        job_names = [job['job_name'] for _, job in services if job] + [job_name for job_name, _ in remove]
+        previous = self.minio_client.get_yaml_files(self._job_fragment_path(job_name) for job_name in job_names)
+
+        def previous_target_path(job_name: str, target_name: str) -> str:
+            metadata = (previous.get(self._job_fragment_path(job_name)) or {}).get(self.SERVICE_METADATA_KEY) or {}
+            return self._target_path(metadata.get('target_name') or target_name, metadata.get('group'))
+
+        upserts: Dict[str, dict] = {}
+        removed: Set[str] = set()
+        files: Dict[str, Any] = {}
+        stale_files: List[str] = []
+        for service, job in services:
+            target_name = service['target_name']
+            labels = {self.EXPORTER_LABEL: service.get('exporter_name')}
+            group = None
+            if job:
+                group = self._group_name(service.get('stack'), service.get('host'))
+                files[self._job_fragment_path(job['job_name'])] = {
+                    **job,
+                    self.SERVICE_METADATA_KEY: {
+                        'group': group,
+                        'target_name': target_name,
+                        'stack': service.get('stack'),
+                        'host': service.get('host'),
+                        'container_name': service.get('container_name'),
+                    }
+                }
+                if group:
+                    upserts[group] = self._group_job(group, job)
+                    removed.add(job['job_name'])
+                    labels.update(
+                        service=job['job_name'],
+                        container=service.get('container_name'),
+                        stack=service.get('stack'),
+                        host=service.get('host')
+                    )
+                else:
+                    upserts[job['job_name']] = job
+                old_target_path = previous_target_path(job['job_name'], target_name)
+                if old_target_path != self._target_path(target_name, group):
+                    stale_files.append(old_target_path)
+            files[self._target_path(target_name, group)] = self._label_target(service['target'], labels)
+        self.minio_client.put_yaml_files(files)
+
+        added_jobs = {job['job_name'] for _, job in services if job}
+        for job_name, target_name in remove:
+            if job_name in added_jobs:
+                continue
+            removed.add(job_name)
+            stale_files.extend([self._job_fragment_path(job_name), previous_target_path(job_name, target_name)])
+
+        version = self._commit(upserts, removed - set(upserts))
+        self.minio_client.delete_files(stale_files)
+        return version
+
+    def add_service(
+            self,
+            scrape_config: dict,
+            target: list | dict,
+            target_name: str,
+            exporter_name: Optional[str] = None,
+            stack: Optional[str] = None,
+            host: Optional[str] = None,
+            container_name: Optional[str] = None
+    ) -> bool:
         """
         Добавляет сервис в конфиг Prometheus.
 
@@ -101,28 +344,23 @@ class MainPrometheusConfig:
             scrape_config: Конфигурация scrape для сервиса
             target: Конфигурация target для сервиса
             target_name: Имя файла target
+            exporter_name: Имя контейнера экспортера
+            stack: Стек сервиса (для общих jobs)
+            host: Хост сервиса (для общих jobs по стеку и хосту)
+            container_name: Имя контейнера сервиса
 
         Returns:
             bool: True при успешном добавлении
         """
-        main_config = self.minio_client.get_yaml_file('mainConfig/prometheus.yml')
-        if main_config is None:
-            self.first_init()
-        if scrape_config.get('scrape_configs') and len(scrape_config['scrape_configs']) > 0:
-            main_config['scrape_configs'].append(scrape_config['scrape_configs'][0])
-
-        self.minio_client.upload_main(
-            main_config,
-            'mainConfig',
-            'prometheus.yml'
-        )
-
-        self.minio_client.upload_main(
-            target,
-            'mainConfig/targets',
-            target_name
-        )
-
+        self.apply_changes(add=[{
+            'scrape_config': scrape_config,
+            'target': target,
+            'target_name': target_name,
+            'exporter_name': exporter_name,
+            'stack': stack,
+            'host': host,
+            'container_name': container_name,
+        }])
         return True
 
     def remove_service(self, job_name: str, target_name: str) -> bool:
@@ -136,36 +374,103 @@ class MainPrometheusConfig:
         Returns:
             bool: True при успешном удалении
         """
-        main_config = self.minio_client.get_yaml_file('mainConfig/prometheus.yml')
-
-        if main_config is None:
+        if self.minio_client.get_yaml_file(self.MAIN_CONFIG_PATH) is None:
             return False
+        self.apply_changes(remove=[(job_name, target_name)])
+        return True
 
-        if 'scrape_configs' in main_config:
-            main_config['scrape_configs'] = [
-                config for config in main_config['scrape_configs']
-                if config.get('job_name') != job_name
-            ]
+    def ensure_fragments(self) -> int:
+        """
+        Создает фрагменты для jobs основного конфига, у которых их нет.
 
-        self.minio_client.upload_main(
-            main_config,
-            'mainConfig',
-            'prometheus.yml'
-        )
+        Нужно для конфигов, созданных до хранения jobs фрагментами.
 
-        target_path = f'mainConfig/targets/{target_name}'
-        self.minio_client.delete_file(target_path)
+        Returns:
+            int: Количество созданных фрагментов
+        """
+        main_config = self.minio_client.get_yaml_file(self.MAIN_CONFIG_PATH)
+        if not isinstance(main_config, dict):
+            return 0
+        existing = set(self.minio_client.list_files(self.JOBS_PREFIX))
+        missing = {}
+        for job in main_config.get('scrape_configs') or []:
+            if isinstance(job, dict) and job.get('job_name') and not self._is_group_job(job):
+                fragment_path = self._job_fragment_path(job['job_name'])
+                if fragment_path not in existing:
+                    missing[fragment_path] = job
+        self.minio_client.put_yaml_files(missing)
+        return len(missing)
+
+    def _move_target(self, fragment: dict, group: Optional[str]) -> dict:
+        """
+        Переносит файл targets сервиса в директорию другой группы.
 
-        return True
+        Args:
+            fragment: Фрагмент сервиса с метаданными
+            group: Новая группа сервиса или None
+
+        Returns:
+            dict: Фрагмент с обновленными метаданными
+        """
+        metadata = fragment.get(self.SERVICE_METADATA_KEY) or {}
+        job_name = fragment['job_name']
+        target_name = metadata.get('target_name') or f'{job_name}.yml'
+        old_path = self._target_path(target_name, metadata.get('group'))
+        target = self.minio_client.get_yaml_file(old_path)
+        if target is not None:
+            if group:
+                target = self._label_target(target, {
+                    'service': job_name,
+                    'container': metadata.get('container_name'),
+                    'stack': metadata.get('stack'),
+                    'host': metadata.get('host'),
+                })
+            self.minio_client.put_yaml_file(target, self._target_path(target_name, group))
+            self.minio_client.delete_file(old_path)
+        return {**fragment, self.SERVICE_METADATA_KEY: {**metadata, 'group': group, 'target_name': target_name}}
+
+    def rebuild(self) -> int:
+        """
+        Собирает scrape_configs основного конфига заново из фрагментов jobs.
+
+        Сервисы, группа которых в текущем режиме изменилась, переносятся в новую группу,
+        общие jobs без сервисов удаляются.
+
+        Returns:
+            int: Версия записанного конфига
+        """
+        upserts = {}
+        fragments = self.minio_client.get_yaml_files(self.minio_client.list_files(self.JOBS_PREFIX))
+        for fragment_path, fragment in fragments.items():
+            if not isinstance(fragment, dict) or not fragment.get('job_name'):
+                continue
+            metadata = fragment.get(self.SERVICE_METADATA_KEY) or {}
+            group = self._group_name(metadata.get('stack'), metadata.get('host'))
+            if group != metadata.get('group'):
+                fragment = self._move_target(fragment, group)
+                self.minio_client.put_yaml_file(fragment, fragment_path)
+            job = {name: value for name, value in fragment.items() if name != self.SERVICE_METADATA_KEY}
+            if group:
+                upserts[group] = self._group_job(group, job)
+            else:
+                upserts[job['job_name']] = job
+
+        main_config = self.minio_client.get_yaml_file(self.MAIN_CONFIG_PATH) or {}
+        stale = {
+            job.get('job_name') for job in main_config.get('scrape_configs') or []
+            if isinstance(job, dict) and job.get('job_name') and job['job_name'] not in upserts
+        }
+        return self._commit(upserts, stale)
 
     def get_full_config(self) -> dict:
         """
         Получает полный конфиг Prometheus и все файлы targets.
 
         Returns:
-            dict: Словарь с main_config и targets
+            dict: Словарь с main_config, targets (путь относительно targets/ -> содержимое),
+                services (job_name добавленных сервисов) и version
         """
-        main_config = self.minio_client.get_yaml_file('mainConfig/prometheus.yml')
+        main_config, _, metadata = self.minio_client.get_yaml_file_versioned(self.MAIN_CONFIG_PATH)
 
         if main_config is None:
             return {
@@ -173,16 +478,19 @@ class MainPrometheusConfig:
                 'targets': {}
             }
 
-        target_files = self.minio_client.list_files('mainConfig/targets/')
-
-        targets = {}
-        for file_path in target_files:
-            file_name = file_path.split('/')[-1]
-            target_content = self.minio_client.get_yaml_file(file_path)
-            if target_content is not None:
-                targets[file_name] = target_content
+        target_files = self.minio_client.list_files(f'{self.TARGETS_PATH}/')
+        targets = {
+            file_path[len(self.TARGETS_PATH) + 1:]: target_content
+            for file_path, target_content in self.minio_client.get_yaml_files(target_files).items()
+        }
+        services = [
+            file_path[len(self.JOBS_PREFIX):-len('.yml')]
+            for file_path in self.minio_client.list_files(self.JOBS_PREFIX)
+        ]
 
         return {
             'main_config': main_config,
-            'targets': targets
+            'targets': targets,
+            'services': services,
+            'version': int(metadata.get(self.VERSION_METADATA) or 0)
         }
@@ -1,15 +1,95 @@
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional
 
 import boto3
 import yaml
-from aiohttp import ClientError
 from botocore.client import Config
+from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
 logger = logging.getLogger(__name__)
 
+YAML_METADATA = {
+    'format': 'yaml',
+    'version': '1.0',
+    'generated-by': 'prometheus-generation',
+    'schema-version': '1.0'
+}
+
+
+# Количество одновременных запросов к MinIO при пакетных чтении и записи
+MAX_WORKERS = int(os.getenv('MINIO_MAX_WORKERS', '16'))
+# Максимальное количество ключей в одном запросе DeleteObjects
+DELETE_BATCH_SIZE = 1000
+
+# Размер пула соединений общего клиента: запросы обработчиков и пакетные операции
+MAX_POOL_CONNECTIONS = int(os.getenv('MINIO_MAX_POOL_CONNECTIONS', '50'))
+BUCKET_NAME = 'prometheus'
+
+_executor: Optional[ThreadPoolExecutor] = None
+_executor_lock = threading.Lock()
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
+    """
+    Возвращает общий для процесса клиент S3 (MinIO).
+
+    Клиент создается один раз и переиспользует пул соединений между запросами.
+    Клиенты boto3 потокобезопасны.
+
+    Returns:
+        botocore.client.S3: Клиент S3
+    """
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            load_dotenv()
+            _s3_client = boto3.client(
+                's3',
+                endpoint_url=os.getenv('MINIO_ENDPOINT'),
+                aws_access_key_id=os.getenv('MINIO_USR'),
+                aws_secret_access_key=os.getenv('MINIO_PWD'),
+                config=Config(signature_version='s3v4', max_pool_connections=MAX_POOL_CONNECTIONS),
+                region_name='us-east-1'
+            )
+        return _s3_client
+
+
+def ensure_bucket() -> None:
+    """
+    Создает бакет, если его нет. Вызывается один раз при старте приложения.
+    """
+    client = get_s3_client()
+    try:
+        client.head_bucket(Bucket=BUCKET_NAME)
+    except ClientError:
+        client.create_bucket(Bucket=BUCKET_NAME)
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """
+    Возвращает общий для процесса пул потоков для пакетных запросов к MinIO.
+
+    Returns:
+        ThreadPoolExecutor: Пул потоков размером MAX_WORKERS
+    """
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix='minio')
+        return _executor
+
+
+class PreconditionFailed(Exception):
+    """
+    Файл в MinIO изменился после чтения: условная запись (If-Match / If-None-Match) отклонена.
+    """
+
 
 class MinioService:
     """
@@ -22,27 +102,10 @@ class MinioService:
         """
         Инициализация сервиса MinIO.
 
-        Загружает параметры подключения из переменных окружения
-        и создает бакет, если его нет.
-        """
-        load_dotenv()
-        endpoint = os.getenv('MINIO_ENDPOINT')
-        access_key = os.getenv('MINIO_USR')
-        secret_key = os.getenv('MINIO_PWD')
-        self.bucket_name = 'prometheus'
-
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=endpoint,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version='s3v4'),
-            region_name='us-east-1'
-        )
-        try:
-            self.s3_client.head_bucket(Bucket=self.bucket_name)
-        except (Exception,):
-            self.s3_client.create_bucket(Bucket=self.bucket_name)
+        Использует общий для процесса клиент S3; наличие бакета проверяется при старте приложения.
+        """
+        self.bucket_name = BUCKET_NAME
+        self.s3_client = get_s3_client()
 
     def upload_main(self, yml_file: dict, path: str, file_name: str) -> dict[str, str]:
         """
@@ -75,6 +138,70 @@ class MinioService:
             'bucket': self.bucket_name
         }
 
+    def get_yaml_file_versioned(self, file_path: str) -> tuple[Optional[Any], Optional[str], Dict[str, str]]:
+        """
+        Получает YAML файл вместе с ETag и пользовательскими метаданными.
+
+        Args:
+            file_path: Путь к файлу в MinIO
+
+        Returns:
+            tuple[Optional[Any], Optional[str], Dict[str, str]]: Распарсенный YAML, ETag и метаданные;
+                (None, None, {}), если файла нет
+        """
+        try:
+            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_path)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('NoSuchKey', '404'):
+                return None, None, {}
+            raise
+        content = response['Body'].read().decode('utf-8')
+        return yaml.safe_load(content), response.get('ETag'), response.get('Metadata') or {}
+
+    def put_yaml_file(
+            self,
+            data: Any,
+            file_path: str,
+            if_match: Optional[str] = None,
+            if_none_match: Optional[str] = None,
+            metadata: Optional[Dict[str, str]] = None
+    ) -> Optional[str]:
+        """
+        Загружает YAML файл, при необходимости - условной записью.
+
+        Args:
+            data: Данные для сериализации в YAML
+            file_path: Путь к файлу в MinIO
+            if_match: Записать, только если текущий ETag файла совпадает
+            if_none_match: '*' - записать, только если файла еще нет
+            metadata: Дополнительные пользовательские метаданные
+
+        Returns:
+            Optional[str]: ETag записанного файла
+
+        Raises:
+            PreconditionFailed: Если условие записи не выполнено
+        """
+        yaml_string = yaml.dump(data, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        params = {
+            'Bucket': self.bucket_name,
+            'Key': file_path,
+            'Body': yaml_string.encode('utf-8'),
+            'ContentType': 'application/x-yaml',
+            'Metadata': {**YAML_METADATA, **(metadata or {})},
+        }
+        if if_match:
+            params['IfMatch'] = if_match
+        if if_none_match:
+            params['IfNoneMatch'] = if_none_match
+        try:
+            response = self.s3_client.put_object(**params)
+        except ClientError as e:
+            if e.response.get('Error', {}).get('Code') in ('PreconditionFailed', 'ConditionalRequestConflict'):
+                raise PreconditionFailed(file_path) from e
+            raise
+        return response.get('ETag')
+
     def upload_config(self, scrape_config: dict, target: dict, container_id: str) -> dict[str, str]:
         """
         Загружает конфигурацию Prometheus для сервиса в MinIO.
@@ -93,42 +220,10 @@ class MinioService:
             'scrape_configs': [scrape_config]
         }
 
-        target_array = [target]
-
-
-        scrape_config_yaml = yaml.dump(
-            prometheus_config,
-            allow_unicode=True,
-            default_flow_style=False,
-            sort_keys=False
-        )
-        target_yaml = yaml.dump(target_array, allow_unicode=True, default_flow_style=False, sort_keys=False)
-
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=f'configs/{container_id}/scrape_config.yml',
-            Body=scrape_config_yaml.encode('utf-8'),
-            ContentType='application/x-yaml',
-            Metadata={
-                'format': 'yaml',
-                'version': '1.0',
-                'generated-by': 'prometheus-generation',
-                'schema-version': '1.0'
-            }
-        )
-
-        self.s3_client.put_object(
-            Bucket=self.bucket_name,
-            Key=f'configs/{container_id}/{scrape_config["job_name"]}.yml',
-            Body=target_yaml.encode('utf-8'),
-            ContentType='application/x-yaml',
-            Metadata={
-                'format': 'yaml',
-                'version': '1.0',
-                'generated-by': 'prometheus-generation',
-                'schema-version': '1.0'
-            }
-        )
+        self.put_yaml_files({
+            f'configs/{container_id}/scrape_config.yml': prometheus_config,
+            f'configs/{container_id}/{scrape_config["job_name"]}.yml': [target],
+        })
 
         return {
             'file': f'configs/{container_id}',
@@ -188,6 +283,8 @@ class MinioService:
         """
         Выводит список файлов в бакете с заданным префиксом.
 
+        Список читается постранично, поэтому возвращаются все файлы, а не первые 1000.
+
         Args:
             prefix: Префикс для фильтрации файлов
             bucket: Имя бакета. Если None, используется bucket_name по умолчанию.
@@ -198,15 +295,46 @@ class MinioService:
         bucket = bucket or self.bucket_name
         result = []
         try:
-            response = self.s3_client.list_objects_v2(Bucket=bucket, Prefix=prefix)
-            if 'Contents' in response:
-                for obj in response['Contents']:
+            paginator = self.s3_client.get_paginator('list_objects_v2')
+            for page in paginator.paginate(Bucket=bucket, Prefix=prefix):
+                for obj in page.get('Contents', []):
                     result.append(obj['Key'])
             return result
         except ClientError as e:
             logger.error(f"Ошибка при получении списка файлов: {e}")
             return []
 
+    def get_yaml_files(self, file_paths: Iterable[str], bucket: Optional[str] = None) -> Dict[str, Any]:
+        """
+        Параллельно получает несколько YAML файлов из MinIO.
+
+        Args:
+            file_paths: Пути к файлам в MinIO
+            bucket: Имя бакета. Если None, используется bucket_name по умолчанию.
+
+        Returns:
+            Dict[str, Any]: Путь -> распарсенный YAML для существующих файлов
+        """
+        file_paths = list(file_paths)
+        contents = get_executor().map(lambda file_path: self.get_yaml_file(file_path, bucket), file_paths)
+        return {
+            file_path: content
+            for file_path, content in zip(file_paths, contents)
+            if content is not None
+        }
+
+    def put_yaml_files(self, files: Dict[str, Any]) -> None:
+        """
+        Параллельно загружает несколько YAML файлов в MinIO.
+
+        Args:
+            files: Путь -> данные для сериализации в YAML
+
+        Raises:
+            ClientError: При ошибке загрузки любого из файлов
+        """
+        list(get_executor().map(lambda item: self.put_yaml_file(item[1], item[0]), files.items()))
+
     def delete_file(self, file_path: str, bucket: Optional[str] = None) -> bool:
         """
         Удаляет файл из MinIO.
@@ -226,3 +354,32 @@ class MinioService:
             logger.error(f"Ошибка при удалении файла {file_path}: {e}")
             return False
 
+    def delete_files(self, file_paths: Iterable[str], bucket: Optional[str] = None) -> int:
+        """
+        Удаляет файлы из MinIO пакетами по DELETE_BATCH_SIZE ключей в запросе.
+
+        Args:
+            file_paths: Пути к файлам в MinIO
+            bucket: Имя бакета. Если None, используется bucket_name по умолчанию.
+
+        Returns:
+            int: Количество удаленных файлов
+        """
+        bucket = bucket or self.bucket_name
+        file_paths = list(dict.fromkeys(file_paths))
+        deleted_count = 0
+        for start in range(0, len(file_paths), DELETE_BATCH_SIZE):
+            batch = file_paths[start:start + DELETE_BATCH_SIZE]
+            try:
+                response = self.s3_client.delete_objects(
+                    Bucket=bucket,
+                    Delete={'Objects': [{'Key': file_path} for file_path in batch], 'Quiet': True}
+                )
+            except ClientError as e:
+                logger.error(f"Ошибка при удалении файлов: {e}")
+                continue
+            errors = response.get('Errors', [])
+            for error in errors:
+                logger.error(f"Ошибка при удалении файла {error.get('Key')}: {error.get('Message')}")
+            deleted_count += len(batch) - len(errors)
+        return deleted_count
@@ -2,7 +2,6 @@ import logging
 import os
 from typing import Any, Dict, Optional
 
-import docker
 import yaml
 
 from app.services.exporter_env_generator import ExporterEnvGenerator
@@ -96,30 +95,6 @@ class PrometheusConfigGenerator:
         """
         return stack.lower().replace(' ', '_')
 
-    def _get_exporter_host_port(self, container_port: str) -> Optional[str]:
-        """
-        Получает внешний порт экспортера на хосте.
-        Убирает выбор порта - всегда использует первый найденный внешний порт экспортера.
-
-        Args:
-            container_port: Внутренний порт контейнера (игнорируется, используется для логирования)
-
-        Returns:
-            Optional[str]: Внешний порт на хосте или None, если не найден
-        """
-        try:
-            docker_client = docker.from_env()
-            for container in docker_client.containers.list(all=True):
-                if 'exporter' in container.name.lower():
-                    ports = container.attrs.get('NetworkSettings', {}).get('Ports', {})
-                    for internal_port, port_bindings in ports.items():
-                        if port_bindings and len(port_bindings) > 0:
-                            host_port = port_bindings[0].get('HostPort')
-                            if host_port:
-                                return host_port
-        except Exception as e:
-            pass
-
     def _build_prometheus_config(
             self,
             container_name: str,
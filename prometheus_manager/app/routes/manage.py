@@ -24,10 +24,12 @@ def get_update_config() -> UpdateConfig:
     """
     Получение экземпляра UpdateConfig.
 
+    Новый основной конфиг проверяется promtool до того, как заменит текущий.
+
     Returns:
         UpdateConfig: Экземпляр обновления конфигурации
     """
-    return UpdateConfig()
+    return UpdateConfig(validate_config=get_prometheus_manager().validate_config)
 
 
 @router.post("/prometheus/start", status_code=status.HTTP_200_OK)
@@ -85,6 +87,34 @@ async def stop_prometheus() -> Dict[str, Any]:
         )
 
 
+@router.post("/prometheus/reload", status_code=status.HTTP_200_OK)
+def reload_prometheus() -> Dict[str, Any]:
+    """
+    Применяет конфигурацию Prometheus без перезапуска контейнера.
+
+    Конфигурация проверяется promtool, затем Prometheus получает SIGHUP.
+
+    Returns:
+        Dict[str, Any]: Результат перезагрузки и вывод promtool
+
+    Raises:
+        HTTPException: Если контейнер не запущен, конфиг некорректен или при ошибке перезагрузки
+    """
+    try:
+        result = get_prometheus_manager().reload()
+    except Exception as e:
+        logger.error(f"Error reloading Prometheus: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to reload Prometheus: {str(e)}"
+        )
+    if result["status"] == "not_running":
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=result["detail"])
+    if result["status"] == "invalid_config":
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=result["detail"])
+    return {"message": "Prometheus reloaded successfully", **result}
+
+
 @router.get("/prometheus/status", status_code=status.HTTP_200_OK)
 async def get_prometheus_status() -> Dict[str, Any]:
     """
@@ -162,20 +192,41 @@ async def update_settings(settings: Dict[str, Any]) -> Dict[str, Any]:
 
 
 @router.post("/config/update", status_code=status.HTTP_200_OK)
-async def update_config() -> Dict[str, Any]:
+def update_config() -> Dict[str, Any]:
     """
     Обновляет конфигурацию Prometheus из MinIO.
 
+    Синхронизация выполняет блокирующие запросы к MinIO и Docker, поэтому обработчик
+    синхронный и выполняется в пуле потоков. Если изменился основной конфиг, работающий
+    Prometheus перезагружается без пересоздания контейнера; изменения targets Prometheus
+    подхватывает через file_sd сам. Основной конфиг, не прошедший проверку promtool,
+    не применяется: Prometheus продолжает работать с прежним.
+
     Returns:
-        Dict[str, Any]: Результат обновления конфигурации
+        Dict[str, Any]: Результат обновления конфигурации, итоги синхронизации и перезагрузки
 
     Raises:
-        HTTPException: При ошибке обновления конфигурации
+        HTTPException: Если новый основной конфиг некорректен или при ошибке обновления конфигурации
     """
     try:
         updater = get_update_config()
-        updater.update()
-        return {"message": "Configuration updated successfully"}
+        sync = updater.update()
+    except Exception as e:
+        logger.error(f"Error updating config: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to update config: {str(e)}"
+        )
+    if sync.get("main_config") == "invalid":
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail={"status": "invalid_config", "detail": sync["detail"], "targets": sync["targets"]}
+        )
+    try:
+        reload = None
+        if sync.get("main_config") == "updated":
+            reload = get_prometheus_manager().reload()
+        return {"message": "Configuration updated successfully", "sync": sync, "reload": reload}
     except Exception as e:
         logger.error(f"Error updating config: {str(e)}")
         raise HTTPException(
@@ -0,0 +1,183 @@
+import logging
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+import docker
+
+logger = logging.getLogger(__name__)
+
+# Метка target с именем контейнера экспортера. Метки с префиксом "__" Prometheus
+# отбрасывает после relabeling, поэтому в метрики она не попадает.
+EXPORTER_LABEL = '__exporter_name__'
+
+
+class ExporterPortResolver:
+    """
+    Кэш опубликованных портов экспортеров на хосте.
+
+    Порты всех экспортеров читаются одним запросом списка контейнеров с фильтром по имени
+    и хранятся в памяти процесса: имя экспортера -> {порт контейнера: порт хоста}.
+    Кэш сбрасывается по событиям Docker о контейнерах экспортеров, а если поток событий
+    недоступен - по истечении TTL (EXPORTER_PORTS_TTL, секунд).
+    """
+
+    EXPORTER_NAME_FILTER = 'exporter'
+    EVENTS = ('create', 'start', 'stop', 'die', 'destroy', 'rename')
+
+    def __init__(self, ttl: Optional[float] = None):
+        """
+        Инициализация кэша портов экспортеров.
+
+        Args:
+            ttl: Время жизни кэша в секундах. Если None, берется из EXPORTER_PORTS_TTL (по умолчанию 30)
+        """
+        self.ttl = ttl if ttl is not None else float(os.getenv('EXPORTER_PORTS_TTL', '30'))
+        self._lock = threading.Lock()
+        self._ports: Dict[str, Dict[str, str]] = {}
+        self._loaded_at: Optional[float] = None
+        self._client = None
+        self._events_thread: Optional[threading.Thread] = None
+
+    def _get_client(self):
+        """
+        Возвращает клиент Docker, создавая его при первом обращении.
+
+        Returns:
+            docker.DockerClient: Клиент Docker
+        """
+        if self._client is None:
+            self._client = docker.from_env()
+        return self._client
+
+    def invalidate(self) -> None:
+        """
+        Сбрасывает кэш: порты будут перечитаны при следующем обращении.
+        """
+        with self._lock:
+            self._loaded_at = None
+
+    def _load(self) -> Dict[str, Dict[str, str]]:
+        """
+        Читает опубликованные порты экспортеров одним запросом к Docker API.
+
+        Returns:
+            Dict[str, Dict[str, str]]: Имя экспортера в нижнем регистре -> {порт контейнера: порт хоста}
+        """
+        containers = self._get_client().api.containers(
+            all=True,
+            filters={'name': self.EXPORTER_NAME_FILTER}
+        )
+        ports: Dict[str, Dict[str, str]] = {}
+        for container in containers:
+            bindings = {
+                str(port['PrivatePort']): str(port['PublicPort'])
+                for port in container.get('Ports') or []
+                if port.get('PublicPort')
+            }
+            for name in container.get('Names') or []:
+                ports[name.lstrip('/').lower()] = bindings
+        return ports
+
+    def _ensure_events_listener(self) -> None:
+        """
+        Запускает фоновый поток, сбрасывающий кэш по событиям контейнеров экспортеров.
+        """
+        if self._events_thread is not None and self._events_thread.is_alive():
+            return
+        self._events_thread = threading.Thread(
+            target=self._listen_events,
+            name='exporter-ports-events',
+            daemon=True
+        )
+        self._events_thread.start()
+
+    def _listen_events(self) -> None:
+        """
+        Читает поток событий Docker и сбрасывает кэш при изменении контейнеров экспортеров.
+
+        При обрыве потока кэш сбрасывается, а подписка восстанавливается через TTL;
+        до восстановления актуальность обеспечивает TTL.
+        """
+        while True:
+            try:
+                events = self._get_client().events(
+                    decode=True,
+                    filters={'type': 'container', 'event': list(self.EVENTS)}
+                )
+                for event in events:
+                    name = (event.get('Actor') or {}).get('Attributes', {}).get('name', '')
+                    if self.EXPORTER_NAME_FILTER in name.lower():
+                        self.invalidate()
+            except Exception as e:
+                logger.warning(f"Поток событий Docker недоступен, кэш портов обновляется по TTL: {e}")
+            self.invalidate()
+            time.sleep(self.ttl)
+
+    def get_ports(self, exporter_name: str) -> Optional[Dict[str, str]]:
+        """
+        Возвращает опубликованные порты экспортера.
+
+        Args:
+            exporter_name: Имя контейнера экспортера
+
+        Returns:
+            Optional[Dict[str, str]]: {порт контейнера: порт хоста} или None, если экспортер не найден
+        """
+        with self._lock:
+            expired = self._loaded_at is None or time.monotonic() - self._loaded_at > self.ttl
+            if expired:
+                try:
+                    self._ports = self._load()
+                    self._loaded_at = time.monotonic()
+                except Exception as e:
+                    logger.error(f"Ошибка при получении портов экспортеров: {e}")
+                    return None
+            ports = self._ports.get(exporter_name.lstrip('/').lower())
+        if expired:
+            self._ensure_events_listener()
+        return ports
+
+    def resolve(self, exporter_name: str, port: Optional[str] = None) -> Optional[str]:
+        """
+        Определяет внешний порт конкретного экспортера на хосте.
+
+        Если порт уже опубликован экспортером, он сохраняется; если это порт внутри контейнера,
+        возвращается опубликованный для него порт хоста; иначе - первый опубликованный порт.
+
+        Args:
+            exporter_name: Имя контейнера экспортера
+            port: Порт из адреса target
+
+        Returns:
+            Optional[str]: Порт на хосте или None, если экспортер не найден или не публикует портов
+        """
+        ports = self.get_ports(exporter_name)
+        if not ports:
+            return None
+        if port is not None:
+            port = str(port)
+            if port in ports.values():
+                return port
+            if port in ports:
+                return ports[port]
+        return next(iter(ports.values()))
+
+
+_resolver: Optional[ExporterPortResolver] = None
+_resolver_lock = threading.Lock()
+
+
+def get_exporter_port_resolver() -> ExporterPortResolver:
+    """
+    Возвращает общий для процесса кэш портов экспортеров.
+
+    Returns:
+        ExporterPortResolver: Кэш портов экспортеров
+    """
+    global _resolver
+    with _resolver_lock:
+        if _resolver is None:
+            _resolver = ExporterPortResolver()
+        return _resolver
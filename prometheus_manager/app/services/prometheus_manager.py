@@ -1,3 +1,5 @@
+import hashlib
+import json
 import logging
 import os
 
@@ -8,6 +10,18 @@ logger = logging.getLogger(__name__)
 
 
 class PrometheusManager:
+    """
+    Управление контейнером Prometheus.
+
+    Изменения конфигурации применяются горячей перезагрузкой (SIGHUP) работающего контейнера
+    после проверки конфига через promtool. Контейнер пересоздается, только если изменились
+    образ или монтирование конфигурации: их хэш хранится в метке контейнера.
+    """
+
+    SPEC_LABEL = 'auto-observability.spec'
+    CONFIG_DIR_IN_CONTAINER = '/etc/prometheus'
+    CONFIG_FILE = 'prometheus.yml'
+
     def __init__(self, config_path: str = None):
         self.client = docker.from_env()
 
@@ -28,31 +42,137 @@ class PrometheusManager:
         self.prometheus_settings = self.get_prometheus_settings()
         self.container_name = self.prometheus_settings["prometheus-settings"]["name"]
 
-    def start(self):
+    def _volumes(self) -> dict:
         """
-        Запускает контейнер с монтированием всей директории prometheus/.
+        Монтирование директории prometheus/ в контейнер.
 
         Returns:
-            bool: True если контейнер запущен успешно, False при ошибке
+            dict: Параметр volumes для Docker
         """
-        self.stop()
+        return {
+            self.config_dir: {
+                'bind': self.CONFIG_DIR_IN_CONTAINER,
+                'mode': 'ro'
+            }
+        }
+
+    def _spec_hash(self) -> str:
+        """
+        Хэш параметров, изменение которых требует пересоздания контейнера.
+
+        Returns:
+            str: Хэш образа и монтирования
+        """
+        spec = {
+            'image': self.prometheus_settings["prometheus-settings"]["image"],
+            'volumes': self._volumes(),
+        }
+        return hashlib.sha256(json.dumps(spec, sort_keys=True).encode()).hexdigest()
+
+    def _get_container(self):
+        """
+        Возвращает контейнер Prometheus.
 
+        Returns:
+            Container | None: Контейнер или None, если он не создан
+        """
         try:
+            return self.client.containers.get(self.container_name)
+        except docker.errors.NotFound:
+            return None
 
+    def validate_config(self, file_name: str = CONFIG_FILE, container=None) -> tuple[bool, str]:
+        """
+        Проверяет файл конфигурации из директории prometheus/ через promtool.
 
-            volumes = {
-                self.config_dir: {
-                    'bind': '/etc/prometheus',
-                    'mode': 'ro'
-                }
-            }
+        Проверка выполняется внутри работающего контейнера Prometheus, а если он не запущен -
+        в одноразовом контейнере того же образа с тем же монтированием. Пути file_sd
+        разрешаются относительно директории конфигурации, поэтому проверяемый файл должен
+        лежать в ней.
+
+        Args:
+            file_name: Имя файла в директории prometheus/
+            container: Контейнер Prometheus. Если None, определяется по имени
+
+        Returns:
+            tuple[bool, str]: Признак корректности и вывод promtool
+        """
+        config_path = f"{self.CONFIG_DIR_IN_CONTAINER}/{file_name}"
+        command = ['promtool', 'check', 'config', config_path]
+        if container is None:
+            container = self._get_container()
+
+        if container is not None and container.status == 'running':
+            exit_code, output = container.exec_run(command)
+            valid = exit_code == 0
+        else:
+            try:
+                output = self.client.containers.run(
+                    image=self.prometheus_settings["prometheus-settings"]["image"],
+                    entrypoint=command[0],
+                    command=command[1:],
+                    volumes=self._volumes(),
+                    remove=True,
+                    stdout=True,
+                    stderr=True
+                )
+                valid = True
+            except docker.errors.ContainerError as e:
+                output = e.stderr or str(e)
+                valid = False
+        output = output.decode('utf-8', errors='replace') if isinstance(output, bytes) else str(output)
+        return valid, output
+
+    def reload(self) -> dict:
+        """
+        Применяет конфигурацию без перезапуска: проверяет ее и отправляет SIGHUP Prometheus.
+
+        Returns:
+            dict: Результат: status (reloaded, invalid_config, not_running) и detail
+        """
+        container = self._get_container()
+        if container is None or container.status != 'running':
+            return {'status': 'not_running', 'detail': 'Prometheus container is not running'}
+
+        valid, output = self.validate_config(container=container)
+        if not valid:
+            logger.error(f"Конфигурация Prometheus не прошла проверку: {output}")
+            return {'status': 'invalid_config', 'detail': output}
+
+        container.kill(signal='SIGHUP')
+        return {'status': 'reloaded', 'detail': output}
+
+    def start(self):
+        """
+        Запускает контейнер с монтированием всей директории prometheus/.
 
+        Если контейнер уже работает с тем же образом и монтированием, конфигурация применяется
+        горячей перезагрузкой; иначе контейнер пересоздается.
 
+        Returns:
+            bool: True если контейнер запущен (или перезагружен) успешно, False при ошибке
+        """
+        spec_hash = self._spec_hash()
+        try:
+            container = self._get_container()
+            if (container is not None and container.status == 'running'
+                    and container.labels.get(self.SPEC_LABEL) == spec_hash):
+                result = self.reload()
+                logger.info(f"Prometheus перезагружен без пересоздания контейнера: {result['status']}")
+                return result['status'] == 'reloaded'
+        except Exception as e:
+            logger.error(f"Ошибка перезагрузки: {e}", exc_info=True)
+            return False
+
+        self.stop()
+
+        try:
             self.container = self.client.containers.run(
                 image=self.prometheus_settings["prometheus-settings"]["image"],
                 name=self.container_name,
                 network_mode='host',
-                volumes=volumes,
+                volumes=self._volumes(),
+                labels={self.SPEC_LABEL: spec_hash},
                 detach=True,
                 restart_policy={"Name": "unless-stopped"}
             )
@@ -1,16 +1,53 @@
+import copy
+import hashlib
+import json
 import logging
 import os
-from typing import Any, Dict, List, Optional
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional, Tuple
 
 import boto3
-import docker
 import yaml
 from botocore.client import Config
 from botocore.exceptions import ClientError
 from dotenv import load_dotenv
 
+from app.services.exporter_ports import EXPORTER_LABEL, get_exporter_port_resolver
+
 logger = logging.getLogger(__name__)
 
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client(max_pool_connections: int):
+    """
+    Возвращает общий для процесса клиент S3 (MinIO).
+
+    Клиент создается один раз и переиспользует пул соединений между синхронизациями.
+
+    Args:
+        max_pool_connections: Размер пула соединений
+
+    Returns:
+        botocore.client.S3: Клиент S3
+    """
+    global _s3_client
+    with _s3_client_lock:
+        if _s3_client is None:
+            load_dotenv()
+            _s3_client = boto3.client(
+                's3',
+                endpoint_url=os.getenv('MINIO_ENDPOINT'),
+                aws_access_key_id=os.getenv('MINIO_USR'),
+                aws_secret_access_key=os.getenv('MINIO_PWD'),
+                config=Config(signature_version='s3v4', max_pool_connections=max_pool_connections),
+                region_name='us-east-1'
+            )
+        return _s3_client
+
 
 class UpdateConfig:
     """
@@ -18,96 +55,168 @@ class UpdateConfig:
 
     Предоставляет методы для загрузки основного конфига и файлов targets
     из MinIO и сохранения их в локальную директорию prometheus/.
+
+    Синхронизация инкрементальная: ETag загруженных объектов, хэш записанных файлов
+    и порты экспортеров, на которые ссылаются targets, хранятся в файле состояния,
+    загружаются только изменившиеся объекты. Файлы записываются атомарно
+    (временный файл и rename), чтобы file_sd Prometheus не прочитал частично записанный YAML,
+    а локальные targets, объектов которых больше нет в MinIO, удаляются. Новый основной конфиг
+    заменяет текущий, только если прошел проверку: до этого он лежит во временном файле рядом.
     """
 
-    def __init__(self):
+    MAIN_CONFIG_KEY = 'mainConfig/prometheus.yml'
+    TARGETS_PREFIX = 'mainConfig/targets/'
+    STATE_FILE = '.sync-state.json'
+    _sync_lock = threading.Lock()
+
+    def __init__(self, validate_config: Optional[Callable[[str], Tuple[bool, str]]] = None):
         """
         Инициализация класса UpdateConfig.
 
-        Загружает параметры подключения к MinIO из переменных окружения
-        и определяет пути к директориям prometheus/.
+        Использует общий для процесса клиент MinIO и определяет пути к директориям prometheus/.
+
+        Args:
+            validate_config: Проверка файла конфигурации по имени в директории prometheus/,
+                возвращает признак корректности и вывод проверки. Если None, конфиг не проверяется
         """
         load_dotenv()
-        endpoint = os.getenv('MINIO_ENDPOINT')
-        access_key = os.getenv('MINIO_USR')
-        secret_key = os.getenv('MINIO_PWD')
+        self.validate_config = validate_config
         self.bucket_name = 'prometheus'
-
-        self.s3_client = boto3.client(
-            's3',
-            endpoint_url=endpoint,
-            aws_access_key_id=access_key,
-            aws_secret_access_key=secret_key,
-            config=Config(signature_version='s3v4'),
-            region_name='us-east-1'
-        )
+        self.fetch_workers = int(os.getenv('TARGETS_FETCH_WORKERS', '16'))
+        self.s3_client = get_s3_client(self.fetch_workers)
 
         self.prometheus_dir = os.path.join(
             os.path.dirname(__file__),
             'prometheus'
         )
         self.targets_dir = os.path.join(self.prometheus_dir, 'targets')
+        self.state_path = os.path.join(self.prometheus_dir, self.STATE_FILE)
 
-    def _get_yaml_file(self, file_path: str) -> Optional[Dict[str, Any]]:
+    def _get_yaml_file(self, file_path: str, etag: Optional[str] = None) -> Tuple[Any, Optional[str]]:
         """
         Получает YAML файл из MinIO.
 
         Args:
             file_path: Путь к файлу в MinIO
+            etag: ETag имеющейся версии. Если объект не изменился, он не загружается
 
         Returns:
-            Optional[Dict[str, Any]]: Распарсенный YAML или None при ошибке
+            Tuple[Any, Optional[str]]: Распарсенный YAML и ETag объекта. Если объект не изменился,
+                содержимое None, а ETag равен переданному
+
+        Raises:
+            ClientError: При ошибке получения файла
         """
+        params = {'Bucket': self.bucket_name, 'Key': file_path}
+        if etag:
+            params['IfNoneMatch'] = etag
         try:
-            response = self.s3_client.get_object(Bucket=self.bucket_name, Key=file_path)
-            content = response['Body'].read().decode('utf-8')
-            return yaml.safe_load(content)
-        except Exception as e:
-            logger.error(f"Ошибка при получении файла {file_path}: {e}")
-            return None
+            response = self.s3_client.get_object(**params)
+        except ClientError as e:
+            if etag and e.response.get('Error', {}).get('Code') in ('304', 'NotModified'):
+                return None, etag
+            raise
+        content = response['Body'].read().decode('utf-8')
+        return yaml.safe_load(content), response['ETag']
 
-    def _list_files(self, prefix: str) -> List[str]:
+    def _list_objects(self, prefix: str) -> Dict[str, str]:
         """
-        Получает список файлов из MinIO.
+        Получает список объектов из MinIO постранично.
 
         Args:
             prefix: Префикс для фильтрации файлов
 
         Returns:
-            List[str]: Список путей к файлам
+            Dict[str, str]: Путь объекта -> ETag
+        """
+        objects = {}
+        paginator = self.s3_client.get_paginator('list_objects_v2')
+        for page in paginator.paginate(Bucket=self.bucket_name, Prefix=prefix):
+            for obj in page.get('Contents', []):
+                objects[obj['Key']] = obj['ETag']
+        return objects
+
+    def _load_state(self) -> Dict[str, Any]:
+        """
+        Читает состояние предыдущей синхронизации.
+
+        Returns:
+            Dict[str, Any]: Состояние: main_etag и targets (путь объекта -> etag, hash, ports)
         """
         try:
-            response = self.s3_client.list_objects_v2(Bucket=self.bucket_name, Prefix=prefix)
-            if 'Contents' in response:
-                return [obj['Key'] for obj in response['Contents']]
-            return []
-        except ClientError as e:
-            logger.error(f"Ошибка при получении списка файлов: {e}")
-            return []
+            with open(self.state_path, 'r', encoding='utf-8') as f:
+                state = json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {'main_etag': None, 'targets': {}}
+        state.setdefault('main_etag', None)
+        state.setdefault('targets', {})
+        return state
+
+    @staticmethod
+    def _remove_quietly(path: str) -> None:
+        """
+        Удаляет файл, игнорируя ошибки.
+
+        Args:
+            path: Путь к файлу
+        """
+        try:
+            os.remove(path)
+        except OSError:
+            pass
 
-    def _get_exporter_host_port(self, container_port: str) -> Optional[str]:
+    @classmethod
+    def _write_temp(cls, directory: str, content: str, prefix: str = '.', suffix: str = '.tmp') -> str:
         """
-        Получает внешний порт экспортера на хосте.
-        Убирает выбор порта - всегда использует первый найденный внешний порт экспортера.
+        Записывает содержимое во временный файл в указанной директории.
 
         Args:
-            container_port: Внутренний порт контейнера (игнорируется, используется для логирования)
+            directory: Директория временного файла
+            content: Содержимое файла
+            prefix: Префикс имени файла
+            suffix: Суффикс имени файла
 
         Returns:
-            Optional[str]: Внешний порт на хосте или None, если не найден
+            str: Путь к временному файлу
         """
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=prefix, suffix=suffix)
         try:
-            docker_client = docker.from_env()
-            for container in docker_client.containers.list(all=True):
-                if 'exporter' in container.name.lower():
-                    ports = container.attrs.get('NetworkSettings', {}).get('Ports', {})
-                    for internal_port, port_bindings in ports.items():
-                        if port_bindings and len(port_bindings) > 0:
-                            host_port = port_bindings[0].get('HostPort')
-                            if host_port:
-                                return host_port
-        except Exception as e:
-            pass
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                f.write(content)
+            os.chmod(tmp_path, 0o644)
+        except BaseException:
+            cls._remove_quietly(tmp_path)
+            raise
+        return tmp_path
+
+    @classmethod
+    def _write_atomic(cls, path: str, content: str) -> None:
+        """
+        Атомарно записывает файл: во временный файл в той же директории, затем rename.
+
+        Args:
+            path: Путь к файлу
+            content: Содержимое файла
+        """
+        tmp_path = cls._write_temp(os.path.dirname(path), content)
+        try:
+            os.replace(tmp_path, path)
+        except BaseException:
+            cls._remove_quietly(tmp_path)
+            raise
+
+    @staticmethod
+    def _dump_yaml(data: Any) -> str:
+        """
+        Сериализует данные в YAML.
+
+        Args:
+            data: Данные
+
+        Returns:
+            str: YAML
+        """
+        return yaml.dump(data, allow_unicode=True, default_flow_style=False, sort_keys=False)
 
     def _fix_target_for_host_network(self, target: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
         """
@@ -115,6 +224,8 @@ class UpdateConfig:
 
         Заменяет IP хоста или host.docker.internal на localhost и использует внешний порт экспортера,
         так как Prometheus использует network_mode: host и может обращаться к хосту напрямую.
+        Порт определяется по экспортеру из метки __exporter_name__ через общий кэш портов;
+        если метки нет или экспортер не найден, порт из адреса сохраняется.
 
         Args:
             target: Список с конфигурацией target
@@ -125,10 +236,12 @@ class UpdateConfig:
         if not target:
             return target
 
+        resolver = get_exporter_port_resolver()
         for target_item in target:
             if not isinstance(target_item, dict) or 'targets' not in target_item:
                 continue
-            
+
+            exporter_name = (target_item.get('labels') or {}).get(EXPORTER_LABEL)
             targets_list = target_item.get('targets', [])
             if not targets_list:
                 continue
@@ -149,59 +262,221 @@ class UpdateConfig:
                             host_part == 'localhost')
 
                 if needs_fix:
+                    if exporter_name:
+                        port_part = resolver.resolve(exporter_name, port_part) or port_part
                     new_target = f"localhost:{port_part}"
                     targets_list[i] = new_target
 
 
         return target
 
-    def update(self) -> None:
+    @staticmethod
+    def _exporter_ports(content: Any) -> Dict[str, Optional[Dict[str, str]]]:
         """
-        Обновляет конфигурацию Prometheus из MinIO.
+        Опубликованные порты экспортеров, на которые ссылается target.
+
+        Args:
+            content: Содержимое объекта target из MinIO
+
+        Returns:
+            Dict[str, Optional[Dict[str, str]]]: Имя экспортера из метки __exporter_name__ ->
+                {порт контейнера: порт хоста} или None, если экспортер не найден
+        """
+        resolver = get_exporter_port_resolver()
+        names = {
+            (item.get('labels') or {}).get(EXPORTER_LABEL)
+            for item in content or []
+            if isinstance(item, dict)
+        }
+        return {name: resolver.get_ports(name) for name in sorted(names - {None})}
+
+    @staticmethod
+    def _ports_changed(entry: Dict[str, Any]) -> bool:
+        """
+        Проверяет, изменились ли порты экспортеров с момента записи файла target.
 
-        Загружает основной конфиг и файлы targets из MinIO
-        и сохраняет их в локальную директорию prometheus/.
+        Args:
+            entry: Состояние target
+
+        Returns:
+            bool: True, если порт хотя бы одного экспортера изменился
         """
-        main_config = self._get_yaml_file('mainConfig/prometheus.yml')
-        if not main_config:
-            return
+        resolver = get_exporter_port_resolver()
+        return any(resolver.get_ports(name) != ports for name, ports in entry.get('ports', {}).items())
+
+    def _render_target(self, content: Any) -> str:
+        """
+        Формирует содержимое локального файла target.
+
+        Args:
+            content: Содержимое объекта target из MinIO
+
+        Returns:
+            str: YAML с адресами, исправленными для network_mode: host; для пустого объекта - пустой список
+        """
+        return self._dump_yaml(self._fix_target_for_host_network(copy.deepcopy(content or [])))
+
+    def _sync_main_config(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Загружает основной конфиг, если он изменился.
+
+        Новый конфиг записывается во временный файл в директории prometheus/ (пути file_sd
+        в нем разрешаются относительно этой директории) и проверяется. Текущий prometheus.yml
+        заменяется, а ETag сохраняется, только если проверка прошла; иначе остается прежний
+        конфиг, и при следующей синхронизации объект будет загружен и проверен снова.
 
+        Args:
+            state: Состояние синхронизации, обновляется на месте
+
+        Returns:
+            Dict[str, Any]: Статус main_config (updated, unchanged или invalid) и вывод проверки
+                в detail для некорректного конфига
+        """
         prometheus_yml_path = os.path.join(self.prometheus_dir, 'prometheus.yml')
-        with open(prometheus_yml_path, 'w', encoding='utf-8') as f:
-            yaml.dump(main_config, f, allow_unicode=True, default_flow_style=False, sort_keys=False)
+        etag = state['main_etag'] if os.path.exists(prometheus_yml_path) else None
+        main_config, new_etag = self._get_yaml_file(self.MAIN_CONFIG_KEY, etag)
+        if main_config is None:
+            return {'main_config': 'unchanged'}
 
-        target_files = self._list_files('mainConfig/targets/')
+        tmp_path = self._write_temp(self.prometheus_dir, self._dump_yaml(main_config), prefix='.prometheus-', suffix='.yml')
+        try:
+            if self.validate_config is not None:
+                valid, output = self.validate_config(os.path.basename(tmp_path))
+                if not valid:
+                    logger.error(f"Конфиг {self.MAIN_CONFIG_KEY} (ETag {new_etag}) не прошел проверку, оставлен прежний: {output}")
+                    return {'main_config': 'invalid', 'detail': output}
+            os.replace(tmp_path, prometheus_yml_path)
+        finally:
+            self._remove_quietly(tmp_path)
+        state['main_etag'] = new_etag
+        return {'main_config': 'updated'}
+
+    def _fetch_target(self, key: str) -> Optional[Tuple[Any, str]]:
+        """
+        Загружает объект target из MinIO.
 
-        os.makedirs(self.targets_dir, exist_ok=True)
+        Args:
+            key: Путь объекта
+
+        Returns:
+            Optional[Tuple[Any, str]]: Содержимое и ETag или None при ошибке
+        """
+        try:
+            return self._get_yaml_file(key)
+        except Exception as e:
+            logger.error(f"Ошибка при получении файла {key}: {e}")
+            return None
+
+    def _relative_target_path(self, key: str) -> Optional[str]:
+        """
+        Путь файла target относительно локальной директории targets.
+
+        Args:
+            key: Путь объекта в MinIO
+
+        Returns:
+            Optional[str]: Относительный путь, например stack_postgresql/app_postgres.yml,
+                или None, если путь выходит за пределы директории targets
+        """
+        path = os.path.normpath(key[len(self.TARGETS_PREFIX):])
+        if os.path.isabs(path) or path == os.curdir or path == os.pardir or path.startswith(os.pardir + os.sep):
+            return None
+        return path
+
+    def _sync_targets(self, state: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Синхронизирует файлы targets с MinIO.
+
+        Параллельно загружаются и заново формируются только новые и изменившиеся объекты,
+        объекты, у экспортеров которых изменились опубликованные порты, и объекты
+        с отсутствующим локальным файлом. Файл перезаписывается, только если изменился
+        хэш его содержимого. Пустой объект записывается пустым списком targets.
+        Поддиректории targets (файлы общих jobs групп сервисов) повторяют структуру MinIO.
+
+        Args:
+            state: Состояние синхронизации, обновляется на месте
 
-        for file_path in target_files:
-            target_content = self._get_yaml_file(file_path)
-            if target_content:
-                target_content = self._fix_target_for_host_network(target_content)
-                file_name = file_path.split('/')[-1]
-                target_path = os.path.join(self.targets_dir, file_name)
-                
-                if os.path.exists(target_path):
+        Returns:
+            Dict[str, int]: Количество загруженных, записанных и удаленных файлов
+        """
+        os.makedirs(self.targets_dir, exist_ok=True)
+        objects = {}
+        for key, etag in self._list_objects(self.TARGETS_PREFIX).items():
+            if self._relative_target_path(key) is None:
+                logger.warning(f"Пропущен объект target с недопустимым путем: {key}")
+                continue
+            objects[key] = etag
+        known = state['targets']
+
+        changed = []
+        for key, etag in objects.items():
+            entry = known.get(key)
+            target_path = os.path.join(self.targets_dir, self._relative_target_path(key))
+            if (not entry or entry.get('etag') != etag or entry.get('hash') is None
+                    or not os.path.exists(target_path) or self._ports_changed(entry)):
+                changed.append(key)
+
+        fetched = []
+        if changed:
+            with ThreadPoolExecutor(max_workers=self.fetch_workers) as executor:
+                fetched = list(executor.map(self._fetch_target, changed))
+
+        written = 0
+        for key, result in zip(changed, fetched):
+            if result is None:
+                continue
+            content, etag = result
+            ports = self._exporter_ports(content)
+            rendered = self._render_target(content)
+            rendered_hash = hashlib.sha256(rendered.encode('utf-8')).hexdigest()
+            target_path = os.path.join(self.targets_dir, self._relative_target_path(key))
+            if rendered_hash != known.get(key, {}).get('hash') or not os.path.exists(target_path):
+                os.makedirs(os.path.dirname(target_path), exist_ok=True)
+                self._write_atomic(target_path, rendered)
+                written += 1
+            known[key] = {'etag': etag, 'hash': rendered_hash, 'ports': ports}
+
+        for key in [key for key in known if key not in objects]:
+            del known[key]
+        expected_files = {self._relative_target_path(key) for key in objects}
+        deleted = 0
+        for directory, _, file_names in os.walk(self.targets_dir, topdown=False):
+            for file_name in file_names:
+                file_path = os.path.relpath(os.path.join(directory, file_name), self.targets_dir)
+                if file_name.endswith('.yml') and file_path not in expected_files:
                     try:
-                        if not os.access(target_path, os.W_OK):
-                            os.remove(target_path)
-                    except (PermissionError, OSError) as e:
-                        try:
-                            os.remove(target_path)
-                        except Exception:
-                            pass
-                
-                try:
-                    with open(target_path, 'w', encoding='utf-8') as f:
-                        yaml.dump(
-                            target_content,
-                            f,
-                            allow_unicode=True,
-                            default_flow_style=False,
-                            sort_keys=False
-                        )
-                    os.chmod(target_path, 0o644)
-                except PermissionError as e:
-                    logger.error(f"Permission denied writing to {target_path}: {e}")
-                    raise
+                        os.remove(os.path.join(directory, file_name))
+                        deleted += 1
+                    except OSError as e:
+                        logger.error(f"Не удалось удалить устаревший файл target {file_path}: {e}")
+            if directory != self.targets_dir and not os.listdir(directory):
+                os.rmdir(directory)
+
+        return {'fetched': len(changed), 'written': written, 'deleted': deleted, 'total': len(objects)}
 
+    def update(self) -> Dict[str, Any]:
+        """
+        Обновляет конфигурацию Prometheus из MinIO.
+
+        Загружает изменившиеся основной конфиг и файлы targets из MinIO, сохраняет их
+        в локальную директорию prometheus/ и удаляет targets, которых больше нет в MinIO.
+        Targets синхронизируются первыми, чтобы основной конфиг проверялся с актуальными
+        файлами file_sd. Если ничего не изменилось, синхронизация стоит одного условного GET
+        и одного запроса списка на каждые 1000 targets.
+
+        Returns:
+            Dict[str, Any]: Итоги синхронизации: статус main_config (updated, unchanged,
+                invalid или unavailable), detail для некорректного конфига и итоги targets
+        """
+        with self._sync_lock:
+            state = self._load_state()
+            targets = self._sync_targets(state)
+            try:
+                result = self._sync_main_config(state)
+            except ClientError as e:
+                logger.error(f"Ошибка при получении файла {self.MAIN_CONFIG_KEY}: {e}")
+                result = {'main_config': 'unavailable'}
+            self._write_atomic(self.state_path, json.dumps(state))
+
+        logger.info(f"Конфигурация Prometheus синхронизирована: main_config={result['main_config']}, {targets}")
+        return {**result, 'targets': targets}
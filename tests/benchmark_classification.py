@@ -0,0 +1,183 @@
+"""
+Бенчмарк классификации контейнеров в docker_classification.
+
+Сравнивает задержку на один контейнер для прежнего перебора правил
+и для скомпилированного индекса WeightedDiscovery на поставляемом signatures.yml.
+Дополнительно проверяет, что обе реализации возвращают одинаковый результат.
+"""
+
+import importlib.util
+import logging
+import os
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+CLASSIFICATION_MODULE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)),
+    "..", "docker_classification", "app", "services", "docker_clasification.py"
+)
+CONTAINERS_COUNT = 3000
+ROUNDS = 5
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(levelname)s] %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def load_weighted_discovery():
+    """
+    Загружает класс WeightedDiscovery из docker_classification.
+
+    Returns:
+        type: Класс WeightedDiscovery
+    """
+    spec = importlib.util.spec_from_file_location("docker_clasification", CLASSIFICATION_MODULE_PATH)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.WeightedDiscovery
+
+
+def legacy_classify(rules: Dict, threshold: int, labels: dict, envs: list, image: str, ports: list) -> list:
+    """
+    Прежняя реализация классификации: последовательный перебор всех правил.
+
+    Returns:
+        list: Отсортированный список кортежей (технология, балл)
+    """
+    scores = defaultdict(int)
+
+    for port, data in rules['ports'].items():
+        if port in ports:
+            scores[data['tech']] += data['weight']
+
+    for env_key, data in rules['env'].items():
+        if any(env_key in env_var for env_var in envs):
+            scores[data['tech']] += data['weight']
+
+    for img_part, data in rules['images'].items():
+        if img_part in image:
+            scores[data['tech']] += data['weight']
+
+    for lb_key, data in rules['labels'].items():
+        if lb_key in labels:
+            tech = labels[lb_key] if data['tech'] == "auto" else data['tech']
+            scores[tech] += data['weight']
+
+    final_decision = {tech: score for tech, score in scores.items() if score >= threshold}
+
+    return sorted(final_decision.items(), key=lambda x: x[1], reverse=True)
+
+
+def generate_containers(rules: Dict, count: int) -> List[Dict]:
+    """
+    Генерирует синтетические контейнеры из правил signatures.yml и типичного окружения.
+
+    Args:
+        rules: Правила классификации
+        count: Количество контейнеров
+
+    Returns:
+        List[Dict]: Параметры контейнеров (labels, envs, image, ports)
+    """
+    rnd = random.Random(42)
+    env_keys = list(rules['env'])
+    images = list(rules['images'])
+    ports = list(rules['ports'])
+    common_envs = [
+        "PATH=/usr/local/sbin:/usr/local/bin:/usr/sbin:/usr/bin:/sbin:/bin",
+        "LANG=C.UTF-8",
+        "HOME=/root",
+        "TZ=UTC",
+        "GOSU_VERSION=1.17",
+    ]
+
+    containers = []
+    for i in range(count):
+        envs = list(common_envs)
+        envs += [f"{key}=value{i}" for key in rnd.sample(env_keys, rnd.randint(0, 6))]
+        envs += [f"APP_SETTING_{j}=/opt/app/{j}" for j in range(rnd.randint(0, 15))]
+        labels = {
+            "com.docker.compose.project": f"project{i % 20}",
+            "com.docker.compose.version": "2.24.0",
+            "com.docker.compose.oneoff": "False",
+        }
+        if rnd.random() < 0.7:
+            labels["com.docker.compose.service"] = rnd.choice(images)
+        if rnd.random() < 0.1:
+            labels["monitor.type"] = rnd.choice(images)
+        image = f"registry.local/{rnd.choice(images)}:{rnd.randint(1, 16)}.{rnd.randint(0, 9)}"
+        containers.append({
+            "labels": labels,
+            "envs": envs,
+            "image": image,
+            "ports": rnd.sample(ports, rnd.randint(0, 3)),
+        })
+    return containers
+
+
+def measure(classify, containers: List[Dict]) -> float:
+    """
+    Измеряет среднюю задержку классификации одного контейнера.
+
+    Args:
+        classify: Функция классификации (labels, envs, image, ports) -> list
+        containers: Параметры контейнеров
+
+    Returns:
+        float: Лучшая по раундам средняя задержка в микросекундах
+    """
+    best = None
+    for _ in range(ROUNDS):
+        started = time.perf_counter()
+        for container in containers:
+            classify(container["labels"], container["envs"], container["image"], container["ports"])
+        elapsed = (time.perf_counter() - started) / len(containers) * 1e6
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    """
+    Запускает сравнение реализаций и выводит результаты.
+    """
+    weighted_discovery_cls = load_weighted_discovery()
+
+    started = time.perf_counter()
+    discovery = weighted_discovery_cls()
+    load_ms = (time.perf_counter() - started) * 1000
+
+    containers = generate_containers(discovery.rules, CONTAINERS_COUNT)
+
+    def legacy(labels, envs, image, ports):
+        return legacy_classify(discovery.rules, discovery.threshold, labels, envs, image, ports)
+
+    mismatches = 0
+    for container in containers:
+        args = (container["labels"], container["envs"], container["image"], container["ports"])
+        if legacy(*args) != discovery.classify_container(*args):
+            mismatches += 1
+
+    legacy_us = measure(legacy, containers)
+    compiled_us = measure(discovery.classify_container, containers)
+
+    logger.info("Правил: ports=%d env=%d images=%d labels=%d",
+                len(discovery.rules['ports']), len(discovery.rules['env']),
+                len(discovery.rules['images']), len(discovery.rules['labels']))
+    logger.info("Загрузка и компиляция signatures.yml: %.1f мс", load_ms)
+    logger.info("Перебор правил:        %.1f мкс/контейнер", legacy_us)
+    logger.info("Скомпилированный индекс: %.1f мкс/контейнер", compiled_us)
+    logger.info("Ускорение: x%.1f", legacy_us / compiled_us)
+
+    if mismatches:
+        logger.error("Результаты расходятся для %d из %d контейнеров", mismatches, len(containers))
+        sys.exit(1)
+    logger.info("Результаты совпадают для всех %d контейнеров", len(containers))
+
+
+if __name__ == "__main__":
+    main()
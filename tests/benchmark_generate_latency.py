@@ -0,0 +1,182 @@
+"""
+Бенчмарк задержки /api/v1/generate/ сервиса prometheus_generation.
+
+Отправляет запросы генерации конфигурации для postgres контейнера сначала последовательно,
+затем по CONCURRENCY одновременно, и выводит перцентили задержки. Результаты сохраняются
+в BENCH_RESULTS под меткой BENCH_LABEL, и если в файле уже есть результаты с другой меткой,
+выводится сравнение. Для сравнения до и после изменения запустите бенчмарк на обеих версиях
+сервиса с метками before и after.
+
+Генерация записывает в MinIO файлы configs/benchmark-{i}/, при повторных запусках
+они перезаписываются.
+
+Переменные окружения:
+    GENERATION_BASE_URL: Адрес prometheus_generation (по умолчанию http://localhost:8002)
+    BENCH_REQUESTS: Количество запросов в каждой серии (по умолчанию 200)
+    BENCH_CONCURRENCY: Количество одновременных запросов (по умолчанию 10)
+    BENCH_LABEL: Метка результатов (по умолчанию after)
+    BENCH_RESULTS: Файл результатов (по умолчанию bench_generate_latency.json)
+"""
+
+import json
+import logging
+import os
+import statistics
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
+
+import requests
+
+GENERATION_BASE_URL = os.getenv("GENERATION_BASE_URL", "http://localhost:8002")
+GENERATE_API = f"{GENERATION_BASE_URL}/api/v1/generate/"
+
+REQUESTS_COUNT = int(os.getenv("BENCH_REQUESTS", 200))
+CONCURRENCY = int(os.getenv("BENCH_CONCURRENCY", 10))
+LABEL = os.getenv("BENCH_LABEL", "after")
+RESULTS_PATH = os.getenv("BENCH_RESULTS", "bench_generate_latency.json")
+WARMUP_REQUESTS = 5
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(levelname)s] %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+session = requests.Session()
+session.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=CONCURRENCY))
+
+
+def container_payload(index: int) -> Dict:
+    """
+    Формирует данные postgres контейнера для генерации конфигурации.
+
+    Args:
+        index: Номер запроса
+
+    Returns:
+        Dict: Тело запроса ContainerData
+    """
+    return {
+        "info": {
+            "Id": f"benchmark-{index}",
+            "Name": f"/benchmark-postgres-{index}",
+            "Config": {
+                "Image": "postgres:16",
+                "Env": ["POSTGRES_USER=postgres", "POSTGRES_PASSWORD=postgres", "POSTGRES_DB=postgres"],
+                "Labels": {},
+            },
+            "NetworkSettings": {"Networks": {"bridge": {"IPAddress": "172.17.0.2"}}},
+        },
+        "classification": {"result": [["postgresql", 1.0]]},
+    }
+
+
+def timed_generate(index: int) -> float:
+    """
+    Выполняет запрос генерации и возвращает его длительность.
+
+    Args:
+        index: Номер запроса
+
+    Returns:
+        float: Длительность в миллисекундах
+    """
+    started = time.perf_counter()
+    response = session.post(
+        GENERATE_API,
+        params={"host": "host.docker.internal"},
+        json=container_payload(index),
+        timeout=60
+    )
+    response.raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    Считает перцентили задержки.
+
+    Args:
+        latencies: Длительности запросов в миллисекундах
+
+    Returns:
+        Dict[str, float]: p50, p95, p99 и max в миллисекундах
+    """
+    ordered = sorted(latencies)
+
+    def percentile(value: float) -> float:
+        return ordered[min(len(ordered) - 1, int(len(ordered) * value))]
+
+    return {
+        "p50": statistics.median(ordered),
+        "p95": percentile(0.95),
+        "p99": percentile(0.99),
+        "max": ordered[-1],
+    }
+
+
+def report(title: str, summary: Dict[str, float]) -> None:
+    """
+    Выводит перцентили задержки.
+
+    Args:
+        title: Название серии
+        summary: Перцентили задержки
+    """
+    logger.info(
+        "%s: p50=%.1f мс p95=%.1f мс p99=%.1f мс max=%.1f мс",
+        title, summary["p50"], summary["p95"], summary["p99"], summary["max"]
+    )
+
+
+def save_and_compare(results: Dict[str, Dict[str, float]]) -> None:
+    """
+    Сохраняет результаты под меткой LABEL и сравнивает их с результатами других меток.
+
+    Args:
+        results: Серия -> перцентили задержки
+    """
+    stored = {}
+    if os.path.exists(RESULTS_PATH):
+        with open(RESULTS_PATH, 'r', encoding='utf-8') as f:
+            stored = json.load(f)
+    stored[LABEL] = results
+    with open(RESULTS_PATH, 'w', encoding='utf-8') as f:
+        json.dump(stored, f, indent=2)
+
+    for other_label, other_results in stored.items():
+        if other_label == LABEL:
+            continue
+        for series, summary in results.items():
+            if series not in other_results:
+                continue
+            logger.info(
+                "%s, %s -> %s: p50 %.1f -> %.1f мс, p95 %.1f -> %.1f мс",
+                series, other_label, LABEL,
+                other_results[series]["p50"], summary["p50"],
+                other_results[series]["p95"], summary["p95"]
+            )
+
+
+def main():
+    """
+    Запускает последовательную и параллельную серии запросов и сохраняет результаты.
+    """
+    for index in range(WARMUP_REQUESTS):
+        timed_generate(index)
+
+    results = {}
+    results["sequential"] = summarize([timed_generate(index) for index in range(REQUESTS_COUNT)])
+    report("Последовательно", results["sequential"])
+
+    with ThreadPoolExecutor(max_workers=CONCURRENCY) as executor:
+        latencies = list(executor.map(timed_generate, range(REQUESTS_COUNT)))
+    results["concurrent"] = summarize(latencies)
+    report(f"По {CONCURRENCY} одновременно", results["concurrent"])
+
+    save_and_compare(results)
+
+
+if __name__ == "__main__":
+    main()
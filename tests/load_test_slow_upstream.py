@@ -0,0 +1,212 @@
+"""
+Нагрузочный тест обработчиков api_agregator при медленном docker_api.
+
+Поднимает локальный docker_api-заглушку, который отвечает на /api/v1/manage/* с задержкой,
+регистрирует его как хост и измеряет задержку чтения /containers и /get_all_configs:
+сначала без нагрузки, затем одновременно с несколькими запросами к медленному хосту.
+Если обработчики блокируют цикл событий, чтения ждут ответа медленного хоста
+и их задержка становится не меньше SLOW_DELAY.
+
+Переменные окружения:
+    API_BASE_URL: Адрес api_agregator (по умолчанию http://localhost:8081)
+    SLOW_HOST: Адрес, по которому api_agregator достучится до заглушки (по умолчанию localhost)
+    SLOW_PORT: Порт заглушки (по умолчанию 18090)
+    SLOW_DELAY: Задержка ответа заглушки в секундах (по умолчанию 5)
+"""
+
+import json
+import logging
+import os
+import statistics
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import List
+
+import requests
+
+API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:8081")
+CONTAINERS_API = f"{API_BASE_URL}/api/v1/containers"
+PROMETHEUS_API = f"{API_BASE_URL}/api/v1/prometheus"
+HOSTS_API = f"{API_BASE_URL}/api/v1/hosts"
+
+SLOW_HOST = os.getenv("SLOW_HOST", "localhost")
+SLOW_PORT = int(os.getenv("SLOW_PORT", 18090))
+SLOW_DELAY = float(os.getenv("SLOW_DELAY", 5))
+SLOW_HOST_NAME = "load-test-slow-docker-api"
+
+SLOW_REQUESTS = 4
+READ_REQUESTS = 20
+READ_CONCURRENCY = 10
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='[%(levelname)s] %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+class SlowDockerApiHandler(BaseHTTPRequestHandler):
+    """
+    Заглушка docker_api: /health и discovery отвечают сразу, /api/v1/manage/* - через SLOW_DELAY секунд.
+    """
+
+    def _reply(self, payload) -> None:
+        """
+        Отправляет JSON ответ.
+
+        Args:
+            payload: Тело ответа
+        """
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _handle(self) -> None:
+        """
+        Обрабатывает запрос любого метода.
+        """
+        length = int(self.headers.get("Content-Length") or 0)
+        if length:
+            self.rfile.read(length)
+        if self.path.startswith("/api/v1/manage/"):
+            time.sleep(SLOW_DELAY)
+            self._reply({"message": "ok"})
+        elif self.path.startswith("/api/v1/discover"):
+            self._reply([])
+        else:
+            self._reply({"status": "healthy"})
+
+    do_GET = _handle
+    do_POST = _handle
+    do_DELETE = _handle
+
+    def log_message(self, format, *args) -> None:
+        """
+        Отключает журнал запросов http.server.
+        """
+
+
+def start_slow_docker_api() -> ThreadingHTTPServer:
+    """
+    Запускает заглушку docker_api в фоновом потоке.
+
+    Returns:
+        ThreadingHTTPServer: Запущенный сервер
+    """
+    server = ThreadingHTTPServer(("0.0.0.0", SLOW_PORT), SlowDockerApiHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def register_slow_host() -> str:
+    """
+    Регистрирует заглушку как хост в api_agregator.
+
+    Returns:
+        str: Идентификатор хоста
+    """
+    requests.post(
+        f"{HOSTS_API}/add",
+        params={"name": SLOW_HOST_NAME, "host": SLOW_HOST, "port": SLOW_PORT},
+        timeout=30
+    ).raise_for_status()
+    hosts = requests.get(f"{HOSTS_API}/get", timeout=30).json().get("hosts", {})
+    for host_id, host in hosts.items():
+        if host.get("name") == SLOW_HOST_NAME:
+            return host_id
+    raise RuntimeError("Slow host was not registered")
+
+
+def timed_get(url: str) -> float:
+    """
+    Выполняет GET запрос и возвращает его длительность.
+
+    Args:
+        url: URL запроса
+
+    Returns:
+        float: Длительность в миллисекундах
+    """
+    started = time.perf_counter()
+    requests.get(url, timeout=60).raise_for_status()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure_reads() -> List[float]:
+    """
+    Выполняет READ_REQUESTS чтений /containers и /get_all_configs по READ_CONCURRENCY одновременно.
+
+    Returns:
+        List[float]: Длительности запросов в миллисекундах
+    """
+    urls = [
+        f"{CONTAINERS_API}/containers" if i % 2 == 0 else f"{PROMETHEUS_API}/get_all_configs"
+        for i in range(READ_REQUESTS)
+    ]
+    with ThreadPoolExecutor(max_workers=READ_CONCURRENCY) as executor:
+        return list(executor.map(timed_get, urls))
+
+
+def report(title: str, latencies: List[float]) -> float:
+    """
+    Выводит перцентили задержки.
+
+    Args:
+        title: Название серии
+        latencies: Длительности запросов в миллисекундах
+
+    Returns:
+        float: p95 в миллисекундах
+    """
+    ordered = sorted(latencies)
+    p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+    logger.info(
+        "%s: p50=%.0f мс p95=%.0f мс max=%.0f мс",
+        title, statistics.median(ordered), p95, ordered[-1]
+    )
+    return p95
+
+
+def main():
+    """
+    Запускает измерения и проверяет, что чтения не ждут медленный docker_api.
+    """
+    server = start_slow_docker_api()
+    host_id = register_slow_host()
+    logger.info("Заглушка docker_api зарегистрирована как хост %s (задержка %.1f с)", host_id, SLOW_DELAY)
+
+    try:
+        report("Без нагрузки", measure_reads())
+
+        with ThreadPoolExecutor(max_workers=SLOW_REQUESTS) as slow_executor:
+            slow_futures = [
+                slow_executor.submit(
+                    requests.post,
+                    f"{CONTAINERS_API}/container/start",
+                    params={"id": f"load-test-{i}", "host_id": host_id},
+                    timeout=120
+                )
+                for i in range(SLOW_REQUESTS)
+            ]
+            time.sleep(0.5)
+            loaded_p95 = report(f"Во время {SLOW_REQUESTS} запросов к медленному хосту", measure_reads())
+            for future in slow_futures:
+                future.result()
+    finally:
+        requests.delete(f"{HOSTS_API}/delete", params={"id": host_id}, timeout=30)
+        server.shutdown()
+
+    if loaded_p95 >= SLOW_DELAY * 1000:
+        logger.error("Чтения ждут ответа медленного docker_api (p95 >= %.1f с)", SLOW_DELAY)
+        sys.exit(1)
+    logger.info("Чтения не сериализуются за медленным docker_api")
+
+
+if __name__ == "__main__":
+    main()